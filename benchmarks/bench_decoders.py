@@ -0,0 +1,54 @@
+"""
+Compare the decode time of cursor pages with each JSON decoder installed.
+
+Usage:
+    python -m benchmarks.bench_decoders [--repeat 5]
+"""
+
+import argparse
+import json
+import sys
+import timeit
+
+from crossref.corpus import synthetic_page
+from crossref.decoders import DECODERS
+
+PAGE_SIZES = (20, 100, 1000)
+
+
+def run(repeat: int = 5) -> list[dict]:
+    results = []
+    for size in PAGE_SIZES:
+        body = json.dumps(synthetic_page(size)).encode()
+        for name, decoder in DECODERS.items():
+            best = min(timeit.repeat(lambda d=decoder, b=body: d(b), number=1, repeat=repeat))
+            results.append(
+                {
+                    "decoder": name,
+                    "rows": size,
+                    "bytes": len(body),
+                    "seconds": best,
+                    "items_per_second": size / best,
+                }
+            )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = run(args.repeat)
+    baseline = {r["rows"]: r["seconds"] for r in results if r["decoder"] == "json"}
+    header = f"{'decoder':<8} {'rows':>6} {'MB':>7} {'ms':>9} {'items/s':>10} {'speedup':>8}"
+    sys.stdout.write(header + "\n")
+    for r in results:
+        sys.stdout.write(
+            f"{r['decoder']:<8} {r['rows']:>6} {r['bytes'] / 1e6:>7.2f} {r['seconds'] * 1e3:>9.2f}"
+            f" {r['items_per_second']:>10.0f} {baseline[r['rows']] / r['seconds']:>7.2f}x\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
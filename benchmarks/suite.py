@@ -0,0 +1,332 @@
+"""
+Measure the client offline, against a local fake API, and compare with a baseline.
+
+The benchmarks are the cold start of a process importing the client and looking a
+work up with each transport, the cursor harvest throughput, the latency percentiles of
+single DOI lookups, the cost of building queries, the decode time of pages of each size and
+the memory held by 100,000 harvested items (extrapolated from ``--scale`` times 5,000
+synthetic works, which are large). The fake API runs in a child process, so the
+memory and time measured are the client's.
+
+Usage:
+    python -m benchmarks.suite [--scale 1] [--only startup] [--output results.json]
+        [--compare baseline.json] [--tolerance 0.1]
+
+``--compare`` exits with status 1 when a metric regressed by more than the tolerance:
+the metrics ending with ``_per_second`` must not fall, the ones ending with
+``_seconds`` or holding ``bytes`` must not rise. Save the results of a run on the
+same machine as the baseline.
+"""
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from time import perf_counter
+
+from benchmarks import bench_decoders
+from crossref import VERSION
+from crossref.fakeserver import FakeCrossref
+from crossref.records import iter_works
+from crossref.restful import API, HTTPRequest, Works
+from crossref.transport import RequestsTransport
+
+CORPUS_SIZE = 5000
+LOOKUPS = 300
+BUILDS = 2000
+REPEAT = 3
+STARTS = 10
+TOLERANCE = 0.1
+
+
+def _serve(connection, size: int):
+    with FakeCrossref(size=size, rate_limit=10**6) as api:
+        connection.send(api.url)
+        connection.recv()
+
+
+@contextmanager
+def fake_api(size: int) -> Iterator[str]:
+    """
+    Serve ``size`` synthetic works from a child process, yielding its URL once every
+    page was encoded a first time.
+    """
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(child, size), daemon=True)
+    process.start()
+    try:
+        url = parent.recv()
+        for _ in Works(request_url=f"{url}/works").raw(rows=1000):
+            pass
+        yield url
+    finally:
+        parent.send(None)
+        process.join()
+
+
+class _LocalTransport(RequestsTransport):
+    # Send the requests built for the API, e.g. by `Works.doi`, to the fake API.
+    def __init__(self, url: str):
+        super().__init__()
+        self.url = url
+
+    def request(self, method: str, url: str, **kwargs):
+        return super().request(method, url.replace(f"https://{API}", self.url, 1), **kwargs)
+
+
+def bench_harvest(url: str, size: int) -> dict:
+    results = {}
+    for rows in (100, 1000):
+        works = Works(request_url=f"{url}/works", http_request=HTTPRequest(throttle=False))
+        seconds = float("inf")
+        for _ in range(REPEAT):
+            started = perf_counter()
+            count = sum(len(page.items) for page in works.pages(rows=rows))
+            seconds = min(seconds, perf_counter() - started)
+        works.http_request.close()
+        if count != size:
+            msg = f"Harvested {count} items out of {size}."
+            raise RuntimeError(msg)
+        results[f"harvest.rows_{rows}"] = {
+            "items": count,
+            "total_seconds": seconds,
+            "items_per_second": count / seconds,
+        }
+    return results
+
+
+def bench_lookup(url: str, size: int, lookups: int) -> dict:
+    http_request = HTTPRequest(throttle=False, transport=_LocalTransport(url))
+    works = Works(http_request=http_request)
+    corpus = Works(
+        request_url=f"{url}/works", request_params={"select": "DOI"}, http_request=http_request
+    )
+    dois = [item["DOI"] for item in corpus]
+    dois = [dois[index % size] for index in range(0, lookups * 7919, 7919)]
+    latencies = []
+    for doi in dois:
+        started = perf_counter()
+        if works.doi(doi) is None:
+            msg = f"{doi} not found."
+            raise RuntimeError(msg)
+        latencies.append(perf_counter() - started)
+    http_request.close()
+    centiles = statistics.quantiles(latencies, n=100)
+    return {
+        "lookup.doi": {
+            "lookups": lookups,
+            "mean_seconds": statistics.fmean(latencies),
+            "p50_seconds": centiles[49],
+            "p90_seconds": centiles[89],
+            "p99_seconds": centiles[98],
+        }
+    }
+
+
+def bench_query_builder(builds: int) -> dict:
+    def build() -> str:
+        return (
+            Works()
+            .query("zika virus", author="Silva")
+            .filter(from_pub_date="2016", type="journal-article", has_abstract="true")
+            .select("DOI", "title", "author")
+            .sort("published")
+            .order("desc")
+            .url
+        )
+
+    best = min(timeit.repeat(build, number=builds, repeat=5))
+    return {"query.build": {"builds": builds, "build_seconds": best / builds}}
+
+
+def bench_decode(repeat: int = 5) -> dict:
+    return {
+        f"decode.{result['decoder']}.rows_{result['rows']}": {
+            "bytes": result["bytes"],
+            "page_seconds": result["seconds"],
+            "items_per_second": result["items_per_second"],
+        }
+        for result in bench_decoders.run(repeat)
+    }
+
+
+# A cold start, importing the client and looking a work up with a transport sending the
+# requests of the API to the fake API.
+COLD_LOOKUP = """
+from crossref.restful import API, HTTPRequest, Works
+from crossref.transport import {transport}
+
+class Local({transport}):
+    def request(self, method, url, **kwargs):
+        return super().request(method, url.replace(f"https://{{API}}", "{url}", 1), **kwargs)
+
+assert Works(http_request=HTTPRequest(transport=Local())).doi("{doi}")
+"""
+
+
+def _best_run(code: str, runs: int) -> float:
+    # The bytecode is cached by the first run, as it would be in a deployment.
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+    best = float("inf")
+    for _ in range(runs + 1):
+        started = perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, env=env)  # noqa: S603
+        best = min(best, perf_counter() - started)
+    return best
+
+
+def bench_startup(url: str, runs: int) -> dict:
+    doi = next(iter(Works(request_url=f"{url}/works", request_params={"select": "DOI"})))["DOI"]
+    interpreter = _best_run("pass", runs)
+    results = {
+        "startup.interpreter": {"seconds": interpreter},
+        "startup.import": {"import_seconds": _best_run("import crossref.restful", runs)},
+    }
+    for transport in ("RequestsTransport", "HTTPClientTransport"):
+        code = COLD_LOOKUP.format(transport=transport, url=url, doi=doi)
+        results[f"startup.lookup.{transport}"] = {"cold_seconds": _best_run(code, runs)}
+    return results
+
+
+def _peak(harvest: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = harvest()
+        peak = tracemalloc.get_traced_memory()[1]
+        del kept
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def bench_memory(url: str, size: int) -> dict:
+    def endpoint() -> Works:
+        return Works(request_url=f"{url}/works", http_request=HTTPRequest(throttle=False))
+
+    scale = 100_000 / size
+    dicts = _peak(lambda: list(endpoint().pages(rows=1000)))
+    records = _peak(lambda: list(iter_works(endpoint(), rows=1000)))
+    streaming = _peak(lambda: sum(1 for _ in endpoint().raw(rows=1000)))
+    return {
+        "memory.dicts": {"items": size, "peak_bytes_per_100k_items": dicts * scale},
+        "memory.records": {"items": size, "peak_bytes_per_100k_items": records * scale},
+        "memory.streaming": {"items": size, "peak_bytes": streaming},
+    }
+
+
+BENCHMARKS = ("startup", "harvest", "lookup", "query", "decode", "memory")
+
+
+def run(scale: float = 1.0, only: tuple = BENCHMARKS) -> dict:
+    """
+    Run the benchmarks named in ``only``, returning their results with the
+    environment they ran in.
+    """
+    size = max(int(CORPUS_SIZE * scale), 100)
+    results = {}
+    if "query" in only:
+        results.update(bench_query_builder(max(int(BUILDS * scale), 10)))
+    if "decode" in only:
+        results.update(bench_decode())
+    if {"startup", "harvest", "lookup", "memory"} & set(only):
+        with fake_api(size) as url:
+            if "startup" in only:
+                results.update(bench_startup(url, max(int(STARTS * scale), 3)))
+            if "harvest" in only:
+                results.update(bench_harvest(url, size))
+            if "lookup" in only:
+                results.update(bench_lookup(url, size, max(int(LOOKUPS * scale), 10)))
+            if "memory" in only:
+                results.update(bench_memory(url, size))
+    return {
+        "created": datetime.now(UTC).isoformat(timespec="seconds"),
+        "crossref": VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "benchmarks": results,
+    }
+
+
+def direction(metric: str) -> int:
+    """
+    Return 1 if higher values of ``metric`` are better, -1 if lower ones are, and 0
+    if it is not compared.
+    """
+    if metric.endswith("_per_second"):
+        return 1
+    if metric.endswith("_seconds") or "bytes" in metric:
+        return -1
+    return 0
+
+
+def compare(results: dict, baseline: dict, tolerance: float = TOLERANCE) -> list[dict]:
+    """
+    Compare the metrics found in both runs, returning one entry per metric with its
+    relative ``change`` (positive when better) and whether it ``regressed``.
+    """
+    comparison = []
+    for name, metrics in results["benchmarks"].items():
+        before = baseline["benchmarks"].get(name, {})
+        for metric, value in metrics.items():
+            sign = direction(metric)
+            if not sign or not before.get(metric):
+                continue
+            change = sign * (value - before[metric]) / before[metric]
+            comparison.append(
+                {
+                    "benchmark": name,
+                    "metric": metric,
+                    "baseline": before[metric],
+                    "value": value,
+                    "change": change,
+                    "regressed": change < -tolerance,
+                }
+            )
+    return comparison
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--compare", help="Compare with the results saved in this file.")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(argv)
+
+    results = run(args.scale, tuple(args.only))
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    for name, metrics in results["benchmarks"].items():
+        values = " ".join(f"{metric}={value:.6g}" for metric, value in metrics.items())
+        sys.stdout.write(f"{name:<28} {values}\n")
+
+    if not args.compare:
+        return 0
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+    comparison = compare(results, baseline, args.tolerance)
+    sys.stdout.write(f"\n{'benchmark':<28} {'metric':<26} {'baseline':>12} {'value':>12} change\n")
+    for entry in comparison:
+        flag = "  REGRESSION" if entry["regressed"] else ""
+        sys.stdout.write(
+            f"{entry['benchmark']:<28} {entry['metric']:<26} {entry['baseline']:>12.6g}"
+            f" {entry['value']:>12.6g} {entry['change']:+7.1%}{flag}\n"
+        )
+    return 1 if any(entry["regressed"] for entry in comparison) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
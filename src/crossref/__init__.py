@@ -1,3 +1,13 @@
-from importlib import metadata
+DISTRIBUTION = "crossrefapi"
 
-VERSION = metadata.version("crossrefapi")
+
+def __getattr__(name: str):
+    # The version is read on first use: importing importlib.metadata takes longer than
+    # importing the whole client.
+    if name == "VERSION":
+        from importlib import metadata  # noqa: PLC0415
+
+        version = globals()["VERSION"] = metadata.version(DISTRIBUTION)
+        return version
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
@@ -0,0 +1,554 @@
+import copy
+import hashlib
+import math
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from typing import Any
+
+WILDCARD = "*"
+LENGTH = "#"
+
+
+class Field:
+    """
+    Extract values from an item with a dotted path, e.g. ``issued.date-parts.0.0``.
+
+    Numeric segments index lists, ``*`` expands every element of a list (the path
+    then gives several values, e.g. ``author.*.family``) and a final ``#`` gives the
+    length of a list (e.g. ``author.#``). Paths are plain strings, so the aggregators
+    using them can be pickled and sent to other processes, unlike lambdas.
+    """
+
+    __slots__ = ("path", "segments")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.segments = tuple(
+            int(segment) if segment.lstrip("-").isdigit() else segment
+            for segment in path.split(".")
+        )
+
+    def __getstate__(self):
+        return self.path
+
+    def __setstate__(self, path: str):
+        self.__init__(path)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Field) and other.path == self.path
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Field({self.path!r})"
+
+    def values(self, item: Any) -> list:
+        """
+        Return the values found at the path, without the missing (None) ones.
+        """
+        values = [item]
+        for segment in self.segments:
+            found = []
+            for value in values:
+                if segment == WILDCARD:
+                    if isinstance(value, list):
+                        found.extend(value)
+                elif segment == LENGTH:
+                    if isinstance(value, list | dict | str):
+                        found.append(len(value))
+                elif isinstance(segment, int):
+                    if isinstance(value, list) and -len(value) <= segment < len(value):
+                        found.append(value[segment])
+                elif isinstance(value, dict) and segment in value:
+                    found.append(value[segment])
+            values = found
+        return [value for value in values if value is not None]
+
+
+def _field(field: str | Field | None) -> Field | None:
+    if field is None or isinstance(field, Field):
+        return field
+    return Field(field)
+
+
+def _hashable(value: Any) -> Any:
+    """
+    Turn the lists and objects of a JSON value into tuples, so it can key a dict.
+    """
+    if isinstance(value, list):
+        return tuple(_hashable(element) for element in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(element)) for key, element in value.items()))
+    return value
+
+
+class Aggregator(ABC):
+    """
+    Base class of the streaming aggregators.
+
+    An aggregator consumes items one by one (`add` and `update`) in a memory that does
+    not grow with the number of items, and can be merged with other aggregators of the
+    same kind and settings (`merge`), e.g. the ones computed by other processes on other
+    shards of a harvest. Aggregators are picklable.
+
+    Args:
+        field (str | Field, optional): The path of the aggregated values, see `Field`.
+    """
+
+    def __init__(self, field: str | Field | None = None):
+        self.field = _field(field)
+        self._reset()
+
+    @abstractmethod
+    def _reset(self):
+        """
+        Set the state of an aggregator without values.
+        """
+
+    def _settings(self) -> tuple:
+        return (self.field,)
+
+    @abstractmethod
+    def _add_value(self, value: Any):
+        """
+        Add one of the values found at ``field`` (or the item itself without field).
+        """
+
+    @abstractmethod
+    def _merge(self, other: "Aggregator"):
+        """
+        Add the state of another aggregator with the same settings.
+        """
+
+    def add(self, item: Any):
+        """
+        Add the values of an item.
+        """
+        for value in self.field.values(item) if self.field is not None else (item,):
+            self._add_value(value)
+
+    def update(self, items: Iterable) -> "Aggregator":
+        """
+        Add the values of every item, e.g. ``Count().update(Works().filter(...))``.
+        """
+        add = self.add
+        for item in items:
+            add(item)
+        return self
+
+    def merge(self, other: "Aggregator") -> "Aggregator":
+        """
+        Merge the state of another aggregator with the same settings into this one.
+
+        Raises:
+            ValueError: If the aggregators are of different kinds or settings.
+        """
+        if other.__class__ is not self.__class__ or other._settings() != self._settings():
+            msg = f"Can not merge {other!r} into {self!r}."
+            raise ValueError(msg)
+        self._merge(other)
+        return self
+
+    def empty(self) -> "Aggregator":
+        """
+        Return a new aggregator with the same settings and no values.
+        """
+        clone = copy.copy(self)
+        clone._reset()
+        return clone
+
+    @abstractmethod
+    def result(self) -> Any:
+        """
+        Return the aggregated value.
+        """
+
+    def __repr__(self) -> str:
+        settings = ", ".join(repr(setting) for setting in self._settings())
+        return f"{self.__class__.__name__}({settings})"
+
+
+class Count(Aggregator):
+    """
+    Count the items, or the values found at ``field`` when given.
+    """
+
+    def _reset(self):
+        self.count = 0
+
+    def _add_value(self, _value: Any):
+        self.count += 1
+
+    def _merge(self, other: "Count"):
+        self.count += other.count
+
+    def result(self) -> int:
+        return self.count
+
+
+class Sum(Aggregator):
+    """
+    Sum the numeric values found at ``field``. The result is ``(sum, count)``, so means
+    can be computed after merging.
+    """
+
+    def __init__(self, field: str | Field):
+        super().__init__(field)
+
+    def _reset(self):
+        self.total = 0
+        self.count = 0
+
+    def _add_value(self, value: Any):
+        if isinstance(value, int | float) and not isinstance(value, bool):
+            self.total += value
+            self.count += 1
+
+    def _merge(self, other: "Sum"):
+        self.total += other.total
+        self.count += other.count
+
+    def result(self) -> tuple:
+        return self.total, self.count
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+
+class Quantiles(Aggregator):
+    """
+    Approximate quantiles of the numeric values found at ``field``.
+
+    Values are counted in logarithmic buckets (as in DDSketch), so every quantile is
+    within ``relative_accuracy`` of the exact value whatever the distribution, and the
+    number of buckets only grows with the logarithm of the range of the values.
+    Sketches with the same accuracy merge exactly.
+    Infinite and NaN values have no quantile, they are only counted in `non_finite`.
+
+    Args:
+        field (str | Field): The path of the values.
+        relative_accuracy (float, optional): Defaults to 0.01.
+        quantiles (tuple, optional): The quantiles given by `result`. Defaults to the
+            median, 90th and 99th percentiles.
+    """
+
+    def __init__(
+        self,
+        field: str | Field,
+        relative_accuracy: float = 0.01,
+        quantiles: tuple = (0.5, 0.9, 0.99),
+    ):
+        if not 0 < relative_accuracy < 1:
+            msg = f"Relative accuracy specified as {relative_accuracy!s} but must be in (0, 1)."
+            raise ValueError(msg)
+        self.relative_accuracy = relative_accuracy
+        self.quantiles = tuple(quantiles)
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        super().__init__(field)
+
+    def _settings(self) -> tuple:
+        return (self.field, self.relative_accuracy)
+
+    def _reset(self):
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+        self.count = 0
+        self.non_finite = 0
+        self.min = None
+        self.max = None
+
+    def _add_value(self, value: Any):
+        if not isinstance(value, int | float) or isinstance(value, bool):
+            return
+        if not math.isfinite(value):
+            self.non_finite += 1
+            return
+        self.count += 1
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if value == 0:
+            self.zeros += 1
+            return
+        buckets = self.positive if value > 0 else self.negative
+        index = math.ceil(math.log(abs(value)) / self._log_gamma)
+        buckets[index] = buckets.get(index, 0) + 1
+
+    def _merge(self, other: "Quantiles"):
+        for buckets, other_buckets in (
+            (self.positive, other.positive),
+            (self.negative, other.negative),
+        ):
+            for index, count in other_buckets.items():
+                buckets[index] = buckets.get(index, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+        self.non_finite += other.non_finite
+        for bound, pick in (("min", min), ("max", max)):
+            values = [
+                value
+                for value in (getattr(self, bound), getattr(other, bound))
+                if value is not None
+            ]
+            setattr(self, bound, pick(values) if values else None)
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma**index / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float | None:  # noqa: PLR0911
+        """
+        Return the approximate ``q`` quantile (0 <= q <= 1), or None without values.
+        """
+        if not self.count:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._value(index)
+        seen += self.zeros
+        if seen > rank:
+            return 0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    def result(self) -> dict:
+        return {q: self.quantile(q) for q in self.quantiles}
+
+
+class TopK(Aggregator):
+    """
+    The most frequent values found at ``field`` (e.g. ``publisher``), with the
+    Space-Saving algorithm.
+
+    At most ``capacity`` counters are kept. A value that is not counted yet replaces the
+    least frequent one and inherits its count, which bounds the overestimation of every
+    count by the count of the replaced value (kept in `errors`). Values seen more than
+    ``total / capacity`` times are always in the result.
+
+    Args:
+        field (str | Field): The path of the values.
+        k (int, optional): The number of values given by `result`. Defaults to 10.
+        capacity (int, optional): The number of counters. Defaults to ``10 * k``.
+    """
+
+    def __init__(self, field: str | Field, k: int = 10, capacity: int | None = None):
+        self.k = k
+        self.capacity = capacity or 10 * k
+        super().__init__(field)
+
+    def _settings(self) -> tuple:
+        return (self.field, self.k, self.capacity)
+
+    def _reset(self):
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+
+    def _add_value(self, value: Any):
+        value = _hashable(value)
+        counts = self.counts
+        self.total += 1
+        if value in counts:
+            counts[value] += 1
+        elif len(counts) < self.capacity:
+            counts[value] = 1
+            self.errors[value] = 0
+        else:
+            evicted = min(counts, key=counts.get)
+            count = counts.pop(evicted)
+            del self.errors[evicted]
+            counts[value] = count + 1
+            self.errors[value] = count
+
+    def _merge(self, other: "TopK"):
+        # A value missing from one summary may have been counted up to its smallest
+        # counter, which bounds the error added by the merge.
+        floor = min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+        other_floor = min(other.counts.values()) if len(other.counts) >= other.capacity else 0
+
+        counts = {}
+        errors = {}
+        for value in self.counts.keys() | other.counts.keys():
+            counts[value] = self.counts.get(value, floor) + other.counts.get(value, other_floor)
+            errors[value] = self.errors.get(value, floor) + other.errors.get(value, other_floor)
+
+        kept = sorted(counts, key=counts.get, reverse=True)[: self.capacity]
+        self.counts = {value: counts[value] for value in kept}
+        self.errors = {value: errors[value] for value in kept}
+        self.total += other.total
+
+    def result(self) -> list[tuple[Any, int]]:
+        """
+        Return the ``k`` most frequent values with their (over)estimated counts.
+        """
+        return sorted(self.counts.items(), key=lambda pair: pair[1], reverse=True)[: self.k]
+
+
+def _hash64(value: Any) -> int:
+    """
+    A 64 bits hash that, unlike `hash`, is the same in every process.
+    """
+    data = value.encode() if isinstance(value, str) else repr(value).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+class Distinct(Aggregator):
+    """
+    Approximate number of distinct values found at ``field``, with HyperLogLog.
+
+    The sketch takes ``2 ** precision`` bytes whatever the number of values, and its
+    standard error is about ``1.04 / sqrt(2 ** precision)`` (0.8% with the default
+    precision). Sketches with the same precision merge exactly.
+
+    Args:
+        field (str | Field): The path of the values, e.g. ``author.*.ORCID``.
+        precision (int, optional): Between 4 and 18. Defaults to 14.
+    """
+
+    def __init__(self, field: str | Field, precision: int = 14):
+        if not 4 <= precision <= 18:  # noqa: PLR2004
+            msg = f"Precision specified as {precision!s} but must be between 4 and 18."
+            raise ValueError(msg)
+        self.precision = precision
+        super().__init__(field)
+
+    def _settings(self) -> tuple:
+        return (self.field, self.precision)
+
+    def _reset(self):
+        self.registers = bytearray(1 << self.precision)
+
+    def _add_value(self, value: Any):
+        hashed = _hash64(value)
+        index = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = 64 - self.precision - rest.bit_length() + 1
+        self.registers[index] = max(self.registers[index], rank)
+
+    def _merge(self, other: "Distinct"):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def result(self) -> int:
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0**-register for register in self.registers)
+        zeros = self.registers.count(0)
+        # Linear counting is more accurate while many registers are still empty.
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+
+class GroupBy(Aggregator):
+    """
+    Run aggregators for each group of items sharing the same key.
+
+    The memory grows with the number of groups, not with the number of items.
+
+    Args:
+        keys (str | Field | tuple): The path of the group key, or several paths for a
+            composite key (a tuple). Items without a value for a key are skipped, and
+            list or object key values are turned into tuples.
+        **aggregators (Aggregator): The aggregators computed for each group, given as
+            templates that are copied for each new group.
+
+    Usage:
+        by_member_year = GroupBy(
+            ("member", "issued.date-parts.0.0"),
+            citations=Quantiles("is-referenced-by-count"),
+            authors=Quantiles("author.#"),
+        ).update(Works().filter(from_pub_date="2020"))
+        by_member_year.result()[("98", 2021)]["citations"][0.9]
+    """
+
+    def __init__(self, keys: str | Field | tuple, **aggregators: Aggregator):
+        self.composite = isinstance(keys, tuple)
+        self.keys = tuple(_field(key) for key in keys) if self.composite else (_field(keys),)
+        self.aggregators = {name: aggregator.empty() for name, aggregator in aggregators.items()}
+        super().__init__()
+
+    def _settings(self) -> tuple:
+        return (self.keys, *[(name, *a._settings()) for name, a in self.aggregators.items()])
+
+    def _reset(self):
+        self.groups = {}
+
+    def _group(self, key: Any) -> dict[str, Aggregator]:
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = {
+                name: aggregator.empty() for name, aggregator in self.aggregators.items()
+            }
+        return group
+
+    def _add_value(self, item: Any):
+        key = []
+        for field in self.keys:
+            values = field.values(item)
+            if not values:
+                return
+            key.append(_hashable(values[0]))
+
+        for aggregator in self._group(tuple(key) if self.composite else key[0]).values():
+            aggregator.add(item)
+
+    def _merge(self, other: "GroupBy"):
+        for key, other_group in other.groups.items():
+            group = self._group(key)
+            for name, aggregator in other_group.items():
+                group[name].merge(aggregator)
+
+    def result(self) -> dict:
+        return {
+            key: {name: aggregator.result() for name, aggregator in group.items()}
+            for key, group in self.groups.items()
+        }
+
+
+def aggregate(items: Iterable, **aggregators: Aggregator) -> dict:
+    """
+    Feed every item to all the aggregators in a single pass and return their results.
+
+    Usage:
+        aggregate(
+            Works().filter(member=98),
+            works=Count(),
+            citations=Quantiles("is-referenced-by-count"),
+            publishers=TopK("container-title.0"),
+        )
+    """
+    adders = [aggregator.add for aggregator in aggregators.values()]
+    for item in items:
+        for add in adders:
+            add(item)
+    return {name: aggregator.result() for name, aggregator in aggregators.items()}
+
+
+def merge(aggregators: Iterable[Aggregator]) -> Aggregator:
+    """
+    Merge aggregators computed on different shards into a new aggregator.
+
+    Raises:
+        ValueError: If there is no aggregator to merge.
+    """
+    aggregators = iter(aggregators)
+    first = next(aggregators, None)
+    if first is None:
+        msg = "Can not merge an empty sequence of aggregators."
+        raise ValueError(msg)
+    merged = first.empty().merge(first)
+    for aggregator in aggregators:
+        merged.merge(aggregator)
+    return merged
@@ -0,0 +1,276 @@
+import gzip
+import pickle
+import tempfile
+import threading
+from collections import deque
+from collections.abc import Iterator
+from contextvars import copy_context
+from pathlib import Path
+from typing import Any
+
+from crossref.restful import LIMIT, Endpoint
+
+# The number of items kept in memory by default; about 400 MB of typical works.
+MAX_ITEMS: int = 10_000
+
+
+class SpillQueue:
+    """
+    An unbounded first in, first out queue keeping at most ``max_items`` items in
+    memory and spilling the rest to compressed temporary files.
+
+    Entries (e.g. the items of a page) are put with their size in items, and spilled
+    pickled to gzip files of about ``max_items`` items. `put` never blocks, whatever
+    the speed of the consumer; `get` blocks until an entry is available. Once entries
+    are spilled, the following ones are spilled too until the files are read back,
+    which keeps the order. A spill file is read back when the memory is empty, so at
+    most twice ``max_items`` items are in memory. A queue has a single consumer.
+
+    Args:
+        max_items (int, optional): The maximum number of items in memory. Defaults to
+            `MAX_ITEMS`.
+        directory (str | Path, optional): Where the spill files are written. Defaults
+            to the system temporary directory.
+        compresslevel (int, optional): The gzip compression level of the spill files,
+            favoring speed. Defaults to 1.
+
+    Attributes:
+        spilled (int): The number of items written to disk so far.
+        spill_files (int): The number of spill files written so far.
+    """
+
+    def __init__(
+        self,
+        max_items: int = MAX_ITEMS,
+        directory: str | Path | None = None,
+        compresslevel: int = 1,
+    ):
+        self.max_items = max_items
+        self.compresslevel = compresslevel
+        self.spilled = 0
+        self.spill_files = 0
+        self.directory = directory
+        self._directory = None
+        self._memory = deque()
+        self._in_memory = 0
+        self._segments = deque()  # Closed spill files, oldest first, with their entries.
+        self._writer = None
+        self._writing = None
+        self._written = 0
+        self._written_items = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __len__(self) -> int:
+        """
+        The number of entries queued, in memory or on disk.
+        """
+        with self._condition:
+            return len(self._memory) + sum(entries for _, entries in self._segments) + self._written
+
+    @property
+    def in_memory(self) -> int:
+        """
+        The number of items currently held in memory.
+        """
+        return self._in_memory
+
+    def _spilling(self) -> bool:
+        return bool(self._segments) or self._writer is not None
+
+    def _spill(self, entry: tuple):
+        if self._writer is None:
+            if self._directory is None:
+                self._directory = tempfile.TemporaryDirectory(
+                    prefix="crossref-", dir=self.directory
+                )
+            self.spill_files += 1
+            self._writing = Path(self._directory.name) / f"{self.spill_files:08d}.pickle.gz"
+            self._writer = gzip.open(self._writing, "wb", compresslevel=self.compresslevel)  # noqa: SIM115
+        pickle.dump(entry, self._writer, protocol=pickle.HIGHEST_PROTOCOL)
+        self._written += 1
+        self._written_items += entry[0]
+        self.spilled += entry[0]
+        if self._written_items >= self.max_items:
+            self._rotate()
+
+    def _rotate(self):
+        self._writer.close()
+        self._segments.append((self._writing, self._written))
+        self._writer = self._writing = None
+        self._written = self._written_items = 0
+
+    def _read(self, path: Path, entries: int) -> list[tuple]:
+        with gzip.open(path, "rb") as source:
+            loaded = [pickle.load(source) for _ in range(entries)]  # noqa: S301 - written here.
+        path.unlink()
+        return loaded
+
+    def put(self, entry: Any, size: int = 1):
+        """
+        Queue an entry of ``size`` items, spilling it to disk if the memory is full.
+        """
+        with self._condition:
+            if self._closed:
+                msg = "The queue is closed."
+                raise ValueError(msg)
+            if self._spilling() or self._in_memory + size > self.max_items:
+                self._spill((size, entry))
+            else:
+                self._memory.append((size, entry))
+                self._in_memory += size
+            self._condition.notify()
+
+    def get(self, timeout: float | None = None) -> Any:
+        """
+        Return the oldest entry, waiting for one if the queue is empty.
+
+        Raises:
+            TimeoutError: If no entry was put within ``timeout`` seconds.
+            EOFError: If the queue is empty and closed.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._memory or self._spilling() or self._closed, timeout
+            ):
+                msg = f"No entry was queued within {timeout!s} seconds."
+                raise TimeoutError(msg)
+            if self._memory:
+                return self._pop()
+            if not self._spilling():
+                raise EOFError
+            if not self._segments:
+                self._rotate()
+            path, entries = self._segments.popleft()
+
+        # The oldest spill file is read without blocking `put`. The entries put in the
+        # meantime are newer, so the ones read go in front of them.
+        loaded = self._read(path, entries)
+        with self._condition:
+            self._memory.extendleft(reversed(loaded))
+            self._in_memory += sum(size for size, _ in loaded)
+            return self._pop()
+
+    def _pop(self) -> Any:
+        size, entry = self._memory.popleft()
+        self._in_memory -= size
+        return entry
+
+    def close(self):
+        """
+        Stop accepting entries; `get` raises EOFError once the queue is empty.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def cleanup(self):
+        """
+        Close the queue and delete its spill files.
+        """
+        self.close()
+        with self._condition:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self._memory.clear()
+            self._segments.clear()
+            self._written = self._written_items = self._in_memory = 0
+        if self._directory is not None:
+            self._directory.cleanup()
+
+
+class Prefetcher:
+    """
+    Harvest an endpoint in a background thread, decoupled from the consumer.
+
+    The cursors of the **works** deep paging expire after a few minutes without
+    requests, so a consumer stalling for longer (a locked database, a slow upload)
+    loses the harvest when iterating the endpoint directly. Here a thread fetches the
+    pages as fast as the rate limits allow and queues their items in a `SpillQueue`,
+    so the fetching never waits for the consumer, and the memory used stays bounded
+    however far behind the consumer falls.
+
+    An error of the fetching thread is raised to the consumer once the items fetched
+    before it are consumed. Leaving the iteration early stops the fetching thread and
+    deletes the spill files.
+
+    Args:
+        endpoint (Endpoint): The query to harvest, e.g. ``Works().filter(...)``.
+        rows (int, optional): The number of items per page. Defaults to `LIMIT`.
+        max_items (int, optional): The maximum number of items kept in memory.
+            Defaults to `MAX_ITEMS`.
+        directory (str | Path, optional): Where the spill files are written. Defaults
+            to the system temporary directory.
+        raw (bool, optional): Yield the undecoded items (see `Endpoint.raw`), as
+            bytes. Defaults to False.
+
+    Attributes:
+        cursor (str | None): The cursor of the page being consumed, to resume an
+            interrupted harvest with ``endpoint.pages(cursor=...)`` without losing
+            items (the items of that page already consumed are yielded again).
+        offset (int | None): The same for the endpoints paging with offsets.
+        queue (SpillQueue): The queue, with its spilling statistics.
+
+    Usage:
+        for item in Prefetcher(Works().filter(from_index_date="2024-01-01")):
+            slow_database.insert(item)
+    """
+
+    def __init__(
+        self,
+        endpoint: Endpoint,
+        rows: int = LIMIT,
+        max_items: int = MAX_ITEMS,
+        directory: str | Path | None = None,
+        raw: bool = False,
+    ):
+        self.endpoint = endpoint
+        self.rows = rows
+        self.max_items = max_items
+        self.directory = directory
+        self.raw = raw
+        self.cursor = None
+        self.offset = None
+        self.queue = None
+        self._error = None
+        self._stop = threading.Event()
+
+    def _fetch(self, queue: SpillQueue):
+        try:
+            for page in self.endpoint.pages(rows=self.rows, raw=self.raw):
+                if self._stop.is_set():
+                    return
+                items = [bytes(item) for item in page.items] if self.raw else list(page.items)
+                queue.put((page.cursor, page.offset, items), size=len(items))
+        except Exception as exc:  # noqa: BLE001 - raised in the consumer thread.
+            self._error = exc
+        finally:
+            queue.close()
+
+    def __iter__(self) -> Iterator[Any]:
+        queue = self.queue = SpillQueue(self.max_items, directory=self.directory)
+        self._error = None
+        self._stop.clear()
+        # The thread fetches in the context of the consumer, e.g. under its trace span.
+        thread = threading.Thread(target=copy_context().run, args=(self._fetch, queue), daemon=True)
+        thread.start()
+        try:
+            while True:
+                try:
+                    self.cursor, self.offset, items = queue.get()
+                except EOFError:
+                    break
+                yield from items
+            if self._error is not None:
+                raise self._error
+        finally:
+            self._stop.set()
+            queue.cleanup()
+
+
+def prefetch(endpoint: Endpoint, **kwargs) -> Prefetcher:
+    """
+    Shortcut to `Prefetcher`, see its documentation for the arguments.
+    """
+    return Prefetcher(endpoint, **kwargs)
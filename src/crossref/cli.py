@@ -0,0 +1,584 @@
+"""
+Harvest a query of the Crossref API from the command line.
+
+The query is built with the endpoint methods (``filter``, ``query``, ``select``,
+``sort``, ``order``), optionally split into date shards (see `QuerySpec.shard_by_date`)
+that are harvested concurrently, and written page by page as JSON Lines, one file per
+shard (gzipped by default, readable with `crossref.snapshot.Snapshot`), or into a
+`crossref.mirror.Mirror` database. The state of every shard is saved in a checkpoint
+after each page, so an interrupted or failed harvest continues where it stopped with
+``--resume``.
+
+Usage:
+    crossref-harvest works --filter from-index-date=2024-01-01 --filter type=journal-article
+        --select DOI,title,author --shard-by index-date --since 2024-01-01
+        --until 2024-06-30 --shard-days 7 --concurrency 4 --output harvest/
+    crossref-harvest --resume --output harvest/
+"""
+
+import argparse
+import contextlib
+import dataclasses
+import gzip
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import TextIO
+
+import crossref
+from crossref.mirror import Mirror
+from crossref.pipeline import ParallelMap
+from crossref.query import ENDPOINTS, QuerySpec
+from crossref.restful import CrossrefAPIError, Etiquette, HTTPRequest
+
+FORMATS = ("jsonl.gz", "jsonl", "mirror")
+# The largest page the API serves.
+MAX_ROWS = 1000
+# Not a snapshot suffix, so the output directory reads as a snapshot.
+CHECKPOINT = "harvest.checkpoint"
+COMPRESSLEVEL = 6
+SHARD_DAYS = 30
+INTERRUPTED = 130
+
+
+class Checkpoint:
+    """
+    The state of a harvest, saved as JSON after every page.
+
+    Each shard records its spec, its output file, where to continue (``cursor`` or
+    ``offset``), the number of items harvested and the size of its file after the last
+    complete page, which the file is truncated to when the harvest is resumed.
+
+    Args:
+        path (str | Path): The checkpoint file.
+        query (dict): The spec of the whole query (see `QuerySpec.to_dict`).
+        output (str): The output directory, or database for the ``mirror`` format.
+        output_format (str): One of `FORMATS`.
+        shards (list[dict]): The state of each shard.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        query: dict,
+        output: str,
+        output_format: str,
+        shards: list[dict],
+    ):
+        self.path = Path(path)
+        self.query = query
+        self.output = output
+        self.format = output_format
+        self.shards = shards
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(
+        cls, path: str | Path, query: QuerySpec, shards: list[QuerySpec], output: str, fmt: str
+    ) -> "Checkpoint":
+        suffix = "" if fmt == "mirror" else f".{fmt}"
+        states = [
+            {
+                "spec": shard.to_dict(),
+                "file": f"{index:05d}{suffix}",
+                "cursor": "*",
+                "offset": 0,
+                "items": 0,
+                "size": 0,
+                "done": False,
+            }
+            for index, shard in enumerate(shards)
+        ]
+        return cls(path, query.to_dict(), output, fmt, states)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Checkpoint":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(path, data["query"], data["output"], data["format"], data["shards"])
+
+    def save(self):
+        """
+        Write the checkpoint atomically, so it is never found half written.
+        """
+        with self._lock:
+            data = {
+                "query": self.query,
+                "output": self.output,
+                "format": self.format,
+                "shards": self.shards,
+            }
+            temporary = self.path.with_name(f"{self.path.name}.tmp")
+            temporary.write_text(json.dumps(data), encoding="utf-8")
+            temporary.replace(self.path)
+
+    def update(self, shard: dict, **state):
+        with self._lock:
+            shard.update(state)
+        self.save()
+
+    @property
+    def items(self) -> int:
+        return sum(shard["items"] for shard in self.shards)
+
+    @property
+    def pending(self) -> list[dict]:
+        return [shard for shard in self.shards if not shard["done"]]
+
+
+class LinesSink:
+    """
+    Append pages of raw items to a JSON Lines file, each page gzipped as a member of
+    its own when ``compress`` is set, starting at ``size`` (the end of the last
+    complete page).
+    """
+
+    def __init__(self, path: Path, size: int = 0, compress: bool = True):
+        path.touch()
+        self.compress = compress
+        self.file = path.open("r+b")
+        self.file.truncate(size)
+        self.file.seek(size)
+
+    def write(self, items: list) -> int:
+        data = b"".join(bytes(item) + b"\n" for item in items)
+        if self.compress:
+            data = gzip.compress(data, compresslevel=COMPRESSLEVEL, mtime=0)
+        self.file.write(data)
+        self.file.flush()
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class MirrorSink:
+    """
+    Store pages of raw items in a `Mirror`, where a page stored again on resume
+    replaces the same works.
+    """
+
+    def __init__(self, mirror: Mirror, size: int = 0):
+        self.mirror = mirror
+        self.size = size
+
+    def write(self, items: list) -> int:
+        self.mirror.store(items)
+        self.size += sum(len(item) for item in items)
+        return self.size
+
+    def close(self):
+        pass
+
+
+def _duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class Progress:
+    """
+    Display the throughput and the estimated time to completion of a harvest.
+
+    On a terminal the line is redrawn in place at most every ``interval`` seconds,
+    otherwise a line is written every ``interval`` seconds.
+
+    Args:
+        total (int | None): The number of items of the query, if known.
+        shards (int): The number of shards.
+        done (int, optional): The items harvested before, when resuming. Defaults to 0.
+        shards_done (int, optional): The shards completed before. Defaults to 0.
+        stream (TextIO, optional): Defaults to `sys.stderr`.
+        interval (float | None, optional): Defaults to 0.5 seconds on a terminal and 10
+            seconds otherwise.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        total: int | None,
+        shards: int,
+        *,
+        done: int = 0,
+        shards_done: int = 0,
+        stream: TextIO | None = None,
+        interval: float | None = None,
+    ):
+        self.total = total
+        self.shards = shards
+        self.done = done
+        self.shards_done = shards_done
+        self.stream = stream or sys.stderr
+        self.tty = self.stream.isatty()
+        self.interval = interval if interval is not None else (0.5 if self.tty else 10.0)
+        self.items = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self._shown = self.started
+        self._lock = threading.Lock()
+
+    def line(self, now: float | None = None) -> str:
+        elapsed = max((now or time.monotonic()) - self.started, 1e-9)
+        rate = self.items / elapsed
+        done = self.done + self.items
+        if self.total:
+            counts = f"{done:,}/{self.total:,} items ({min(done / self.total, 1):.1%})"
+        else:
+            counts = f"{done:,} items"
+        eta = _duration(max(self.total - done, 0) / rate) if self.total and rate else "-:--:--"
+        return (
+            f"{counts}  {rate:,.0f} items/s  {self.bytes / elapsed / 1e6:.1f} MB/s"
+            f"  ETA {eta}  shards {self.shards_done}/{self.shards}"
+        )
+
+    def _show(self, end: str = ""):
+        if self.tty:
+            self.stream.write(f"\r\x1b[K{self.line()}{end}")
+        else:
+            self.stream.write(f"{self.line()}\n")
+        self.stream.flush()
+
+    def update(self, items: int, size: int = 0, shard_done: bool = False):
+        with self._lock:
+            self.items += items
+            self.bytes += size
+            self.shards_done += shard_done
+            now = time.monotonic()
+            if now - self._shown >= self.interval:
+                self._shown = now
+                self._show()
+
+    def close(self):
+        with self._lock:
+            self._show(end="\n")
+
+
+class Harvester:
+    """
+    Harvest the pending shards of a checkpoint, ``concurrency`` at a time, with the
+    `Endpoint.pages` of their specs, writing every page before it is checkpointed.
+
+    A shard resumed with a cursor that the API no longer accepts (deep paging cursors
+    expire a few minutes after their last use) is harvested again from the start.
+
+    Args:
+        checkpoint (Checkpoint): The harvest state, updated as the pages are written.
+        rows (int, optional): The items per page. Defaults to `MAX_ROWS`.
+        concurrency (int, optional): The number of shards harvested at once. Defaults
+            to 1.
+        progress (Progress | None, optional): Defaults to no display.
+        **kwargs: The endpoint settings given to `QuerySpec.to_endpoint`, such as
+            `http_request`, `etiquette` or `crossref_plus_token`.
+    """
+
+    def __init__(
+        self,
+        checkpoint: Checkpoint,
+        rows: int = MAX_ROWS,
+        concurrency: int = 1,
+        progress: Progress | None = None,
+        **kwargs,
+    ):
+        self.checkpoint = checkpoint
+        self.rows = rows
+        self.concurrency = concurrency
+        self.progress = progress
+        self.endpoint_kwargs = kwargs
+        self.errors = []
+        self._stop = threading.Event()
+        self._mirror = Mirror(checkpoint.output) if checkpoint.format == "mirror" else None
+
+    def stop(self):
+        """
+        Stop after the pages being written; the harvest can be resumed later.
+        """
+        self._stop.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def _sink(self, shard: dict) -> LinesSink | MirrorSink:
+        if self._mirror is not None:
+            return MirrorSink(self._mirror, shard["size"])
+        path = Path(self.checkpoint.output) / shard["file"]
+        return LinesSink(path, shard["size"], compress=self.checkpoint.format == "jsonl.gz")
+
+    def _pages(self, shard: dict):
+        endpoint = QuerySpec.from_dict(shard["spec"]).to_endpoint(**self.endpoint_kwargs)
+        return endpoint.pages(self.rows, cursor=shard["cursor"], offset=shard["offset"], raw=True)
+
+    def harvest_shard(self, shard: dict) -> int:
+        """
+        Harvest a shard until it is done or the harvest is stopped, returning the number
+        of items harvested.
+        """
+        if self.stopped:
+            return 0
+        sink = self._sink(shard)
+        harvested = 0
+        try:
+            pages = self._pages(shard)
+            try:
+                page = next(pages, None)
+            except CrossrefAPIError:
+                if shard["cursor"] == "*":
+                    raise
+                sink.close()
+                if self.progress is not None:
+                    self.progress.done -= shard["items"]
+                self.checkpoint.update(shard, cursor="*", offset=0, items=0, size=0)
+                sink = self._sink(shard)
+                pages = self._pages(shard)
+                page = next(pages, None)
+
+            while page is not None:
+                size = sink.write(page.items)
+                items = len(page.items)
+                written = size - shard["size"]
+                self.checkpoint.update(
+                    shard,
+                    cursor=page.next_cursor or shard["cursor"],
+                    offset=shard["offset"] + items,
+                    items=shard["items"] + items,
+                    size=size,
+                )
+                harvested += items
+                if self.progress is not None:
+                    self.progress.update(items, written)
+                if self.stopped:
+                    return harvested
+                page = next(pages, None)
+        finally:
+            sink.close()
+
+        self.checkpoint.update(shard, done=True)
+        if self.progress is not None:
+            self.progress.update(0, shard_done=True)
+        return harvested
+
+    def run(self) -> int:
+        """
+        Harvest the pending shards, returning the number of items harvested. The shards
+        that failed are left pending, with their ``(shard, exception)`` in `errors`.
+        """
+        if self._mirror is None:
+            Path(self.checkpoint.output).mkdir(parents=True, exist_ok=True)
+        self.checkpoint.save()
+        shards = ParallelMap(
+            self.harvest_shard,
+            self.checkpoint.pending,
+            workers=self.concurrency,
+            ordered=False,
+            errors="collect",
+        )
+        try:
+            harvested = sum(shards)
+        finally:
+            if self._mirror is not None:
+                self._mirror.close()
+            if self.progress is not None:
+                self.progress.close()
+        self.errors = shards.errors
+        return harvested
+
+
+def _filter(value: str) -> tuple[str, str]:
+    name, separator, argument = value.partition("=")
+    if not separator or not name:
+        msg = f"Filter specified as {value} but must be NAME=VALUE."
+        raise argparse.ArgumentTypeError(msg)
+    return name, argument
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="crossref-harvest",
+        description=__doc__.splitlines()[1],
+        epilog="Stopping the harvest with Ctrl-C saves the checkpoint after the pages"
+        " being written; a second Ctrl-C stops at once.",
+    )
+    query = parser.add_argument_group("query")
+    query.add_argument("endpoint", nargs="?", choices=ENDPOINTS, help="Omitted with --resume.")
+    query.add_argument("--context", default="", help="The parent route, e.g. members/98.")
+    query.add_argument(
+        "--filter",
+        type=_filter,
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="A filter of the route, e.g. from-index-date=2024-01-01. Repeatable.",
+    )
+    query.add_argument("--query", help="Free text query.")
+    query.add_argument("--select", help="Comma separated fields, e.g. DOI,title.")
+    query.add_argument("--sort", help="The sort field, e.g. indexed.")
+    query.add_argument("--order", choices=("asc", "desc"))
+    query.add_argument("--url", help="The request url, e.g. of a mirror of the API.")
+
+    sharding = parser.add_argument_group("sharding")
+    sharding.add_argument("--shard-by", metavar="FIELD", help="A date filter, e.g. index-date.")
+    sharding.add_argument("--since", type=date.fromisoformat, help="The first day, YYYY-MM-DD.")
+    sharding.add_argument(
+        "--until",
+        type=date.fromisoformat,
+        help="The last day, YYYY-MM-DD. Defaults to yesterday.",
+    )
+    sharding.add_argument("--shard-days", type=int, default=SHARD_DAYS)
+
+    harvest = parser.add_argument_group("harvest")
+    harvest.add_argument("--concurrency", type=int, default=1, help="Shards harvested at once.")
+    harvest.add_argument("--rows", type=int, default=MAX_ROWS, help="Items per page.")
+    harvest.add_argument(
+        "--retries", type=int, default=5, help="Retries of throttled and failed requests."
+    )
+    harvest.add_argument("--timeout", type=float, default=30)
+    harvest.add_argument("--mailto", help="The contact email sent to the API.")
+    harvest.add_argument(
+        "--plus-token",
+        default=os.environ.get("CROSSREF_PLUS_TOKEN"),
+        help="The Plus API token. Defaults to $CROSSREF_PLUS_TOKEN.",
+    )
+
+    output = parser.add_argument_group("output")
+    output.add_argument(
+        "--output", required=True, help="The output directory, or database for mirror."
+    )
+    output.add_argument(
+        "--format",
+        choices=FORMATS,
+        default=FORMATS[0],
+        help="NDJSON files (gzipped by default) or a Mirror database.",
+    )
+    output.add_argument(
+        "--checkpoint",
+        help=f"Defaults to {CHECKPOINT} in the output directory, or next to the database.",
+    )
+    output.add_argument("--resume", action="store_true", help="Continue the checkpointed harvest.")
+    output.add_argument("--quiet", action="store_true", help="Do not display the progress.")
+    return parser
+
+
+def build_query(args: argparse.Namespace) -> tuple[QuerySpec, list[QuerySpec]]:
+    """
+    Build the spec of the query given on the command line and the specs of its shards.
+    """
+    endpoint = ENDPOINTS[args.endpoint](context=args.context)
+    for name, value in args.filter:
+        endpoint = endpoint.filter(**{name.replace(".", "__").replace("-", "_"): value})
+    if args.query:
+        endpoint = endpoint.query(args.query)
+    if args.select:
+        endpoint = endpoint.select(args.select)
+    if args.sort:
+        endpoint = endpoint.sort(args.sort)
+    if args.order:
+        endpoint = endpoint.order(args.order)
+
+    # The endpoint methods build the default request url, so the given one comes last.
+    spec = dataclasses.replace(QuerySpec.from_endpoint(endpoint), url=args.url)
+    if not args.shard_by:
+        return spec, [spec]
+    if args.since is None:
+        msg = "--shard-by requires --since."
+        raise ValueError(msg)
+    until = args.until or date.today() - timedelta(days=1)  # noqa: DTZ011
+    shards = spec.shard_by_date(args.shard_by, args.since, until, args.shard_days)
+    query = spec.with_shard((args.shard_by, args.since.isoformat(), until.isoformat()))
+    return query, shards
+
+
+def load_checkpoint(args: argparse.Namespace) -> Checkpoint:
+    """
+    Create the checkpoint of a new harvest, or load the one to resume.
+    """
+    if args.format == "mirror":
+        path = args.checkpoint or f"{args.output}.checkpoint"
+    else:
+        path = args.checkpoint or Path(args.output) / CHECKPOINT
+    exists = Path(path).exists()
+
+    if args.resume:
+        if not exists:
+            msg = f"No checkpoint found at {path}."
+            raise ValueError(msg)
+        checkpoint = Checkpoint.load(path)
+        if args.endpoint and build_query(args)[0].to_dict() != checkpoint.query:
+            msg = f"The query differs from the one checkpointed at {path}."
+            raise ValueError(msg)
+        return checkpoint
+
+    if exists:
+        msg = f"A checkpoint exists at {path}: add --resume to continue that harvest."
+        raise ValueError(msg)
+    if not args.endpoint:
+        msg = "The endpoint is required unless resuming."
+        raise ValueError(msg)
+    if args.format == "mirror" and args.endpoint != "works":
+        msg = "The mirror format only stores works."
+        raise ValueError(msg)
+    query, shards = build_query(args)
+    return Checkpoint.create(path, query, shards, args.output, args.format)
+
+
+def _count(checkpoint: Checkpoint, **kwargs) -> int | None:
+    with contextlib.suppress(CrossrefAPIError, KeyError, OSError, TypeError, ValueError):
+        return QuerySpec.from_dict(checkpoint.query).to_endpoint(**kwargs).count()
+    return None
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.concurrency < 1 or not 0 < args.rows <= MAX_ROWS:
+        parser.error(f"--concurrency must be positive and --rows between 1 and {MAX_ROWS}.")
+    try:
+        checkpoint = load_checkpoint(args)
+    except ValueError as exc:  # UrlSyntaxError is a ValueError too.
+        parser.error(str(exc))
+
+    etiquette = Etiquette(
+        "crossref-harvest", crossref.VERSION, contact_email=args.mailto or "anonymous"
+    )
+    kwargs = {
+        "http_request": HTTPRequest(retries=args.retries, pool_maxsize=args.concurrency),
+        "etiquette": etiquette,
+        "crossref_plus_token": args.plus_token,
+        "timeout": args.timeout,
+    }
+    progress = None
+    if not args.quiet:
+        progress = Progress(
+            _count(checkpoint, **kwargs),
+            len(checkpoint.shards),
+            done=checkpoint.items,
+            shards_done=len(checkpoint.shards) - len(checkpoint.pending),
+        )
+    harvester = Harvester(
+        checkpoint, rows=args.rows, concurrency=args.concurrency, progress=progress, **kwargs
+    )
+
+    def interrupt(*_):
+        signal.signal(signal.SIGINT, previous)
+        harvester.stop()
+
+    previous = signal.signal(signal.SIGINT, interrupt)
+    try:
+        harvester.run()
+    finally:
+        signal.signal(signal.SIGINT, previous)
+        kwargs["http_request"].close()
+
+    for shard, exc in harvester.errors:
+        sys.stderr.write(f"Shard {shard['file']} failed: {exc}\n")
+    if harvester.errors or harvester.stopped:
+        sys.stderr.write(f"The harvest can be continued with --resume, see {checkpoint.path}.\n")
+        return INTERRUPTED if harvester.stopped else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+from array import array
+from collections.abc import Iterable, Iterator
+from functools import cache, lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+ROW_GROUP_SIZE: int = 100_000
+
+# The largest year, month and day the date part columns hold, and the bounds of the
+# count columns.
+DATE_PART_MAX = (2**16 - 1, 2**8 - 1, 2**8 - 1)
+COUNT_MAX = 2**63 - 1
+
+# The column kinds are "str" or an `array` typecode. Missing numbers are stored as -1
+# in the signed columns and as 0 in the date parts, and become nulls in Arrow.
+WORK_COLUMNS = (
+    ("work", "q"),
+    ("doi", "str"),
+    ("type", "str"),
+    ("member", "str"),
+    ("publisher", "str"),
+    ("container_title", "str"),
+    ("title", "str"),
+    ("issued_year", "H"),
+    ("issued_month", "B"),
+    ("issued_day", "B"),
+    ("published_year", "H"),
+    ("published_month", "B"),
+    ("published_day", "B"),
+    ("is_referenced_by_count", "q"),
+    ("references_count", "q"),
+    ("author_count", "i"),
+)
+
+AUTHOR_COLUMNS = (
+    ("work", "q"),
+    ("position", "i"),
+    ("given", "str"),
+    ("family", "str"),
+    ("name", "str"),
+    ("orcid", "str"),
+    ("sequence", "str"),
+)
+
+REFERENCE_COLUMNS = (
+    ("work", "q"),
+    ("position", "i"),
+    ("key", "str"),
+    ("doi", "str"),
+    ("doi_asserted_by", "str"),
+    ("year", "H"),
+    ("journal_title", "str"),
+)
+
+TABLES = {"works": WORK_COLUMNS, "authors": AUTHOR_COLUMNS, "references": REFERENCE_COLUMNS}
+
+
+def _first(values) -> str | None:
+    if isinstance(values, list):
+        return values[0] if values else None
+    return values
+
+
+def _date_parts(value: dict | None) -> tuple[int, int, int]:
+    """
+    Return the year, month and day of a Crossref date, 0 for the missing parts and for
+    the parts out of the range of their column (see `DATE_PART_MAX`).
+    """
+    parts = ((value or {}).get("date-parts") or [[]])[0] or []
+    parts = [
+        part if isinstance(part, int) and 0 <= part <= maximum else 0
+        for part, maximum in zip(parts[:3], DATE_PART_MAX, strict=False)
+    ]
+    return tuple(parts + [0] * (3 - len(parts)))
+
+
+def _count(value) -> int:
+    return value if isinstance(value, int) and 0 <= value <= COUNT_MAX else -1
+
+
+@lru_cache(maxsize=4096)
+def _year(value) -> int:
+    value = str(value or "")[:4]
+    return int(value) if value.isdigit() else 0
+
+
+class ColumnBuffer:
+    """
+    The growing columns of one table.
+
+    Numbers are appended to `array.array` buffers, which NumPy wraps without copying
+    them when the table is flushed, and strings to lists. Unlike buffering rows as
+    tuples, this creates no container per row for the garbage collector to track.
+    """
+
+    def __init__(self, columns: tuple):
+        self.columns = columns
+        self._reset()
+
+    def _reset(self):
+        self.buffers = [[] if kind == "str" else array(kind) for _, kind in self.columns]
+        self.appenders = [buffer.append for buffer in self.buffers]
+
+    def append(self, *row):
+        """
+        Append a row, or none of it: if a value does not fit its column, the values
+        already appended are removed before the error is raised.
+        """
+        appended = 0
+        try:
+            for append, value in zip(self.appenders, row, strict=True):
+                append(value)
+                appended += 1
+        except (OverflowError, TypeError, ValueError):
+            for buffer in self.buffers[:appended]:
+                buffer.pop()
+            raise
+
+    def __len__(self) -> int:
+        return len(self.buffers[0])
+
+    def flush(self) -> dict[str, "np.ndarray"]:
+        """
+        Return the columns as NumPy arrays and start new buffers.
+        """
+        import numpy as np  # noqa: PLC0415 - numpy is an optional dependency.
+
+        columns = {
+            name: np.array(buffer, dtype=object) if kind == "str" else np.frombuffer(buffer, kind)
+            for (name, kind), buffer in zip(self.columns, self.buffers, strict=True)
+        }
+        self._reset()
+        return columns
+
+
+class ColumnarBuilder:
+    """
+    Turn works into column tables, one row group at a time.
+
+    Each work adds a row to the ``works`` table and its authors and references to the
+    ``authors`` and ``references`` child tables, linked by the ``work`` column (the row
+    number of the work since the builder was created). Numbers and date parts are NumPy
+    arrays, strings are object arrays; see `WORK_COLUMNS`, `AUTHOR_COLUMNS` and
+    `REFERENCE_COLUMNS`.
+
+    Args:
+        row_group_size (int, optional): The number of works per row group. Defaults to
+            `ROW_GROUP_SIZE`.
+
+    Usage:
+        builder = ColumnarBuilder()
+        for tables in builder.build(Works().filter(member=98)):
+            years = tables["works"]["issued_year"]
+            counts = tables["works"]["is_referenced_by_count"]
+    """
+
+    def __init__(self, row_group_size: int = ROW_GROUP_SIZE):
+        self.row_group_size = row_group_size
+        self.tables = {name: ColumnBuffer(columns) for name, columns in TABLES.items()}
+        self.rows = 0
+
+    def add(self, item: dict):
+        """
+        Add a work, as returned by the API, to the current row group.
+        """
+        work = self.rows
+        authors = item.get("author") or []
+        issued = _date_parts(item.get("issued"))
+        published = _date_parts(item.get("published"))
+
+        self.tables["works"].append(
+            work,
+            item.get("DOI"),
+            item.get("type"),
+            item.get("member"),
+            item.get("publisher"),
+            _first(item.get("container-title")),
+            _first(item.get("title")),
+            *issued,
+            *published,
+            _count(item.get("is-referenced-by-count")),
+            _count(item.get("references-count")),
+            len(authors),
+        )
+
+        work_, position_, given, family, name, orcid, sequence = self.tables["authors"].appenders
+        for position, author in enumerate(authors):
+            get = author.get
+            work_(work)
+            position_(position)
+            given(get("given"))
+            family(get("family"))
+            name(get("name"))
+            orcid(get("ORCID"))
+            sequence(get("sequence"))
+
+        work_, position_, key, doi, asserted_by, year, journal = self.tables["references"].appenders
+        for position, reference in enumerate(item.get("reference") or ()):
+            get = reference.get
+            work_(work)
+            position_(position)
+            key(get("key"))
+            doi(get("DOI"))
+            asserted_by(get("doi-asserted-by"))
+            year(_year(get("year")))
+            journal(get("journal-title"))
+
+        self.rows += 1
+
+    def __len__(self) -> int:
+        return len(self.tables["works"])
+
+    def flush(self) -> dict[str, dict[str, "np.ndarray"]]:
+        """
+        Return the current row group as ``{table: {column: array}}`` and start a new one.
+        """
+        return {name: table.flush() for name, table in self.tables.items()}
+
+    def build(self, items: Iterable[dict]) -> Iterator[dict[str, dict[str, "np.ndarray"]]]:
+        """
+        Consume ``items`` and yield a row group every ``row_group_size`` works.
+        """
+        for item in items:
+            self.add(item)
+            if len(self) >= self.row_group_size:
+                yield self.flush()
+        if len(self):
+            yield self.flush()
+
+
+@cache
+def _pyarrow() -> tuple:
+    """
+    Import pyarrow and its Parquet module on first use, numpy and pyarrow being optional.
+    """
+    try:
+        import pyarrow as pa  # noqa: PLC0415
+        import pyarrow.parquet as pq  # noqa: PLC0415
+    except ImportError as exc:  # pragma: no cover - depends on the environment.
+        msg = "The Arrow and Parquet output requires pyarrow: pip install crossrefapi[columnar]"
+        raise ImportError(msg) from exc
+    return pa, pq
+
+
+def _arrow_type(kind: str):
+    pa, _ = _pyarrow()
+    return {
+        "str": pa.string(),
+        "q": pa.int64(),
+        "i": pa.int32(),
+        "H": pa.uint16(),
+        "B": pa.uint8(),
+    }[kind]
+
+
+def schema(table: str):
+    """
+    Return the Arrow schema of a table (``works``, ``authors`` or ``references``).
+    """
+    pa, _ = _pyarrow()
+    return pa.schema([(name, _arrow_type(kind)) for name, kind in TABLES[table]])
+
+
+def to_arrow(tables: dict[str, dict[str, "np.ndarray"]]) -> dict:
+    """
+    Convert a row group yielded by `ColumnarBuilder` to Arrow tables.
+    """
+    pa, _ = _pyarrow()
+    arrow_tables = {}
+    for name, columns in tables.items():
+        arrays = []
+        for column, kind in TABLES[name]:
+            values = columns[column]
+            if kind == "str":
+                arrays.append(pa.array(values, type=pa.string()))
+            else:
+                mask = values == 0 if kind in "HB" else values < 0
+                arrays.append(pa.array(values, type=_arrow_type(kind), mask=mask))
+        arrow_tables[name] = pa.Table.from_arrays(arrays, schema=schema(name))
+    return arrow_tables
+
+
+def write_parquet(
+    items: Iterable[dict],
+    directory: str | Path,
+    row_group_size: int = ROW_GROUP_SIZE,
+    compression: str = "zstd",
+) -> dict[str, int]:
+    """
+    Write works to ``works.parquet``, ``authors.parquet`` and ``references.parquet``.
+
+    The works are consumed as they come and written one row group at a time, so the
+    memory used is bounded by ``row_group_size`` whatever the size of the harvest.
+
+    Args:
+        items (Iterable[dict]): The works, e.g. ``Works().filter(...)``.
+        directory (str | Path): The output directory, created if needed.
+        row_group_size (int, optional): The number of works per row group. Defaults to
+            `ROW_GROUP_SIZE`.
+        compression (str, optional): The Parquet compression codec. Defaults to "zstd".
+
+    Returns:
+        dict[str, int]: The number of rows written to each table.
+    """
+    _, pq = _pyarrow()
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    writers = {
+        name: pq.ParquetWriter(directory / f"{name}.parquet", schema(name), compression=compression)
+        for name in TABLES
+    }
+    rows = dict.fromkeys(TABLES, 0)
+    try:
+        for tables in ColumnarBuilder(row_group_size).build(items):
+            for name, table in to_arrow(tables).items():
+                writers[name].write_table(table, row_group_size=max(len(table), 1))
+                rows[name] += len(table)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return rows
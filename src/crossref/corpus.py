@@ -0,0 +1,165 @@
+"""
+Synthetic work records shaped like the ones the Crossref API returns.
+"""
+
+import random
+
+PUBLISHERS = (
+    "Elsevier BV",
+    "Springer Science and Business Media LLC",
+    "Wiley",
+    "FapUNIFESP (SciELO)",
+    "Informa UK Limited",
+    "IEEE",
+)
+TYPES = ("journal-article", "book-chapter", "proceedings-article", "posted-content", "dataset")
+WORDS = (
+    "analysis",
+    "data",
+    "model",
+    "virus",
+    "health",
+    "clinical",
+    "study",
+    "cell",
+    "protein",
+    "network",
+    "learning",
+    "system",
+    "effect",
+    "patients",
+    "water",
+    "surface",
+    "energy",
+    "growth",
+    "brazil",
+    "human",
+    "method",
+    "structure",
+)
+
+
+def _title(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _date_parts(rng: random.Random) -> dict:
+    year, month, day = rng.randint(1950, 2025), rng.randint(1, 12), rng.randint(1, 28)
+    return {"date-parts": [[year, month, day]]}
+
+
+def _timestamp(rng: random.Random) -> dict:
+    year, month, day = rng.randint(2000, 2025), rng.randint(1, 12), rng.randint(1, 28)
+    return {
+        "date-parts": [[year, month, day]],
+        "date-time": f"{year}-{month:02d}-{day:02d}T10:20:30Z",
+        "timestamp": rng.randint(10**12, 2 * 10**12),
+    }
+
+
+def synthetic_work(index: int, references: int = 30, seed: int = 0) -> dict:
+    """
+    Build a deterministic work record with ``references`` reference entries.
+    """
+    rng = random.Random(seed * 1_000_003 + index)  # noqa: S311
+    member = rng.randint(1, 30000)
+    prefix = f"10.{member + 1000}"
+    doi = f"{prefix}/synthetic.{index}"
+    issn = f"{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}"
+    orcid = f"https://orcid.org/0000-000{rng.randint(1, 9)}-{rng.randint(1000, 9999)}-0000"
+    return {
+        "indexed": _timestamp(rng),
+        "reference-count": references,
+        "publisher": rng.choice(PUBLISHERS),
+        "issue": str(rng.randint(1, 12)),
+        "license": [
+            {
+                "start": _timestamp(rng),
+                "content-version": "vor",
+                "delay-in-days": 0,
+                "URL": "https://creativecommons.org/licenses/by/4.0/",
+            }
+        ],
+        "content-domain": {"domain": [], "crossmark-restriction": False},
+        "short-container-title": [_title(rng, 2)],
+        "abstract": f"<jats:p>{_title(rng, 80)}</jats:p>",
+        "DOI": doi,
+        "type": rng.choice(TYPES),
+        "created": _timestamp(rng),
+        "page": f"{rng.randint(1, 500)}-{rng.randint(501, 900)}",
+        "source": "Crossref",
+        "is-referenced-by-count": rng.randint(0, 5000),
+        "title": [_title(rng, rng.randint(6, 16))],
+        "prefix": prefix,
+        "volume": str(rng.randint(1, 90)),
+        "author": [
+            {
+                "ORCID": orcid,
+                "authenticated-orcid": False,
+                "given": rng.choice(("Maria", "João", "Wei", "Anna", "Ahmed", "Olga")),
+                "family": rng.choice(("Silva", "Zhang", "Müller", "Kowalski", "Haddad")),
+                "sequence": "first" if position == 0 else "additional",
+                "affiliation": [{"name": _title(rng, 5)}],
+            }
+            for position in range(rng.randint(1, 8))
+        ],
+        "member": str(member),
+        "reference": [
+            {
+                "key": f"{doi}_ref{position}",
+                "doi-asserted-by": "crossref",
+                "first-page": str(rng.randint(1, 900)),
+                "DOI": f"10.{rng.randint(1000, 9999)}/ref.{rng.randint(1, 10**6)}",
+                "volume": str(rng.randint(1, 90)),
+                "author": rng.choice(WORDS).capitalize(),
+                "year": str(rng.randint(1950, 2025)),
+                "journal-title": _title(rng, 3),
+            }
+            for position in range(references)
+        ],
+        "container-title": [_title(rng, 4)],
+        "original-title": [],
+        "language": "en",
+        "link": [
+            {
+                "URL": f"https://example.org/{doi}.pdf",
+                "content-type": "application/pdf",
+                "content-version": "vor",
+                "intended-application": "text-mining",
+            }
+        ],
+        "deposited": _timestamp(rng),
+        "score": 1,
+        "resource": {"primary": {"URL": f"https://example.org/{doi}"}},
+        "subtitle": [],
+        "short-title": [],
+        "issued": _date_parts(rng),
+        "references-count": references,
+        "journal-issue": {"issue": str(rng.randint(1, 12)), "published-print": _date_parts(rng)},
+        "alternative-id": [doi.split("/")[1]],
+        "URL": f"https://doi.org/{doi}",
+        "relation": {},
+        "ISSN": [issn],
+        "issn-type": [{"type": "electronic", "value": issn}],
+        "subject": [],
+        "published": _date_parts(rng),
+    }
+
+
+def synthetic_page(size: int, start: int = 0, references: int = 30) -> dict:
+    """
+    Build a cursor page response with ``size`` synthetic works.
+    """
+    return {
+        "status": "ok",
+        "message-type": "work-list",
+        "message-version": "1.0.0",
+        "message": {
+            "facets": {},
+            "next-cursor": f"DnF1ZXJ5VGhlbkZldGNo{start + size}",
+            "total-results": 10**6,
+            "items": [synthetic_work(start + i, references) for i in range(size)],
+            "items-per-page": size,
+            "query": {"start-index": 0, "search-terms": None},
+        },
+    }
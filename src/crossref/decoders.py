@@ -0,0 +1,66 @@
+import importlib
+import json
+from collections.abc import Callable
+from functools import cache
+from typing import Any
+
+Decoder = Callable[[bytes], Any]
+
+# The optional decoders, imported on first use: importing orjson takes longer than
+# importing the whole client.
+OPTIONAL = ("orjson", "ujson")
+
+# From the fastest to the slowest, the first one installed is the default decoder.
+PREFERENCE = ("orjson", "ujson", "json")
+
+
+@cache
+def installed() -> dict[str, Decoder]:
+    """
+    Return the decoders installed by name, importing the optional ones.
+    """
+    decoders = {"json": json.loads}
+    for name in OPTIONAL:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:  # pragma: no cover - depends on the environment.
+            continue
+        decoders[name] = module.loads
+    return decoders
+
+
+def __getattr__(name: str):
+    if name == "DECODERS":
+        return installed()
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+def get_decoder(decoder: str | Decoder | None = None) -> Decoder:
+    """
+    Return the function used to decode the JSON responses.
+
+    Args:
+        decoder (str | Callable | None, optional): The name of a decoder in
+            `DECODERS` ("json", "orjson" or "ujson" when installed), or a function
+            taking the body of a response as bytes. Defaults to the fastest decoder
+            installed, falling back to the standard library.
+
+    Returns:
+        Callable: A function decoding bytes into Python objects.
+
+    Raises:
+        ValueError: If the decoder is unknown or not installed.
+    """
+    decoders = installed()
+    if decoder is None:
+        return next(decoders[name] for name in PREFERENCE if name in decoders)
+
+    if callable(decoder):
+        return decoder
+
+    if decoder not in decoders:
+        msg = "Decoder specified as {} but must be one of: {}".format(decoder, ", ".join(decoders))
+        raise ValueError(msg)
+
+    return decoders[decoder]
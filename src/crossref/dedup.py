@@ -0,0 +1,307 @@
+import math
+import struct
+from array import array
+from collections.abc import Callable, Iterable, Iterator
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any
+
+# The fraction of the slots of a `DigestSet` that may be used before it grows.
+MAX_LOAD: float = 2 / 3
+
+_HEADER = struct.Struct("<4sQQQ")
+
+
+def digest(doi: str) -> int:
+    """
+    Return the 64 bits digest of a DOI. DOIs are case insensitive, so it is computed on
+    the lower-cased DOI. The digest is never 0, which marks the empty slots.
+    """
+    value = int.from_bytes(blake2b(doi.strip().lower().encode(), digest_size=8).digest(), "little")
+    return value or 1
+
+
+def _save(path: str | Path, magic: bytes, fields: tuple, data: array | bytearray):
+    """
+    Write the file next to its final path first, so an interrupted save never leaves a
+    truncated file behind.
+    """
+    path = Path(path)
+    temporary = path.with_name(f".{path.name}.tmp")
+    with temporary.open("wb") as output:
+        output.write(_HEADER.pack(magic, *fields))
+        output.write(data)
+    temporary.replace(path)
+
+
+class DigestSet:
+    """
+    A set of DOIs stored as 64 bits digests in an open addressing hash table.
+
+    Each DOI takes 8 to 16 bytes (an `array` slot and the free slots kept for fast
+    lookups) instead of the 100 bytes and more of a Python string in a `set`. Two DOIs
+    are only confused if their digests collide, with a probability of about
+    ``n ** 2 / 2 ** 65`` for ``n`` DOIs (less than one in a thousand for 100 million).
+
+    Args:
+        capacity (int, optional): The number of DOIs expected, to avoid growing the
+            table while adding them. Defaults to 1024.
+    """
+
+    MAGIC = b"CRDS"
+
+    def __init__(self, capacity: int = 1024):
+        size = 8
+        while size * MAX_LOAD < capacity:
+            size *= 2
+        self._slots = array("Q")
+        self._resize(size)
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._slots) * self._slots.itemsize
+
+    def _resize(self, size: int):
+        old = self._slots
+        slots = self._slots = array("Q", bytes(8 * size))
+        mask = self._mask = size - 1
+        self._limit = int(size * MAX_LOAD)
+        for value in old:
+            if value:
+                index = value & mask
+                while slots[index]:
+                    index = (index + 1) & mask
+                slots[index] = value
+
+    def _grow(self):
+        self._resize(2 * len(self._slots))
+
+    def add_digest(self, value: int) -> bool:
+        """
+        Add a digest, returning False if it was already in the set.
+        """
+        if self._len >= self._limit:
+            self._grow()
+        slots = self._slots
+        mask = self._mask
+        index = value & mask
+        while current := slots[index]:
+            if current == value:
+                return False
+            index = (index + 1) & mask
+        slots[index] = value
+        self._len += 1
+        return True
+
+    def add(self, doi: str) -> bool:
+        """
+        Add a DOI, returning False if it was already in the set.
+        """
+        return self.add_digest(digest(doi))
+
+    def __contains__(self, doi: str) -> bool:
+        value = digest(doi)
+        slots = self._slots
+        mask = self._mask
+        index = value & mask
+        while current := slots[index]:
+            if current == value:
+                return True
+            index = (index + 1) & mask
+        return False
+
+    def save(self, path: str | Path):
+        _save(path, self.MAGIC, (len(self._slots), self._len, 0), self._slots)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "DigestSet":
+        with Path(path).open("rb") as source:
+            size, length, _ = _read_header(source, cls.MAGIC)
+            digests = cls(capacity=0)
+            digests._slots = array("Q")
+            digests._slots.fromfile(source, size)
+        digests._mask = size - 1
+        digests._limit = int(size * MAX_LOAD)
+        digests._len = length
+        return digests
+
+
+class BloomFilter:
+    """
+    A Bloom filter of DOIs with a configurable false positive rate.
+
+    It takes ``-capacity * ln(error_rate) / ln(2) ** 2`` bits, about 1.8 bytes per DOI
+    for a 0.1% rate, whatever the length of the DOIs. There are no false negatives, but
+    a new DOI is reported as already seen with a probability of ``error_rate`` once the
+    filter holds ``capacity`` DOIs, and more beyond.
+
+    Args:
+        capacity (int): The number of DOIs expected.
+        error_rate (float, optional): The false positive rate at capacity. Defaults to
+            0.001.
+    """
+
+    MAGIC = b"CRBF"
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if not 0 < error_rate < 1:
+            msg = f"Error rate specified as {error_rate!s} but must be in (0, 1)."
+            raise ValueError(msg)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / max(capacity, 1) * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._len = 0
+
+    def __len__(self) -> int:
+        """
+        The number of DOIs added, not counting the ones taken for false positives.
+        """
+        return self._len
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+    @property
+    def error_rate(self) -> float:
+        """
+        The estimated false positive rate with the DOIs added so far.
+        """
+        return (1 - math.exp(-self.hashes * self._len / self.size)) ** self.hashes
+
+    def _positions(self, doi: str) -> list[int]:
+        """
+        Return the bit positions of a DOI, with double hashing.
+        """
+        value = int.from_bytes(
+            blake2b(doi.strip().lower().encode(), digest_size=16).digest(), "little"
+        )
+        size = self.size
+        # Reduce the hashes first so the loop only handles small integers.
+        position = (value & 0xFFFFFFFFFFFFFFFF) % size
+        step = ((value >> 64) | 1) % size
+        positions = []
+        for _ in range(self.hashes):
+            positions.append(position)
+            position += step
+            if position >= size:
+                position -= size
+        return positions
+
+    def add(self, doi: str) -> bool:
+        """
+        Add a DOI, returning False if it was (probably) already in the filter.
+        """
+        bits = self._bits
+        new = False
+        for position in self._positions(doi):
+            byte = position >> 3
+            mask = 1 << (position & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        self._len += new
+        return new
+
+    def __contains__(self, doi: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(doi))
+
+    def save(self, path: str | Path):
+        _save(path, self.MAGIC, (self.size, self.hashes, self._len), self._bits)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "BloomFilter":
+        with Path(path).open("rb") as source:
+            size, hashes, length = _read_header(source, cls.MAGIC)
+            bloom = cls(capacity=1)
+            bloom._bits = bytearray(source.read())
+        if len(bloom._bits) != (size + 7) // 8:
+            msg = f"Truncated Bloom filter file: {path!s}"
+            raise ValueError(msg)
+        bloom.size = size
+        bloom.hashes = hashes
+        bloom._len = length
+        return bloom
+
+
+def _read_header(source, magic: bytes) -> tuple:
+    header = source.read(_HEADER.size)
+    if len(header) != _HEADER.size or header[:4] != magic:
+        msg = f"Not a {magic.decode()} file: {source.name!s}"
+        raise ValueError(msg)
+    return _HEADER.unpack(header)[1:]
+
+
+def load(path: str | Path) -> DigestSet | BloomFilter:
+    """
+    Load a `DigestSet` or a `BloomFilter` saved with their ``save`` method.
+    """
+    with Path(path).open("rb") as source:
+        magic = source.read(4)
+    for cls in (DigestSet, BloomFilter):
+        if magic == cls.MAGIC:
+            return cls.load(path)
+    msg = f"Not a DigestSet or BloomFilter file: {path!s}"
+    raise ValueError(msg)
+
+
+class Deduplicator:
+    """
+    Drop the items whose DOI was already seen, e.g. across the shards of a harvest or
+    the overlapping windows of incremental syncs.
+
+    Args:
+        seen (DigestSet | BloomFilter, optional): The DOIs already seen, for instance
+            loaded from the previous run. Defaults to an empty `DigestSet`.
+        key (str | Callable, optional): The field holding the DOI, or a function
+            returning it (e.g. ``lambda item: raw_field(item, "DOI")`` for raw items).
+            Items without DOI are kept. Defaults to "DOI".
+
+    Attributes:
+        unique (int): The number of items kept.
+        duplicates (int): The number of items dropped.
+
+    Usage:
+        dedup = Deduplicator(load("seen.bin") if os.path.exists("seen.bin") else None)
+        for spec in shards:
+            for item in dedup.filter(spec.iterate()):
+                save(item)
+        dedup.seen.save("seen.bin")
+    """
+
+    def __init__(
+        self,
+        seen: DigestSet | BloomFilter | None = None,
+        key: str | Callable[[Any], str | None] = "DOI",
+    ):
+        self.seen = seen if seen is not None else DigestSet()
+        self.key = key
+        self.unique = 0
+        self.duplicates = 0
+
+    def _doi(self, item: Any) -> str | None:
+        if callable(self.key):
+            return self.key(item)
+        return item.get(self.key)
+
+    def filter(self, items: Iterable) -> Iterator:
+        add = self.seen.add
+        for item in items:
+            doi = self._doi(item)
+            if doi is None or add(doi):
+                self.unique += 1
+                yield item
+            else:
+                self.duplicates += 1
+
+
+def dedup(items: Iterable, **kwargs) -> Iterator:
+    """
+    Shortcut to `Deduplicator.filter`, see `Deduplicator` for the arguments.
+    """
+    return Deduplicator(**kwargs).filter(items)
@@ -0,0 +1,548 @@
+import json
+import random
+import threading
+from collections import Counter, deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic, sleep
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlparse
+
+from crossref.corpus import synthetic_work
+from crossref.restful import FACETS_MAX_LIMIT, MAX_OFFSET, MAX_SAMPLE_SIZE
+
+MAX_ROWS: int = 1000
+DEFAULT_ROWS: int = 20
+
+# The resources served besides the works.
+RESOURCES = ("journals", "members", "funders", "prefixes", "types")
+
+
+def _date(work: dict, field: str) -> tuple:
+    parts = (work.get(field) or {}).get("date-parts") or [[]]
+    return tuple(part for part in parts[0] if part is not None)
+
+
+def _parse_date(value: str) -> tuple:
+    return tuple(int(part) for part in value.split("-"))
+
+
+def _bool(value: str) -> bool:
+    return value.lower() in ("true", "1", "t")
+
+
+def _funders(work: dict) -> list[dict]:
+    return work.get("funder") or []
+
+
+def _funder_id(funder: dict) -> str:
+    return (funder.get("DOI") or "").rsplit("/", 1)[-1]
+
+
+# The filters honored, as predicates of a work and the filter value. The others are
+# ignored.
+FILTERS: dict[str, Callable[[dict, str], bool]] = {
+    "doi": lambda work, value: work.get("DOI", "").lower() == value.lower(),
+    "member": lambda work, value: work.get("member") == value,
+    "prefix": lambda work, value: work.get("DOI", "").startswith(f"{value}/"),
+    "type": lambda work, value: work.get("type") == value,
+    "issn": lambda work, value: value in (work.get("ISSN") or []),
+    "container-title": lambda work, value: value in (work.get("container-title") or []),
+    "funder": lambda work, value: any(_funder_id(f) == value for f in _funders(work)),
+    "has-abstract": lambda work, value: ("abstract" in work) == _bool(value),
+    "has-references": lambda work, value: bool(work.get("reference")) == _bool(value),
+    "has-funder": lambda work, value: bool(_funders(work)) == _bool(value),
+    "has-orcid": lambda work, value: (
+        any("ORCID" in author for author in work.get("author") or []) == _bool(value)
+    ),
+    "from-pub-date": lambda work, value: _date(work, "issued") >= _parse_date(value),
+    "until-pub-date": lambda work, value: (
+        _date(work, "issued")[: len(_parse_date(value))] <= _parse_date(value)
+    ),
+    "from-index-date": lambda work, value: _date(work, "indexed") >= _parse_date(value),
+    "until-index-date": lambda work, value: (
+        _date(work, "indexed")[: len(_parse_date(value))] <= _parse_date(value)
+    ),
+}
+
+# The facets computed, as functions returning the values of a work.
+FACETS: dict[str, Callable[[dict], list]] = {
+    "type-name": lambda work: [work["type"]] if "type" in work else [],
+    "publisher-name": lambda work: [work["publisher"]] if "publisher" in work else [],
+    "container-title": lambda work: work.get("container-title") or [],
+    "issn": lambda work: work.get("ISSN") or [],
+    "published": lambda work: [str(_date(work, "issued")[0])] if _date(work, "issued") else [],
+    "license": lambda work: [item["URL"] for item in work.get("license") or []],
+    "funder-name": lambda work: [funder.get("name") for funder in _funders(work)],
+    "orcid": lambda work: [a["ORCID"] for a in work.get("author") or [] if "ORCID" in a],
+}
+
+
+def _words(work: dict) -> str:
+    names = " ".join(
+        f"{author.get('given', '')} {author.get('family', '')}"
+        for author in work.get("author") or []
+    )
+    issued = _date(work, "issued")
+    return " ".join(
+        (
+            *(work.get("title") or []),
+            *(work.get("container-title") or []),
+            names,
+            str(issued[0]) if issued else "",
+        )
+    ).lower()
+
+
+def derive_resources(works: Iterable[dict]) -> dict[str, dict[str, dict]]:
+    """
+    Build the records of the journals, members, funders, prefixes and types of the
+    works, by identifier, to serve them along.
+    """
+    resources = {name: {} for name in RESOURCES}
+    for work in works:
+        prefix = work.get("DOI", "").split("/", 1)[0]
+        if work.get("member"):
+            member = resources["members"].setdefault(
+                work["member"],
+                {"id": int(work["member"]), "primary-name": work.get("publisher"), "prefixes": []},
+            )
+            if prefix not in member["prefixes"]:
+                member["prefixes"].append(prefix)
+        if prefix:
+            resources["prefixes"].setdefault(
+                prefix,
+                {"member": f"http://id.crossref.org/member/{work.get('member')}", "prefix": prefix},
+            )
+            resources["prefixes"][prefix]["name"] = work.get("publisher")
+        for issn in work.get("ISSN") or []:
+            resources["journals"].setdefault(
+                issn,
+                {
+                    "title": (work.get("container-title") or [None])[0],
+                    "publisher": work.get("publisher"),
+                    "ISSN": work.get("ISSN"),
+                    "issn-type": work.get("issn-type", []),
+                },
+            )
+        if work.get("type"):
+            resources["types"].setdefault(work["type"], {"id": work["type"], "label": work["type"]})
+        for funder in _funders(work):
+            if _funder_id(funder):
+                resources["funders"].setdefault(
+                    _funder_id(funder),
+                    {"id": _funder_id(funder), "name": funder.get("name"), "uri": funder["DOI"]},
+                )
+    return resources
+
+
+# How the works of a resource are found, e.g. for ``/members/{id}/works``.
+RESOURCE_FILTERS = {
+    "journals": "issn",
+    "members": "member",
+    "funders": "funder",
+    "prefixes": "prefix",
+    "types": "type",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Faults:
+    """
+    The faults injected by a `FakeCrossref` server.
+
+    Attributes:
+        latency (float): The seconds waited before each response.
+        jitter (float): A random extra latency, up to that many seconds.
+        error_rate (float): The share of the requests answered with ``error_status``.
+        error_status (int): The status of the injected errors. Defaults to 503.
+        throttle_rate (float): The share of the requests answered with a 429.
+        retry_after (int): The Retry-After header of the 429 and 503 responses.
+        cursor_ttl (float | None): The seconds a deep paging cursor stays valid after
+            its last use; an expired cursor is answered with a 400. Defaults to
+            never expiring.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    throttle_rate: float = 0.0
+    retry_after: int = 0
+    cursor_ttl: float | None = None
+
+
+class FakeCrossref:
+    """
+    A local stand-in for the Crossref REST API, to test and load test harvesters.
+
+    The server answers the routes the library uses, from a corpus of works:
+
+    * ``/works``, with ``rows``, ``offset``, ``cursor`` deep paging, ``filter`` (the
+      `FILTERS`), ``select``, ``facet`` (the `FACETS`), ``sample`` and ``query``
+      (the works having every word of the query and of the ``query.*`` fields in
+      their title, container title, authors or year). Other parameters are ignored
+      and the results are in corpus order.
+    * ``/works/{doi}`` and ``/works/{doi}/agency``.
+    * ``/journals``, ``/members``, ``/funders``, ``/prefixes`` and ``/types``, their
+      records (by default `derive_resources`) and their works.
+    * HEAD requests for the existence checks. Anything else is a 404.
+
+    The responses carry the ``x-rate-limit-limit``, ``x-rate-limit-interval`` and
+    ``x-concurrency-limit`` headers; with ``enforce_rate_limit``, the requests over
+    the limit are answered with a 429. `Faults` adds latency, errors, throttling and
+    cursor expiry. Random faults are drawn from a generator seeded with ``seed``.
+    The cursors are the offsets of the next pages, as strings.
+
+    Args:
+        works (Iterable[dict], optional): The corpus, e.g. recorded works or a
+            `crossref.snapshot.Snapshot`. Defaults to ``size`` synthetic works (see
+            `crossref.corpus.synthetic_work`).
+        size (int, optional): The number of synthetic works. Defaults to 1000.
+        seed (int, optional): The seed of the synthetic works and of the random
+            faults. Defaults to 0.
+        faults (Faults, optional): The faults injected. Defaults to none.
+        rate_limit (int, optional): The requests allowed per interval. Defaults to 50.
+        rate_limit_interval (int, optional): The interval, in seconds. Defaults to 1.
+        concurrency_limit (int, optional): The concurrency limit advertised.
+            Defaults to 5.
+        enforce_rate_limit (bool, optional): Answer the requests over the rate limit
+            with a 429. Defaults to False.
+        resources (dict, optional): The records of the other resources, by resource
+            and identifier. Defaults to `derive_resources` of the works.
+        host (str, optional): Defaults to "127.0.0.1".
+        port (int, optional): Defaults to a free port.
+
+    Attributes:
+        statuses (Counter): The number of responses by status.
+
+    Usage:
+        with FakeCrossref(size=10_000, faults=Faults(latency=0.2, error_rate=0.01)) as api:
+            works = Works(request_url=f"{api.url}/works")
+            harvest(works)
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        works: Iterable[dict] | None = None,
+        *,
+        size: int = 1000,
+        seed: int = 0,
+        faults: Faults | None = None,
+        rate_limit: int = 50,
+        rate_limit_interval: int = 1,
+        concurrency_limit: int = 5,
+        enforce_rate_limit: bool = False,
+        resources: dict[str, Any] | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        if works is None:
+            works = (synthetic_work(index, seed=seed) for index in range(size))
+        self.works = list(works)
+        self.faults = faults or Faults()
+        self.rate_limit = rate_limit
+        self.rate_limit_interval = rate_limit_interval
+        self.concurrency_limit = concurrency_limit
+        self.enforce_rate_limit = enforce_rate_limit
+        self.resources = resources if resources is not None else derive_resources(self.works)
+        self.statuses = Counter()
+        self.host = host
+        self.port = port
+        self.server = None
+        self._dois = {work.get("DOI", "").lower(): work for work in self.works}
+        self._encoded = [None] * len(self.works)
+        self._random = random.Random(seed)  # noqa: S311 - not for security.
+        self._recent = deque()
+        self._cursors = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """
+        The base URL of the running server, e.g. ``f"{api.url}/works"``.
+        """
+        return f"http://{self.host}:{self.server.server_address[1]}"
+
+    def start(self) -> "FakeCrossref":
+        """
+        Serve from a daemon thread.
+        """
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # The headers and the body are written separately: without this, small
+            # responses wait for the delayed acknowledgement of the client.
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _answer(self, head: bool):
+                status, headers, body = fake.handle(self.command, self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("content-length", str(len(body)))
+                self.end_headers()
+                if not head:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._answer(head=False)
+
+            def do_HEAD(self):
+                self._answer(head=True)
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self) -> "FakeCrossref":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def handle(self, method: str, path: str) -> tuple[int, dict, bytes]:
+        """
+        Answer a request, as ``(status, headers, body)``, waiting for the latency.
+        """
+        faults = self.faults
+        with self._lock:
+            now = monotonic()
+            self._recent.append(now)
+            while self._recent and self._recent[0] <= now - self.rate_limit_interval:
+                self._recent.popleft()
+            over_limit = self.enforce_rate_limit and len(self._recent) > self.rate_limit
+            draw = self._random.random()
+            delay = faults.latency + faults.jitter * self._random.random()
+        if delay:
+            sleep(delay)
+
+        headers = {
+            "x-rate-limit-limit": str(self.rate_limit),
+            "x-rate-limit-interval": f"{self.rate_limit_interval}s",
+            "x-concurrency-limit": str(self.concurrency_limit),
+        }
+        if over_limit or draw < faults.throttle_rate:
+            status, body = 429, b"Rate limit exceeded."
+            headers["retry-after"] = str(faults.retry_after)
+        elif method.upper() not in ("GET", "HEAD"):
+            status, body = 405, b"Method not allowed."
+        elif draw < faults.throttle_rate + faults.error_rate:
+            status, body = faults.error_status, b"Service unavailable."
+            headers["retry-after"] = str(faults.retry_after)
+        else:
+            url = urlparse(path)
+            status, body = self._route(
+                [unquote(s) for s in url.path.split("/") if s], parse_qs(url.query)
+            )
+        headers["content-type"] = (
+            "application/json" if body.startswith(b"{") else "text/plain;charset=utf-8"
+        )
+        with self._lock:
+            self.statuses[status] += 1
+        return status, headers, body
+
+    def _route(self, segments: list[str], query: dict) -> tuple[int, bytes]:  # noqa: PLR0911
+        if not segments or (segments[0] != "works" and segments[0] not in self.resources):
+            return 404, b"Resource not found."
+        resource = segments[0]
+        params = {name: values[-1] for name, values in query.items()}
+
+        if len(segments) == 1:
+            if resource == "works":
+                return self._list(self.works, params, "work-list")
+            records = list(self.resources[resource].values())
+            return self._list(records, params, f"{resource[:-1]}-list", works=False)
+
+        if resource == "works" and segments[-1] == "agency" and len(segments) > 2:  # noqa: PLR2004
+            doi = "/".join(segments[1:-1])
+            if doi.lower() not in self._dois:
+                return 404, b"Resource not found."
+            agency = {"DOI": doi, "agency": {"id": "crossref", "label": "Crossref"}}
+            return 200, self._envelope("work-agency", agency)
+
+        if resource != "works" and segments[-1] == "works" and len(segments) > 2:  # noqa: PLR2004
+            identifier = "/".join(segments[1:-1])
+            if identifier not in self.resources[resource]:
+                return 404, b"Resource not found."
+            predicate = FILTERS[RESOURCE_FILTERS[resource]]
+            works = [work for work in self.works if predicate(work, identifier)]
+            return self._list(works, params, "work-list")
+
+        identifier = "/".join(segments[1:])
+        if resource == "works":
+            record = self._dois.get(identifier.lower())
+        else:
+            record = self.resources[resource].get(identifier)
+        if record is None:
+            return 404, b"Resource not found."
+        return 200, self._envelope(resource[:-1] if resource != "works" else "work", record)
+
+    @staticmethod
+    def _envelope(message_type: str, message: Any) -> bytes:
+        return json.dumps(
+            {
+                "status": "ok",
+                "message-type": message_type,
+                "message-version": "1.0.0",
+                "message": message,
+            },
+            ensure_ascii=False,
+        ).encode()
+
+    @staticmethod
+    def _failure(message: str) -> tuple[int, bytes]:
+        failure = {
+            "status": "failed",
+            "message-type": "validation-failure",
+            "message": [{"type": "parameter-not-allowed", "message": message}],
+        }
+        return 400, json.dumps(failure).encode()
+
+    def _matches(self, records: list[dict], params: dict) -> list[tuple[int, dict]]:
+        matches = list(enumerate(records))
+        # Like the API, the filters of different names must all match and the values of
+        # a name are alternatives.
+        filters = {}
+        for fltr in params.get("filter", "").split(","):
+            name, _, value = fltr.partition(":")
+            if name in FILTERS:
+                filters.setdefault(name, []).append(value)
+        for name, values in filters.items():
+            predicate = FILTERS[name]
+            matches = [(i, work) for i, work in matches if any(predicate(work, v) for v in values)]
+        terms = [
+            value for name, value in params.items() if name == "query" or name.startswith("query.")
+        ]
+        words = " ".join(terms).lower().split()
+        if words:
+            matches = [(i, work) for i, work in matches if all(w in _words(work) for w in words)]
+        return matches
+
+    @staticmethod
+    def _paging(params: dict) -> tuple[int, int, int | None]:
+        """
+        Return the ``rows``, ``offset`` and ``sample`` of a list request.
+
+        Raises:
+            ValueError: With the validation failure message.
+        """
+        try:
+            rows = int(params.get("rows", DEFAULT_ROWS))
+            offset = int(params.get("offset", 0))
+            sample = int(params["sample"]) if "sample" in params else None
+        except ValueError:
+            msg = "Rows, offset and sample must be integers."
+            raise ValueError(msg) from None
+        if min(rows, offset, sample or 0) < 0:
+            msg = "Rows, offset and sample must not be negative."
+            raise ValueError(msg)
+        if rows > MAX_ROWS:
+            msg = f"Rows specified as {rows} but must be at most {MAX_ROWS}."
+            raise ValueError(msg)
+        if offset > MAX_OFFSET:
+            msg = f"Offset specified as {offset} but must be at most {MAX_OFFSET}."
+            raise ValueError(msg)
+        return rows, offset, sample
+
+    def _facets(self, matches: list[tuple[int, dict]], facet: str) -> dict:
+        facets = {}
+        for spec in facet.split(","):
+            name, _, limit = spec.partition(":")
+            if name not in FACETS:
+                continue
+            if limit not in ("", "*") and not limit.isdigit():
+                msg = f"Facet limit specified as {limit} but must be an integer or *."
+                raise ValueError(msg)
+            counts = Counter(value for _, work in matches for value in FACETS[name](work))
+            limit = FACETS_MAX_LIMIT if limit in ("", "*") else int(limit)
+            values = dict(counts.most_common(limit))
+            facets[name] = {"value-count": len(values), "values": values}
+        return facets
+
+    def _list(
+        self, records: list[dict], params: dict, message_type: str, works: bool = True
+    ) -> tuple[int, bytes]:
+        try:
+            rows, offset, sample = self._paging(params)
+            matches = self._matches(records, params) if works else list(enumerate(records))
+            facets = self._facets(matches, params.get("facet", "")) if works else {}
+        except ValueError as exc:
+            return self._failure(str(exc))
+        message = {"facets": facets}
+
+        cursor = params.get("cursor")
+        if sample is not None:
+            size = min(sample, MAX_SAMPLE_SIZE, len(matches))
+            with self._lock:
+                page = self._random.sample(matches, size)
+        else:
+            if cursor is not None:
+                offset = self._use_cursor(cursor)
+                if offset is None:
+                    return self._failure(f"Deep paging cursor {cursor} expired or unknown.")
+            page = matches[offset : offset + rows]
+            if cursor is not None:
+                message["next-cursor"] = self._issue_cursor(offset + len(page))
+        message["total-results"] = len(matches)
+
+        if works and "select" in params:
+            fields = params["select"].split(",")
+            items = [
+                json.dumps({k: v for k, v in work.items() if k in fields}, ensure_ascii=False)
+                for _, work in page
+            ]
+            encoded = [item.encode() for item in items]
+        elif works and records is self.works:
+            encoded = [self._encode(index) for index, _ in page]
+        else:
+            encoded = [json.dumps(record, ensure_ascii=False).encode() for _, record in page]
+
+        # The items are spliced in already encoded, the slowest part of a page.
+        head = json.dumps(message, ensure_ascii=False).encode()[:-1]
+        tail = json.dumps(
+            {"items-per-page": rows, "query": {"start-index": offset, "search-terms": None}}
+        ).encode()[1:]
+        envelope = self._envelope(message_type, None)[: -len(b"null}")]
+        body = b"".join((envelope, head, b', "items": [', b", ".join(encoded), b"], ", tail, b"}"))
+        return 200, body
+
+    def _encode(self, index: int) -> bytes:
+        encoded = self._encoded[index]
+        if encoded is None:
+            encoded = self._encoded[index] = json.dumps(
+                self.works[index], ensure_ascii=False
+            ).encode()
+        return encoded
+
+    def _use_cursor(self, cursor: str) -> int | None:
+        if cursor == "*":
+            return 0
+        if not cursor.isdigit():
+            return None
+        ttl = self.faults.cursor_ttl
+        if ttl is not None:
+            with self._lock:
+                used = self._cursors.get(cursor)
+                if used is None or monotonic() - used > ttl:
+                    return None
+        return int(cursor)
+
+    def _issue_cursor(self, offset: int) -> str:
+        cursor = str(offset)
+        if self.faults.cursor_ttl is not None:
+            with self._lock:
+                self._cursors[cursor] = monotonic()
+        return cursor
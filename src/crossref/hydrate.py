@@ -0,0 +1,233 @@
+import threading
+import weakref
+from collections import deque
+from collections.abc import Iterable, Iterator
+from typing import Any
+from urllib.parse import quote
+
+from crossref.restful import (
+    BAD_REQUEST_400,
+    LIMIT,
+    NOT_FOUND_404,
+    CrossrefAPIError,
+    UrlSyntaxError,
+    Works,
+)
+
+HEAVY_FIELDS = ("abstract", "license", "reference", "relation")
+
+# The Crossref API accepts up to 100 filters of the same name in a single request.
+MAX_BATCH_SIZE: int = 100
+
+_MISSING = object()
+
+
+class LazyWork(dict):
+    """
+    A work yielded by `Hydrator`, without its heavy fields until they are needed.
+
+    Reading a heavy field with ``work[field]`` or ``work.get(field)`` fetches the heavy
+    fields of this work, together with the other pending works of the harvest, in a
+    single request. Membership tests and iteration only see the fields fetched so far.
+    """
+
+    __slots__ = ("__weakref__", "_hydrated", "_hydrator")
+
+    def __init__(self, data: dict, hydrator: "Hydrator"):
+        super().__init__(data)
+        self._hydrator = hydrator
+        self._hydrated = False
+
+    @property
+    def hydrated(self) -> bool:
+        return self._hydrated
+
+    def hydrate(self) -> "LazyWork":
+        """
+        Fetch the heavy fields now, if they were not fetched yet.
+        """
+        if not self._hydrated:
+            self._hydrator.hydrate(self)
+        return self
+
+    def __missing__(self, key: str) -> Any:
+        if key not in self._hydrator.fields or self._hydrated:
+            raise KeyError(key)
+        self._hydrator.hydrate(self)
+        return dict.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = dict.get(self, key, _MISSING)
+        if value is not _MISSING:
+            return value
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def to_dict(self) -> dict:
+        """
+        Return a plain dict with all the fields, fetching the heavy ones if needed.
+        """
+        return dict(self.hydrate())
+
+    def __reduce__(self):
+        return dict, (self.to_dict(),)
+
+
+class Hydrator:
+    """
+    Harvest works without their heavy fields, fetching them only when they are read.
+
+    The ``reference``, ``abstract``, ``relation`` and ``license`` fields make up most
+    of the size of the Crossref responses but are rarely needed. The harvest requests
+    every other field with ``select`` and yields `LazyWork` items. When a heavy field
+    of an item is read, the heavy fields of that item and of the other items of its
+    page not hydrated yet are fetched by DOI in batches of ``batch_size``, so reading
+    the abstract of every item costs one extra request per page instead of one per
+    item.
+
+    Args:
+        endpoint (Works): The ``works`` query to harvest, e.g. ``Works().filter(...)``.
+            A ``select`` already set on it is honored.
+        fields (Iterable[str], optional): The fields fetched on demand. Defaults to
+            `HEAVY_FIELDS`.
+        batch_size (int, optional): The maximum number of works looked up in a single
+            request. Defaults to `MAX_BATCH_SIZE`.
+        rows (int, optional): The number of items per page of the harvest. Defaults to
+            `LIMIT`.
+
+    Attributes:
+        lookups (int): The number of on demand requests made so far.
+
+    Usage:
+        hydrator = Hydrator(Works().filter(from_index_date="2024-01-01"))
+        for work in hydrator:
+            if work["type"] == "journal-article":
+                process(work["reference"])  # fetched along with the rest of the page
+    """
+
+    def __init__(
+        self,
+        endpoint: Works,
+        fields: Iterable[str] = HEAVY_FIELDS,
+        batch_size: int = MAX_BATCH_SIZE,
+        rows: int = LIMIT,
+    ):
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            msg = f"Batch size specified as {batch_size!s} but must be between 1 and 100."
+            raise UrlSyntaxError(msg)
+
+        selected = endpoint.request_params.get("select")
+        selected = set(selected.split(",")) if selected else set(endpoint.FIELDS_SELECT)
+        self.fields = frozenset(fields) & selected
+        self.batch_size = batch_size
+        self.rows = rows
+        light = (selected - self.fields) | {"DOI"}
+        self.endpoint = self._derive(endpoint, select=",".join(sorted(light)))
+        self.lookups = 0
+        # Weak references to the works not hydrated yet, in the order they are yielded.
+        # Only the last pages are kept; older works are hydrated on their own.
+        self._pending = deque(maxlen=2 * max(rows, batch_size))
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _derive(endpoint: Works, **request_params) -> Works:
+        return endpoint.__class__(
+            request_url=endpoint.request_url,
+            request_params={**endpoint.request_params, **request_params},
+            context=endpoint.context,
+            etiquette=endpoint.etiquette,
+            throttle=endpoint.throttle,
+            crossref_plus_token=endpoint.crossref_plus_token,
+            timeout=endpoint.timeout,
+            verify=endpoint.verify,
+            http_request=endpoint.http_request,
+            **endpoint._derived_settings(),
+        )
+
+    def _batch(self, work: LazyWork) -> list[LazyWork]:
+        batch = [work]
+        while self._pending and len(batch) < self.batch_size:
+            other = self._pending.popleft()()
+            if other is not None and other is not work and not other._hydrated:
+                batch.append(other)
+        return batch
+
+    def _get(self, request_url: str, request_params: dict):
+        endpoint = self.endpoint
+        result = endpoint.do_http_request(
+            "get",
+            request_url,
+            data=request_params,
+            custom_header=endpoint.custom_header,
+            timeout=endpoint.timeout,
+        )
+        if result.status_code == NOT_FOUND_404:
+            return None
+        if result.status_code >= BAD_REQUEST_400:
+            body = result.text[:200]
+            result.close()
+            msg = f"The API answered {result.status_code} for {request_url}: {body}"
+            raise CrossrefAPIError(msg)
+        return endpoint.http_request.decode(result)["message"]
+
+    def _work_url(self, doi: str) -> str:
+        """
+        The url of a single work, next to the ``works`` route of the endpoint.
+        """
+        endpoint = self.endpoint
+        route = "/".join(part for part in (endpoint.context, endpoint.ENDPOINT) if part)
+        root = str(endpoint.request_url).removesuffix(route).rstrip("/")
+        return f"{root}/{endpoint.ENDPOINT}/{quote(doi, safe='/,')}"
+
+    def _lookup(self, batch: list[LazyWork]) -> dict[str, dict]:
+        """
+        Fetch the heavy fields of a batch of works by DOI.
+
+        The DOIs are looked up with ``doi`` filters, in a single request, except the
+        ones holding a comma, which would split the filter: those are fetched one by
+        one from their work route.
+
+        Raises:
+            CrossrefAPIError: If the API answers with an error status.
+        """
+        filtered = [work["DOI"] for work in batch if "," not in work["DOI"]]
+        found = {}
+        if filtered:
+            request_params = {
+                "filter": ",".join(f"doi:{doi}" for doi in filtered),
+                "select": ",".join(sorted(self.fields | {"DOI"})),
+                "rows": len(filtered),
+            }
+            message = self._get(str(self.endpoint.request_url), request_params) or {}
+            found.update((item["DOI"].lower(), item) for item in message.get("items", ()))
+        for work in batch:
+            if "," in work["DOI"]:
+                item = self._get(self._work_url(work["DOI"]), {})
+                if item is not None:
+                    found[work["DOI"].lower()] = item
+        return found
+
+    def hydrate(self, work: LazyWork):
+        """
+        Fetch the heavy fields of ``work`` and of the pending works of its page.
+        """
+        with self._lock:
+            if work._hydrated:
+                return
+            batch = self._batch(work)
+            found = self._lookup(batch)
+            self.lookups += 1
+
+            for item in batch:
+                heavy = found.get(item["DOI"].lower(), {})
+                dict.update(item, {key: heavy[key] for key in self.fields if key in heavy})
+                item._hydrated = True
+
+    def __iter__(self) -> Iterator[LazyWork]:
+        for page in self.endpoint.pages(rows=self.rows):
+            works = [LazyWork(item, self) for item in page.items]
+            with self._lock:
+                self._pending.extend(weakref.ref(work) for work in works)
+            yield from works
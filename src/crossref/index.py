@@ -0,0 +1,423 @@
+import json
+import re
+import unicodedata
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+
+from crossref.mirror import BATCH_SIZE, Database
+from crossref.restful import UrlSyntaxError, Works
+
+ROWS: int = 20
+
+# The fraction of the words of a query a work must contain to be a local match. Below
+# it, `IndexedWorks` asks the API.
+MIN_COVERAGE: float = 0.5
+
+# The number of query words searched, the ones found in the fewest works. The others
+# add little to the scores but would make the queries scan most of the index.
+MAX_TERMS: int = 6
+
+# The number of word counts kept between searches.
+CACHE_SIZE: int = 100_000
+
+# Words too common to tell works apart, left out of the queries.
+STOPWORDS = frozenset(
+    {
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "by",
+        "de",
+        "del",
+        "der",
+        "des",
+        "di",
+        "du",
+        "e",
+        "el",
+        "en",
+        "et",
+        "for",
+        "from",
+        "in",
+        "is",
+        "la",
+        "le",
+        "of",
+        "on",
+        "or",
+        "the",
+        "to",
+        "und",
+        "von",
+        "with",
+    }
+)
+
+# The words as split by the unicode61 tokenizer of the index.
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _names(value) -> list[str]:
+    if not value:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _people(role: str) -> Callable[[dict], list[str]]:
+    def names(item: dict) -> list[str]:
+        return [
+            " ".join(filter(None, (person.get("given"), person.get("family"), person.get("name"))))
+            for person in item.get(role) or ()
+        ]
+
+    return names
+
+
+def _event(key: str) -> Callable[[dict], list[str]]:
+    def values(item: dict) -> list[str]:
+        return _names((item.get("event") or {}).get(key))
+
+    return values
+
+
+def _affiliations(item: dict) -> list[str]:
+    return [
+        affiliation.get("name") or ""
+        for person in item.get("author") or ()
+        for affiliation in person.get("affiliation") or ()
+    ]
+
+
+def _numbers(item: dict) -> list[str]:
+    years = [
+        str(parts[0][0])
+        for key in ("issued", "published")
+        if (parts := (item.get(key) or {}).get("date-parts")) and parts[0] and parts[0][0]
+    ]
+    return years + [str(item.get(key) or "") for key in ("volume", "issue", "page")]
+
+
+# The columns of the index, with their BM25 weight and the text taken from each work.
+COLUMNS = {
+    "title": (3.0, lambda item: _names(item.get("title")) + _names(item.get("subtitle"))),
+    "container_title": (
+        1.0,
+        lambda item: (
+            _names(item.get("container-title")) + _names(item.get("short-container-title"))
+        ),
+    ),
+    "author": (2.0, _people("author")),
+    "numbers": (1.0, _numbers),
+    "affiliation": (1.0, _affiliations),
+    "chair": (1.0, _people("chair")),
+    "editor": (1.0, _people("editor")),
+    "translator": (1.0, _people("translator")),
+    "event_acronym": (1.0, _event("acronym")),
+    "event_location": (1.0, _event("location")),
+    "event_name": (1.0, _event("name")),
+    "event_sponsor": (1.0, _event("sponsor")),
+    "event_theme": (1.0, _event("theme")),
+    "funder_name": (
+        1.0,
+        lambda item: [funder.get("name") or "" for funder in item.get("funder") or ()],
+    ),
+    "publisher_location": (1.0, lambda item: _names(item.get("publisher-location"))),
+    "publisher_name": (1.0, lambda item: _names(item.get("publisher"))),
+}
+
+# The columns searched by each `Works.FIELDS_QUERY` field; the free text query (the
+# positional arguments of `Works.query`) searches all of them.
+FIELDS = {
+    **{field: (field,) for field in Works.FIELDS_QUERY if field in COLUMNS},
+    "bibliographic": ("title", "container_title", "author", "numbers"),
+    "contributor": ("author", "chair", "editor", "translator"),
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    doi TEXT NOT NULL UNIQUE,
+    data BLOB NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS works_fts USING fts5(
+    {", ".join(COLUMNS)},
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS works_terms USING fts5vocab(works_fts, 'row');
+INSERT INTO works_fts (works_fts, rank)
+    VALUES ('rank', 'bm25({", ".join(str(weight) for weight, _ in COLUMNS.values())})');
+"""  # noqa: S608 - COLUMNS only
+
+
+def words(text: str) -> list[str]:
+    """
+    Split a text in lower-cased words without diacritics, like the index does, leaving
+    out the `STOPWORDS` and single letters.
+    """
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    return [word for word in _WORD.findall(text) if len(word) > 1 and word not in STOPWORDS]
+
+
+def _fields(args: tuple, kwargs: dict) -> dict[str, str]:
+    for field in kwargs:
+        if field not in Works.FIELDS_QUERY:
+            msg = (
+                f"Field query {field!s} specified but there is no such field query for"
+                " this route."
+                f" Valid field queries for this route are: {', '.join(Works.FIELDS_QUERY)}"
+            )
+            raise UrlSyntaxError(msg)
+    fields = {field: str(value) for field, value in kwargs.items()}
+    if args:
+        fields["query"] = " ".join(str(arg) for arg in args)
+    return fields
+
+
+def _columns(field: str) -> tuple[str, ...]:
+    return tuple(COLUMNS) if field == "query" else FIELDS[field]
+
+
+class SearchIndex(Database):
+    """
+    A local full-text index of works, answering `Works.query` searches offline.
+
+    The titles, container titles, people, affiliations, years, volumes and pages of
+    the works are indexed with SQLite FTS5 and the matches ranked with BM25, giving
+    more weight to titles and authors. The field queries of `Works.FIELDS_QUERY` are
+    supported (see `FIELDS`), e.g. ``bibliographic`` searches the titles, authors,
+    container titles and numbers, which is how citation strings are matched.
+
+    Any of the `MAX_TERMS` rarest query words found in a work makes it a candidate, so
+    a citation still matches with volume, page or formatting noise; `coverage` (the
+    fraction of all the query words found in the work) tells apart real matches from
+    works sharing a few words only.
+
+    The index can live in the same file as a `crossref.mirror.Mirror`.
+
+    Args:
+        path (str | Path): The database file, created if needed.
+        min_coverage (float, optional): The coverage a local match must reach. Defaults
+            to `MIN_COVERAGE`.
+
+    Usage:
+        index = SearchIndex("crossref.db")
+        index.add(Works().filter(member=530))
+        index.search(bibliographic="Smith J. Dengue in Brazil. Cad Saude Publica 2016")
+    """
+
+    SCHEMA = SCHEMA
+
+    def __init__(self, path: str | Path, min_coverage: float = MIN_COVERAGE):
+        self.min_coverage = min_coverage
+        self._cache = {}
+        super().__init__(path)
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT count(*) FROM documents").fetchone()[0]
+
+    def add(self, items: Iterable[dict], batch_size: int = BATCH_SIZE) -> int:
+        """
+        Index works, replacing the ones already indexed with the same DOI.
+
+        The works are stored as given, so harvesting them with a ``select`` of the
+        indexed fields keeps the index small.
+
+        Returns:
+            int: The number of works indexed.
+        """
+        connection = self.connection
+        indexed = 0
+        items = (item for item in items if item.get("DOI"))
+        placeholders = ", ".join("?" * (len(COLUMNS) + 1))
+        while batch := list(islice(items, batch_size)):
+            with connection:
+                for item in batch:
+                    doi = item["DOI"].lower()
+                    data = json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode()
+                    row = connection.execute(
+                        "SELECT id FROM documents WHERE doi = ?", (doi,)
+                    ).fetchone()
+                    if row is None:
+                        document = connection.execute(
+                            "INSERT INTO documents (doi, data) VALUES (?, ?)", (doi, data)
+                        ).lastrowid
+                    else:
+                        document = row[0]
+                        connection.execute("DELETE FROM works_fts WHERE rowid = ?", (document,))
+                        connection.execute(
+                            "UPDATE documents SET data = ? WHERE id = ?", (data, document)
+                        )
+                    connection.execute(
+                        f"INSERT INTO works_fts (rowid, {', '.join(COLUMNS)})"  # noqa: S608 - COLUMNS only
+                        f" VALUES ({placeholders})",
+                        (document, *(" ; ".join(text(item)) for _, text in COLUMNS.values())),
+                    )
+            indexed += len(batch)
+            self._cache.clear()
+        return indexed
+
+    def _frequencies(self, terms: list[str]) -> dict[str, int]:
+        """
+        Return the number of works containing each word.
+
+        FTS5 counts them walking the whole list of works of a word, which is slow for
+        the common ones, so the counts are cached until works are added.
+        """
+        counts = {term: self._cache.get(term) for term in terms}
+        missing = [term for term, count in counts.items() if count is None]
+        if missing:
+            found = dict.fromkeys(missing, 0)
+            found.update(
+                self.connection.execute(
+                    "SELECT term, doc FROM works_terms"  # noqa: S608 - placeholders only
+                    f" WHERE term IN ({', '.join('?' * len(missing))})",
+                    missing,
+                )
+            )
+            counts.update(found)
+            if len(self._cache) + len(found) > CACHE_SIZE:
+                self._cache.clear()
+            self._cache.update(found)
+        return counts
+
+    def search(
+        self, *args, rows: int | None = ROWS, min_coverage: float | None = None, **kwargs
+    ) -> list[dict]:
+        """
+        Return the best local matches of a query, with the arguments of `Works.query`.
+
+        Args:
+            *args (str): The free text query, searched in all the columns.
+            rows (int | None, optional): The maximum number of matches, or None for all
+                of them. Defaults to `ROWS`.
+            min_coverage (float, optional): The coverage a match must reach. Defaults
+                to the one of the index.
+            **kwargs: `Works.FIELDS_QUERY` field queries.
+
+        Returns:
+            list[dict]: The matching works as indexed, best first, with their BM25
+            ``score`` and ``coverage`` added.
+
+        Raises:
+            UrlSyntaxError: If a field query is not one of `Works.FIELDS_QUERY`.
+        """
+        min_coverage = self.min_coverage if min_coverage is None else min_coverage
+        terms = {}
+        for field, text in _fields(args, kwargs).items():
+            for word in words(text):
+                terms.setdefault(word, set()).update(_columns(field))
+        if not terms:
+            return []
+
+        # Search the rarest words found in the index only; the coverage is computed with
+        # all of them.
+        connection = self.connection
+        frequencies = self._frequencies(list(terms))
+        searched = sorted((word for word in terms if frequencies[word]), key=frequencies.get)
+        searched = searched[:MAX_TERMS]
+        if not searched:
+            return []
+
+        expression = " OR ".join(
+            f'{{{" ".join(sorted(terms[word]))}}} : "{word}"' for word in searched
+        )
+        # Only the columns searched are read to compute the coverage, and the candidates
+        # are read until enough of them reach it.
+        columns = sorted(set().union(*terms.values()))
+        cursor = connection.execute(
+            f"SELECT d.data, -f.rank, {', '.join(f'f.{column}' for column in columns)}"  # noqa: S608 - COLUMNS only
+            " FROM works_fts AS f JOIN documents AS d ON d.id = f.rowid"
+            " WHERE works_fts MATCH ? ORDER BY f.rank LIMIT ?",
+            (expression, -1 if rows is None else max(rows, ROWS)),
+        )
+
+        matches = []
+        for data, score, *texts in cursor:
+            found = {column: set(words(text)) for column, text in zip(columns, texts, strict=True)}
+            coverage = sum(
+                any(word in found[column] for column in in_columns)
+                for word, in_columns in terms.items()
+            ) / len(terms)
+            if coverage >= min_coverage:
+                matches.append({**json.loads(data), "score": score, "coverage": coverage})
+                if rows is not None and len(matches) == rows:
+                    break
+        return matches
+
+    def match(self, *args, **kwargs) -> dict | None:
+        """
+        Return the best local match of a query, or None. See `search`.
+        """
+        matches = self.search(*args, rows=1, **kwargs)
+        return matches[0] if matches else None
+
+    def works(self, rows: int | None = None, **kwargs) -> "IndexedWorks":
+        """
+        Return a `Works` endpoint answering queries from this index when it can.
+
+        Args:
+            rows (int | None, optional): The maximum number of local matches iterated.
+                Defaults to all of them, like the API.
+            **kwargs: The usual endpoint arguments (`etiquette`, `http_request`, ...).
+        """
+        return IndexedWorks(self, rows=rows, **kwargs)
+
+
+class IndexedWorks(Works):
+    """
+    A `Works` endpoint answering queries from a `SearchIndex` when it can.
+
+    Iterating a query made only of free text and `Works.FIELDS_QUERY` fields yields
+    all the local matches reaching the coverage of the index (or the first ``rows``),
+    and falls back to the API when there are none. Anything else (filters, sorting,
+    ...) goes to the API.
+
+    The endpoints derived with `query`, `filter`, etc. keep the index and ``rows``.
+    Instances are usually built with `SearchIndex.works`.
+
+    Args:
+        index (SearchIndex): The index answering for the API.
+        rows (int | None, optional): The maximum number of local matches iterated.
+            Defaults to all of them.
+        **kwargs: The usual endpoint arguments (`etiquette`, `http_request`, ...).
+    """
+
+    def __init__(self, index: SearchIndex, rows: int | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.index = index
+        self.rows = rows
+
+    def _derived_settings(self) -> dict:
+        return {"index": self.index, "rows": self.rows}
+
+    def _local_query(self) -> tuple[tuple, dict] | None:
+        args = ()
+        kwargs = {}
+        for key, value in self.request_params.items():
+            if key == "query":
+                args = (value,)
+            elif key.startswith("query."):
+                kwargs[key.removeprefix("query.").replace("-", "_")] = value
+            else:
+                return None
+        return (args, kwargs) if args or kwargs else None
+
+    def __iter__(self) -> Iterator[dict]:
+        query = self._local_query()
+        if query is not None:
+            with self.http_request.span("crossref.cache", {"crossref.cache": "index"}) as span:
+                matches = self.index.search(*query[0], rows=self.rows, **query[1])
+                span.set_attribute("crossref.cache_hit", bool(matches))
+            self.http_request.emit("cache", cache="index", hit=bool(matches))
+            if matches:
+                yield from matches
+                return
+        yield from super().__iter__()
@@ -0,0 +1,465 @@
+import codecs
+import json
+import re
+from collections.abc import Callable, Iterable, Iterator
+from functools import cache
+from typing import Any
+
+WHITESPACE = " \t\n\r"
+
+# Marks the moment the parser enters the ``message.items`` array.
+_ITEMS = object()
+
+# Patterns used to find the boundaries of raw JSON values without decoding them.
+# They are written as unrolled loops with possessive quantifiers, which keeps the
+# matching linear and avoids an alternation per character. An object or array
+# nested up to MAX_NESTING levels is matched by a single call, which covers the
+# Crossref records; deeper values are walked bracket by bracket.
+MAX_NESTING: int = 16
+_STRING = rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"'
+_OTHER = rb'[^"{}\[\]]*+'
+_FLAT = _OTHER + rb"(?:" + _STRING + _OTHER + rb")*+"
+
+
+@cache
+def _compound_pattern(depth: int = MAX_NESTING) -> re.Pattern:
+    # Compiled on first use, as it takes longer than importing the whole client.
+    inner = _FLAT
+    for _ in range(depth):
+        inner = _OTHER + rb"(?:(?:" + _STRING + rb"|[{\[]" + inner + rb"[}\]])" + _OTHER + rb")*+"
+    return re.compile(rb"[{\[]" + inner + rb"[}\]]")
+
+
+@cache
+def _text_pattern(pattern: bytes) -> re.Pattern:
+    # The patterns above, for the text buffer of `ItemStream`.
+    return re.compile(pattern.decode())
+
+
+FLAT = re.compile(_FLAT)
+STRING = re.compile(_STRING)
+SCALAR = re.compile(rb"[^,:}\]\s]+")
+SPACES = re.compile(rb"\s*")
+
+
+class ItemStream:
+    """
+    Incrementally parse a Crossref list response while it is downloaded.
+
+    Each element of ``message.items`` is decoded and yielded as soon as its last
+    byte arrives, so the body is never buffered nor decoded as a whole. The other
+    keys of ``message`` (``next-cursor``, ``total-results``, ...) are kept in
+    `message` and the top level keys (``status``, ``message-type``, ...) in
+    `metadata` as they are parsed.
+
+    Args:
+        chunks (Iterable[bytes]): The body of the response, e.g.
+            ``response.iter_content(chunk_size)``.
+        decoder (Callable, optional): A function decoding the bytes of each item, e.g.
+            `decoders.get_decoder`. The standard library decodes the items without one.
+
+    Usage:
+        stream = ItemStream(response.iter_content(65536))
+        stream.prepare()  # parse up to the first item
+        cursor = stream.message.get("next-cursor")
+        for item in stream:
+            ...
+    """
+
+    def __init__(self, chunks: Iterable[bytes], decoder: Callable[[bytes], Any] | None = None):
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._item_decoder = None if decoder is json.loads else decoder
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._events = self._parse()
+        self.metadata = {}
+        self.message = {}
+        self.count = 0
+
+    def _fill(self, size: int = 1) -> bool:
+        """
+        Read at least ``size`` more characters, or up to the end of the body.
+
+        The chunks are joined once per call and the consumed part of the buffer is
+        dropped. Returns False when no more data could be read.
+        """
+        if self._eof:
+            return False
+
+        parts = [self._buffer[self._pos :]]
+        received = 0
+        for chunk in self._chunks:
+            text = self._text.decode(chunk)
+            parts.append(text)
+            received += len(text)
+            if received >= size:
+                break
+        else:
+            parts.append(self._text.decode(b"", final=True))
+            self._eof = True
+
+        self._buffer = "".join(parts)
+        self._pos = 0
+        return received > 0
+
+    def _error(self, msg: str):
+        raise json.JSONDecodeError(msg, self._buffer, self._pos)
+
+    def _skip_ws(self) -> str:
+        """
+        Skip the whitespaces and return the next character, without consuming it.
+        """
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            while pos < len(buffer) and buffer[pos] in WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                self._error("Unexpected end of data")
+
+    def _value(self):
+        """
+        Decode the complete JSON value starting at the current position.
+        """
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                # A number at the very end of the buffer may continue in the next chunk.
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+
+            # Wait for the pending data to double before decoding again, so a value
+            # spanning many chunks is decoded a logarithmic number of times.
+            self._fill(len(self._buffer) - self._pos)
+
+    def _item_end(self) -> int | None:
+        """
+        Return the end of the object or array starting at the current position, or None
+        if the buffer ends before it.
+        """
+        buffer = self._buffer
+        match = _text_pattern(_compound_pattern().pattern).match(buffer, self._pos)
+        if match is not None:
+            return match.end()
+        # Deeper than MAX_NESTING, or not complete yet: walk it bracket by bracket.
+        flat = _text_pattern(_FLAT)
+        pos = self._pos
+        depth = 0
+        while True:
+            pos = flat.match(buffer, pos).end()
+            # The buffer ends, maybe in the middle of a string.
+            if pos >= len(buffer) or buffer[pos] == '"':
+                return None
+            depth += 1 if buffer[pos] in "{[" else -1
+            pos += 1
+            if depth == 0:
+                return pos
+
+    def _item(self):
+        """
+        Decode the item starting at the current position with the item decoder.
+        """
+        if self._item_decoder is None or self._buffer[self._pos] not in "{[":
+            return self._value()
+        while True:
+            end = self._item_end()
+            if end is not None:
+                start, self._pos = self._pos, end
+                return self._item_decoder(self._buffer[start:end].encode())
+            if self._eof:
+                self._error("Unterminated object or array")
+            self._fill(len(self._buffer) - self._pos)
+
+    def _members(self) -> Iterator[str]:
+        """
+        Iterate through the keys of the object whose ``{`` was just consumed.
+
+        The value of each key must be consumed before asking for the next key.
+        """
+        first = True
+        while True:
+            char = self._skip_ws()
+            if char == "}":
+                self._pos += 1
+                return
+            if not first:
+                if char != ",":
+                    self._error("Expecting ',' delimiter")
+                self._pos += 1
+                self._skip_ws()
+            first = False
+            key = self._value()
+            if self._skip_ws() != ":":
+                self._error("Expecting ':' delimiter")
+            self._pos += 1
+            self._skip_ws()
+            yield key
+
+    def _elements(self, value: Callable[[], Any]) -> Iterator:
+        """
+        Iterate through the values of the array whose ``[`` was just consumed, decoded
+        with ``value``.
+        """
+        first = True
+        while True:
+            char = self._skip_ws()
+            if char == "]":
+                self._pos += 1
+                return
+            if not first:
+                if char != ",":
+                    self._error("Expecting ',' delimiter")
+                self._pos += 1
+                self._skip_ws()
+            first = False
+            yield value()
+
+    def _open(self, char: str) -> bool:
+        if self._skip_ws() != char:
+            return False
+        self._pos += 1
+        return True
+
+    def _parse(self) -> Iterator:
+        if not self._open("{"):
+            self._error("Expecting an object")
+
+        for key in self._members():
+            if key != "message" or not self._open("{"):
+                self.metadata[key] = self._value()
+                continue
+
+            for message_key in self._members():
+                if message_key == "items" and self._open("["):
+                    yield _ITEMS
+                    yield from self._elements(self._item)
+                else:
+                    self.message[message_key] = self._value()
+
+    def prepare(self):
+        """
+        Parse the response up to its first item, so the keys that come before the
+        items (``next-cursor`` and ``total-results`` in Crossref responses) are known.
+        """
+        for event in self._events:
+            if event is _ITEMS:
+                return
+
+    def __iter__(self):
+        for event in self._events:
+            if event is _ITEMS:
+                continue
+            self.count += 1
+            yield event
+
+
+def _raise(msg: str, data: bytes | memoryview, pos: int):
+    raise json.JSONDecodeError(msg, bytes(data).decode(errors="replace"), pos)
+
+
+def _skip_ws(data: bytes | memoryview, pos: int) -> int:
+    return SPACES.match(data, pos).end()
+
+
+def _skip_nested(data: bytes | memoryview, pos: int) -> int:
+    depth = 0
+    while True:
+        pos = FLAT.match(data, pos).end()
+        if pos >= len(data):
+            _raise("Unterminated object or array", data, pos)
+        char = data[pos]
+        pos += 1
+        if char in b"{[":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos
+
+
+def skip_value(data: bytes | memoryview, pos: int) -> int:
+    """
+    Return the position right after the JSON value starting at ``pos``.
+    """
+    char = data[pos]
+    if char == ord('"'):
+        match = STRING.match(data, pos)
+    elif char in b"{[":
+        match = _compound_pattern().match(data, pos)
+        if match is None:
+            return _skip_nested(data, pos)
+    else:
+        match = SCALAR.match(data, pos)
+
+    if match is None:
+        _raise("Expecting value", data, pos)
+    return match.end()
+
+
+def _members(data: bytes | memoryview, pos: int):
+    """
+    Iterate through the members of the object starting at ``pos``.
+
+    Yields the raw key (with its quotes) and the position of its value, and expects
+    the position right after the value to be sent back. Returns the position right
+    after the object.
+    """
+    pos = _skip_ws(data, pos + 1)
+    if data[pos : pos + 1] == b"}":
+        return pos + 1
+    while True:
+        match = STRING.match(data, pos)
+        if match is None:
+            _raise("Expecting property name enclosed in double quotes", data, pos)
+        key = bytes(data[pos : match.end()])
+        pos = _skip_ws(data, match.end())
+        if data[pos : pos + 1] != b":":
+            _raise("Expecting ':' delimiter", data, pos)
+        pos = yield key, _skip_ws(data, pos + 1)
+        pos = _skip_ws(data, pos)
+        delimiter = data[pos : pos + 1]
+        if delimiter == b"}":
+            return pos + 1
+        if delimiter != b",":
+            _raise("Expecting ',' delimiter", data, pos)
+        pos = _skip_ws(data, pos + 1)
+
+
+def _walk(data: bytes | memoryview, pos: int, visit) -> int:
+    """
+    Call ``visit(key, start)`` for each member of the object at ``pos``, which must
+    return the position right after the value. Returns the position after the object.
+    """
+    members = _members(data, pos)
+    try:
+        key, start = next(members)
+        while True:
+            key, start = members.send(visit(key, start))
+    except StopIteration as stop:
+        return stop.value
+
+
+def _elements(data: bytes, pos: int) -> tuple[list[tuple[int, int]], int]:
+    """
+    Return the ``(start, end)`` spans of the elements of the array at ``pos``, and
+    the position right after the array.
+    """
+    spans = []
+    pos = _skip_ws(data, pos + 1)
+    if data[pos : pos + 1] == b"]":
+        return spans, pos + 1
+    while True:
+        end = skip_value(data, pos)
+        spans.append((pos, end))
+        pos = _skip_ws(data, end)
+        delimiter = data[pos : pos + 1]
+        if delimiter == b"]":
+            return spans, pos + 1
+        if delimiter != b",":
+            _raise("Expecting ',' delimiter", data, pos)
+        pos = _skip_ws(data, pos + 1)
+
+
+class RawList:
+    """
+    Split a Crossref list response into the undecoded JSON of its items.
+
+    The items are memoryview slices of the response body, so no Python object is
+    built for them and nothing is copied; keeping any item alive keeps the whole
+    body alive. The other keys of ``message`` and the top level keys are decoded
+    into `message` and `metadata`. A top level ``items`` array, as found in the
+    public data file snapshots, is split the same way.
+
+    Args:
+        data (bytes): The body of the response.
+
+    Attributes:
+        items (list[memoryview]): The JSON of each item.
+        spans (list[tuple[int, int]]): The ``(start, end)`` offsets of each item in
+            ``data``, to rebuild the items after sending ``data`` to another process.
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.metadata = {}
+        self.message = {}
+        self.spans = []
+
+        pos = _skip_ws(data, 0)
+        if data[pos : pos + 1] != b"{":
+            _raise("Expecting an object", data, pos)
+        _walk(data, pos, self._visit_top)
+
+        view = memoryview(data)
+        self.items = [view[start:end] for start, end in self.spans]
+
+    def _visit_top(self, key: bytes, start: int) -> int:
+        if key == b'"message"' and self.data[start : start + 1] == b"{":
+            return _walk(self.data, start, self._visit_message)
+        if key == b'"items"' and self.data[start : start + 1] == b"[":
+            self.spans, end = _elements(self.data, start)
+            return end
+        end = skip_value(self.data, start)
+        self.metadata[json.loads(key)] = json.loads(self.data[start:end])
+        return end
+
+    def _visit_message(self, key: bytes, start: int) -> int:
+        if key == b'"items"' and self.data[start : start + 1] == b"[":
+            self.spans, end = _elements(self.data, start)
+            return end
+        end = skip_value(self.data, start)
+        self.message[json.loads(key)] = json.loads(self.data[start:end])
+        return end
+
+
+def raw_field(item: bytes | memoryview, key: str, default: Any = None) -> Any:
+    """
+    Decode a single top level field of a raw item, e.g. ``raw_field(item, "DOI")``.
+
+    The fields before it are skipped without being decoded.
+    """
+    wanted = json.dumps(key).encode()
+    members = _members(item, _skip_ws(item, 0))
+    try:
+        raw_key, start = next(members)
+        while True:
+            end = skip_value(item, start)
+            if raw_key == wanted:
+                return json.loads(bytes(item[start:end]))
+            raw_key, start = members.send(end)
+    except StopIteration:
+        return default
+
+
+def raw_fields(item: bytes | memoryview, keys: Iterable[str]) -> dict:
+    """
+    Decode the top level fields of a raw item named in ``keys`` in a single pass.
+
+    The other fields are skipped without being decoded, and missing fields are left
+    out of the result.
+    """
+    wanted = {json.dumps(key).encode(): key for key in keys}
+    fields = {}
+
+    def visit(raw_key: bytes, start: int) -> int:
+        end = skip_value(item, start)
+        if raw_key in wanted:
+            fields[wanted[raw_key]] = json.loads(bytes(item[start:end]))
+        return end
+
+    pos = _skip_ws(item, 0)
+    if item[pos : pos + 1] != b"{":
+        _raise("Expecting an object", item, pos)
+    _walk(item, pos, visit)
+    return fields
@@ -0,0 +1,297 @@
+import bisect
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import monotonic
+
+from crossref.restful import Endpoint, HTTPRequest, route
+
+# The upper bounds of the latency histogram buckets, in seconds, as Prometheus clients.
+BUCKETS: tuple = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "count", "counts", "total")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.total += value
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        result = []
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts, strict=True):
+            seen += count
+            result.append((repr(float(bound)), seen))
+        result.append(("+Inf", self.count))
+        return result
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return f"{{{pairs}}}" if labels else ""
+
+
+class Metrics:
+    """
+    Count what an `HTTPRequest` does, for monitoring a long running client.
+
+    The metrics listen to the events of the `HTTPRequest` (see
+    `HTTPRequest.add_listener`) between `start` and `stop`: the requests by route,
+    method and status, their latency histograms, the bytes received, the retries, the
+    errors, the throttle sleeps and the hits and misses of the local caches answering
+    for the API (`crossref.mirror`, `crossref.index`). The rate limit gauges are read
+    when exported. `exposition` renders them in the Prometheus text format, which
+    `serve` exposes over HTTP.
+
+    Args:
+        target (Endpoint | HTTPRequest): The endpoint to measure, or its
+            `HTTPRequest`, which endpoints derived from each other share.
+        buckets (tuple, optional): The upper bounds of the latency buckets, in
+            seconds. Defaults to `BUCKETS`.
+
+    Attributes:
+        requests (dict[tuple[str, str, int], int]): The responses by route, method and
+            status.
+        errors (dict[tuple[str, str, str], int]): The requests failing without
+            response, by route, method and exception name.
+        latency (dict[str, Any]): The histograms of the request seconds by route, with
+            the ``counts`` of each bucket, their ``count`` and their ``total``.
+        size (dict[str, int]): The bytes received by route, streamed responses
+            excepted.
+        retries (dict[str, int]): The retried attempts by route.
+        throttle_seconds (float): The seconds slept to honor the rate limits.
+        throttle_sleeps (int): The number of those sleeps.
+        cache (dict[tuple[str, bool], int]): The lookups by cache and hit.
+
+    Usage:
+        metrics = Metrics(works).start()
+        serve(metrics, port=9464)
+    """
+
+    def __init__(self, target: Endpoint | HTTPRequest, buckets: tuple = BUCKETS):
+        self.http_request = target.http_request if isinstance(target, Endpoint) else target
+        self.buckets = tuple(sorted(buckets))
+        self.requests = {}
+        self.errors = {}
+        self.latency = {}
+        self.size = {}
+        self.retries = {}
+        self.throttle_seconds = 0.0
+        self.throttle_sleeps = 0
+        self.cache = {}
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def __call__(self, event: str, data: dict):
+        with self._lock:
+            if event == "response":
+                path = route(data["url"])
+                key = (path, data["method"], data["status"])
+                self.requests[key] = self.requests.get(key, 0) + 1
+                histogram = self.latency.get(path)
+                if histogram is None:
+                    histogram = self.latency[path] = _Histogram(self.buckets)
+                histogram.add(data["seconds"])
+                self.size[path] = self.size.get(path, 0) + (data["size"] or 0)
+                if data["retries"]:
+                    self.retries[path] = self.retries.get(path, 0) + data["retries"]
+                self._recent.append(monotonic())
+                self._forget()
+            elif event == "error":
+                key = (route(data["url"]), data["method"], type(data["error"]).__name__)
+                self.errors[key] = self.errors.get(key, 0) + 1
+            elif event == "throttle":
+                self.throttle_seconds += data["seconds"]
+                self.throttle_sleeps += 1
+            elif event == "cache":
+                key = (data["cache"], data["hit"])
+                self.cache[key] = self.cache.get(key, 0) + 1
+
+    def start(self) -> "Metrics":
+        self.http_request.add_listener(self)
+        return self
+
+    def stop(self):
+        self.http_request.remove_listener(self)
+
+    def __enter__(self) -> "Metrics":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def hit_ratio(self, cache: str) -> float | None:
+        """
+        Return the share of the lookups of ``cache`` it answered, or None without any.
+        """
+        hits = self.cache.get((cache, True), 0)
+        lookups = hits + self.cache.get((cache, False), 0)
+        return hits / lookups if lookups else None
+
+    def _forget(self):
+        # Drop the responses older than the rate limit interval.
+        horizon = monotonic() - self.http_request.rate_limits["x-rate-limit-interval"]
+        while self._recent and self._recent[0] < horizon:
+            self._recent.popleft()
+
+    def headroom(self) -> int:
+        """
+        Return how many requests the current rate limit still allows in its interval,
+        given the responses received during the last interval.
+        """
+        with self._lock:
+            self._forget()
+            recent = len(self._recent)
+        return max(self.http_request.rate_limits["x-rate-limit-limit"] - recent, 0)
+
+    def exposition(self) -> str:
+        """
+        Return the metrics in the Prometheus text exposition format.
+        """
+        headroom = self.headroom()
+        rate_limits = self.http_request.rate_limits
+        lines = []
+
+        def family(name: str, kind: str, description: str, samples: list):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{sample}{labels} {value!r}" for sample, labels, value in samples)
+
+        with self._lock:
+            family(
+                "crossref_requests_total",
+                "counter",
+                "The responses received, by route, method and status.",
+                [
+                    ("crossref_requests_total", _labels(route=r, method=m, status=s), n)
+                    for (r, m, s), n in sorted(self.requests.items())
+                ],
+            )
+            family(
+                "crossref_request_errors_total",
+                "counter",
+                "The requests failing without response, by route, method and error.",
+                [
+                    ("crossref_request_errors_total", _labels(route=r, method=m, error=e), n)
+                    for (r, m, e), n in sorted(self.errors.items())
+                ],
+            )
+            samples = []
+            name = "crossref_request_duration_seconds"
+            for path, histogram in sorted(self.latency.items()):
+                samples.extend(
+                    (f"{name}_bucket", _labels(route=path, le=bound), count)
+                    for bound, count in histogram.cumulative()
+                )
+                samples.append((f"{name}_sum", _labels(route=path), histogram.total))
+                samples.append((f"{name}_count", _labels(route=path), histogram.count))
+            family(name, "histogram", "The duration of the requests, by route.", samples)
+            family(
+                "crossref_response_bytes_total",
+                "counter",
+                "The bytes received, by route, streamed responses excepted.",
+                [
+                    ("crossref_response_bytes_total", _labels(route=path), size)
+                    for path, size in sorted(self.size.items())
+                ],
+            )
+            family(
+                "crossref_retries_total",
+                "counter",
+                "The retried attempts, by route.",
+                [
+                    ("crossref_retries_total", _labels(route=path), retries)
+                    for path, retries in sorted(self.retries.items())
+                ],
+            )
+            family(
+                "crossref_throttle_seconds_total",
+                "counter",
+                "The seconds slept to honor the rate limits.",
+                [("crossref_throttle_seconds_total", "", self.throttle_seconds)],
+            )
+            family(
+                "crossref_throttle_sleeps_total",
+                "counter",
+                "The sleeps to honor the rate limits.",
+                [("crossref_throttle_sleeps_total", "", self.throttle_sleeps)],
+            )
+            family(
+                "crossref_cache_lookups_total",
+                "counter",
+                "The lookups of the local caches, by cache and result.",
+                [
+                    (
+                        "crossref_cache_lookups_total",
+                        _labels(cache=cache, result="hit" if hit else "miss"),
+                        n,
+                    )
+                    for (cache, hit), n in sorted(self.cache.items())
+                ],
+            )
+        family(
+            "crossref_rate_limit_requests",
+            "gauge",
+            "The requests allowed per rate limit interval.",
+            [("crossref_rate_limit_requests", "", rate_limits["x-rate-limit-limit"])],
+        )
+        family(
+            "crossref_rate_limit_interval_seconds",
+            "gauge",
+            "The rate limit interval.",
+            [("crossref_rate_limit_interval_seconds", "", rate_limits["x-rate-limit-interval"])],
+        )
+        family(
+            "crossref_rate_limit_headroom",
+            "gauge",
+            "The requests the rate limit still allows in the current interval.",
+            [("crossref_rate_limit_headroom", "", headroom)],
+        )
+        return "\n".join(lines) + "\n"
+
+
+def serve(metrics: Metrics, port: int = 0, address: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve ``metrics.exposition()`` over HTTP from a daemon thread, for Prometheus to
+    scrape. Call ``shutdown`` on the server returned to stop it.
+
+    Args:
+        metrics (Metrics): The metrics to expose.
+        port (int, optional): The port to listen to. Defaults to a free port, see
+            ``server.server_address``.
+        address (str, optional): The address to listen to. Defaults to the loopback
+            interface; pass ``""`` to listen to all the interfaces, e.g. in a container
+            scraped from another host.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            body = metrics.exposition().encode()
+            self.send_response(200)
+            self.send_header("content-type", CONTENT_TYPE)
+            self.send_header("content-length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((address, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,421 @@
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from crossref import decoders
+from crossref.restful import LIMIT, Works
+
+BATCH_SIZE: int = 1000
+
+# Seven days by default: new works keep being deposited and updated, so older copies
+# fall through to the API.
+MAX_AGE: float = 7 * 24 * 60 * 60
+
+ISSN_LENGTH = 8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS works (
+    doi TEXT PRIMARY KEY,
+    member TEXT,
+    prefix TEXT,
+    type TEXT,
+    issued TEXT,
+    indexed TEXT,
+    fetched REAL NOT NULL,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS works_member ON works (member);
+CREATE INDEX IF NOT EXISTS works_prefix ON works (prefix);
+CREATE INDEX IF NOT EXISTS works_type ON works (type);
+CREATE INDEX IF NOT EXISTS works_issued ON works (issued);
+CREATE INDEX IF NOT EXISTS works_indexed ON works (indexed);
+CREATE TABLE IF NOT EXISTS issns (
+    issn TEXT NOT NULL,
+    doi TEXT NOT NULL,
+    PRIMARY KEY (issn, doi)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS issns_doi ON issns (doi);
+CREATE TABLE IF NOT EXISTS syncs (
+    filters TEXT PRIMARY KEY,
+    synced REAL NOT NULL,
+    items INTEGER NOT NULL
+);
+"""
+
+# The filters answered from the mirror, with the condition they translate to. The date
+# filters compare the date prefixes, so "until-pub-date:2020" includes "2020-05-17".
+FILTERS = {
+    "member": "member = ?",
+    "prefix": "prefix = ?",
+    "type": "type = ?",
+    "issn": "doi IN (SELECT doi FROM issns WHERE issn = ?)",
+    "doi": "doi = lower(?)",
+    "from-pub-date": "issued >= ?",
+    "until-pub-date": "substr(issued, 1, length(?)) <= ?",
+    "from-index-date": "indexed >= ?",
+    "until-index-date": "substr(indexed, 1, length(?)) <= ?",
+}
+
+
+def _date(value: dict | None) -> str | None:
+    parts = ((value or {}).get("date-parts") or [[]])[0] or []
+    parts = [part for part in parts[:3] if isinstance(part, int)]
+    if not parts:
+        return None
+    return "-".join([f"{parts[0]:04d}", *[f"{part:02d}" for part in parts[1:]]])
+
+
+def normalize_issn(issn: str) -> str:
+    """
+    Return an ISSN as the API writes it, e.g. "1234-567X" for "1234567x".
+    """
+    compact = issn.replace("-", "").replace(" ", "").upper()
+    return f"{compact[:4]}-{compact[4:]}" if len(compact) == ISSN_LENGTH else issn.strip().upper()
+
+
+def parse_filters(filters: str) -> list[tuple[str, str]] | None:
+    """
+    Split a ``filter`` request parameter in sorted ``(name, value)`` pairs, or return
+    None if any filter can not be answered from the mirror. ISSNs are normalized.
+    """
+    pairs = []
+    for fltr in filters.split(","):
+        name, _, value = fltr.partition(":")
+        if name not in FILTERS:
+            return None
+        pairs.append((name, normalize_issn(value) if name == "issn" else value))
+    return sorted(pairs)
+
+
+class Database:
+    """
+    A SQLite database with one connection per thread, using the WAL journal so readers
+    are never blocked by a writer in another thread or process.
+
+    Args:
+        path (str | Path): The database file, created if needed.
+    """
+
+    SCHEMA = ""
+
+    def __init__(self, path: str | Path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        with self.connection as connection:
+            connection.executescript(self.SCHEMA)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """
+        The connection owned by the calling thread.
+        """
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # Connections are only used by their thread, but `close` may run in another.
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def __getstate__(self) -> dict:
+        # The connections belong to this process; a copy opens its own.
+        state = dict(self.__dict__)
+        for name in ("_local", "_connections", "_lock"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+
+class Mirror(Database):
+    """
+    A local SQLite copy of Crossref works.
+
+    Works are stored with their JSON (as received, when harvested with `harvest`),
+    indexed by DOI, member, prefix, ISSN, type and the issued and indexed dates. The
+    database uses the WAL journal, so readers are never blocked by a harvest running
+    in another thread or process, and each thread gets its own connection.
+
+    Every completed `harvest` of a query made only of the `FILTERS` is recorded, so
+    later iterations of the same query can be answered from the mirror while the
+    harvest is fresh enough (see `works`).
+
+    Args:
+        path (str | Path): The database file, created if needed.
+        max_age (float, optional): The age in seconds after which a stored work or a
+            recorded harvest is no longer used. Defaults to `MAX_AGE`.
+
+    Usage:
+        mirror = Mirror("crossref.db")
+        mirror.harvest(Works().filter(member=530, from_index_date="2024-01-01"))
+        works = mirror.works(etiquette=my_etiquette)
+        works.doi("10.1590/0102-311x00133115")  # served from the mirror
+    """
+
+    SCHEMA = SCHEMA
+
+    def __init__(self, path: str | Path, max_age: float = MAX_AGE):
+        self.max_age = max_age
+        self.decode = decoders.get_decoder()
+        super().__init__(path)
+
+    def _rows(self, items: Iterable, fetched: float) -> Iterator[tuple]:
+        for item in items:
+            if isinstance(item, dict):
+                fields = item
+                data = json.dumps(item, ensure_ascii=False, separators=(",", ":")).encode()
+            else:
+                # Decoding the whole work is faster than scanning it for the few indexed
+                # fields, most of its bytes being in nested arrays; the raw JSON is kept.
+                data = bytes(item)
+                fields = self.decode(data)
+            if not fields.get("DOI"):
+                continue
+            indexed = (fields.get("indexed") or {}).get("date-time")
+            yield (
+                (
+                    fields["DOI"].lower(),
+                    fields.get("member"),
+                    fields.get("prefix"),
+                    fields.get("type"),
+                    _date(fields.get("issued")),
+                    indexed[:10] if indexed else None,
+                    fetched,
+                    data,
+                ),
+                {normalize_issn(issn) for issn in fields.get("ISSN") or ()},
+            )
+
+    def store(self, items: Iterable, batch_size: int = BATCH_SIZE) -> int:
+        """
+        Insert or replace works, committing every ``batch_size`` works.
+
+        Args:
+            items (Iterable): The works, as dicts or as raw JSON (see `Endpoint.raw`).
+            batch_size (int, optional): Defaults to `BATCH_SIZE`.
+
+        Returns:
+            int: The number of works stored.
+        """
+        connection = self.connection
+        stored = 0
+        rows = self._rows(items, time.time())
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return stored
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO works VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [work for work, _ in batch],
+                )
+                connection.executemany(
+                    "DELETE FROM issns WHERE doi = ?", [(work[0],) for work, _ in batch]
+                )
+                connection.executemany(
+                    "INSERT OR IGNORE INTO issns VALUES (?, ?)",
+                    [(issn, work[0]) for work, issns in batch for issn in issns],
+                )
+            stored += len(batch)
+
+    def harvest(self, endpoint: Works, rows: int = LIMIT, batch_size: int = BATCH_SIZE) -> int:
+        """
+        Store all the results of a ``works`` query, keeping their JSON as received.
+
+        Once the harvest completes, a query made only of the `FILTERS` is recorded as
+        covered by the mirror.
+
+        Returns:
+            int: The number of works stored.
+
+        Raises:
+            ValueError: If the query selects fields, since partial works can not be
+                served as complete ones.
+        """
+        if "select" in endpoint.request_params:
+            msg = "Queries with select can not be mirrored, the works would be incomplete."
+            raise ValueError(msg)
+
+        started = time.time()
+        stored = self.store(endpoint.raw(rows=rows), batch_size=batch_size)
+
+        filters = self._covered_filters(endpoint.request_params)
+        if filters is not None:
+            with self.connection as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO syncs VALUES (?, ?, ?)", (filters, started, stored)
+                )
+        return stored
+
+    @staticmethod
+    def _covered_filters(request_params: dict) -> str | None:
+        if set(request_params) - {"filter"}:
+            return None
+        pairs = parse_filters(request_params.get("filter", ""))
+        if pairs is None:
+            return None
+        return ",".join(f"{name}:{value}" for name, value in pairs)
+
+    def _fresh(self) -> float:
+        return time.time() - self.max_age
+
+    def get(self, doi: str) -> dict | None:
+        """
+        Return a stored work if it is fresh enough, otherwise None.
+        """
+        row = self.connection.execute(
+            "SELECT data FROM works WHERE doi = ? AND fetched >= ?", (doi.lower(), self._fresh())
+        ).fetchone()
+        return self.decode(row[0]) if row is not None else None
+
+    def __contains__(self, doi: str) -> bool:
+        row = self.connection.execute(
+            "SELECT 1 FROM works WHERE doi = ? AND fetched >= ?", (doi.lower(), self._fresh())
+        ).fetchone()
+        return row is not None
+
+    def covers(self, request_params: dict) -> bool:
+        """
+        Tell whether a query was harvested recently enough to be answered locally.
+        """
+        filters = self._covered_filters(request_params)
+        if filters is None:
+            return False
+        row = self.connection.execute(
+            "SELECT 1 FROM syncs WHERE filters = ? AND synced >= ?", (filters, self._fresh())
+        ).fetchone()
+        return row is not None
+
+    def _where(self, filters: str) -> tuple[str, list]:
+        pairs = parse_filters(filters) if filters else []
+        if pairs is None:
+            msg = f"Filters specified as {filters} but must only use: {', '.join(FILTERS)}"
+            raise ValueError(msg)
+
+        conditions = " AND ".join(FILTERS[name] for name, _ in pairs) or "1"
+        values = [value for name, value in pairs for _ in range(FILTERS[name].count("?"))]
+        return conditions, values
+
+    def query(self, filters: str = "") -> Iterator[dict]:
+        """
+        Iterate through the stored works matching a ``filter`` request parameter.
+
+        Raises:
+            ValueError: If a filter is not one of `FILTERS`.
+        """
+        conditions, values = self._where(filters)
+        cursor = self.connection.execute(
+            f"SELECT data FROM works WHERE {conditions} ORDER BY doi",  # noqa: S608 - FILTERS only
+            values,
+        )
+        for (data,) in cursor:
+            yield self.decode(data)
+
+    def count(self, filters: str = "") -> int:
+        """
+        Count the stored works matching a ``filter`` request parameter. See `query`.
+        """
+        conditions, values = self._where(filters)
+        return self.connection.execute(
+            f"SELECT count(*) FROM works WHERE {conditions}",  # noqa: S608 - FILTERS only
+            values,
+        ).fetchone()[0]
+
+    def works(self, **kwargs) -> "MirroredWorks":
+        """
+        Return a `Works` endpoint reading through this mirror.
+
+        Args:
+            **kwargs: The usual endpoint arguments (`etiquette`, `http_request`, ...).
+        """
+        return MirroredWorks(self, **kwargs)
+
+
+class MirroredWorks(Works):
+    """
+    A `Works` endpoint answering from a `Mirror` when it can.
+
+    `doi` and `doi_exists` use the stored work when it is fresh enough and otherwise
+    ask the API, storing the work received. With ``only_message=False``, `doi` returns
+    the stored work in the envelope of a work response (``status``, ``message-type``,
+    ``message-version`` and ``message``). Iterating or counting a query made only of
+    `crossref.mirror.FILTERS` reads the mirror when that query was harvested recently
+    enough. Everything else, including `pages`, goes to the API.
+
+    The endpoints derived with `filter`, `query`, etc. keep the mirror. Instances are
+    usually built with `Mirror.works`.
+
+    Args:
+        mirror (Mirror): The mirror answering for the API.
+        **kwargs: The usual endpoint arguments (`etiquette`, `http_request`, ...).
+    """
+
+    def __init__(self, mirror: Mirror, **kwargs):
+        super().__init__(**kwargs)
+        self.mirror = mirror
+
+    def _derived_settings(self) -> dict:
+        return {"mirror": self.mirror}
+
+    def _lookup(self, lookup: Callable, *args) -> Any:
+        """
+        Look the mirror up, reporting a cache hit or miss to the listeners and the
+        tracer.
+        """
+        with self.http_request.span("crossref.cache", {"crossref.cache": "mirror"}) as span:
+            found = lookup(*args)
+            span.set_attribute("crossref.cache_hit", bool(found))
+        self.http_request.emit("cache", cache="mirror", hit=bool(found))
+        return found
+
+    def doi(self, doi: str, only_message: bool = True) -> Any | None:
+        work = self._lookup(self.mirror.get, doi)
+        if work is not None:
+            if only_message:
+                return work
+            return {
+                "status": "ok",
+                "message-type": "work",
+                "message-version": "1.0.0",
+                "message": work,
+            }
+
+        result = super().doi(doi, only_message=only_message)
+        if result is not None:
+            self.mirror.store([result if only_message else result["message"]])
+        return result
+
+    def doi_exists(self, doi: str) -> bool:
+        return self._lookup(self.mirror.__contains__, doi) or super().doi_exists(doi)
+
+    def count(self) -> int:
+        if self._lookup(self.mirror.covers, self.request_params):
+            return self.mirror.count(self.request_params.get("filter", ""))
+        return super().count()
+
+    def __iter__(self):
+        if self._lookup(self.mirror.covers, self.request_params):
+            yield from self.mirror.query(self.request_params.get("filter", ""))
+            return
+        yield from super().__iter__()
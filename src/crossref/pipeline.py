@@ -0,0 +1,166 @@
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextvars import copy_context
+from itertools import islice
+
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+
+def _run_chunk(func: Callable, items: list) -> list:
+    """
+    Apply ``func`` to each item, capturing the exceptions instead of raising them.
+
+    This is a module level function so it can be sent to process pools.
+    """
+    results = []
+    for item in items:
+        try:
+            results.append((True, func(item)))
+        except Exception as exc:  # noqa: BLE001 - errors are reported to the caller.
+            results.append((False, exc))
+    return results
+
+
+def _submit(executor: Executor, *args) -> Future:
+    """
+    Submit a call, run in the context of the caller (e.g. under its current trace
+    span) on thread pools. Process pools can not receive contexts.
+    """
+    if isinstance(executor, ThreadPoolExecutor):
+        return executor.submit(copy_context().run, *args)
+    return executor.submit(*args)
+
+
+class ParallelMap:
+    """
+    Apply a function to the items of an iterable on a thread or process pool.
+
+    The iterable (usually an endpoint, e.g. ``Works().filter(...)``) is consumed
+    lazily: at most ``window`` chunks are in flight at any time, so fetching the
+    next pages overlaps with processing the current ones without buffering the
+    whole harvest in memory when the function is slower than the API.
+
+    Args:
+        func (Callable): The function applied to each item. It must be picklable
+            when a process pool is used.
+        iterable (Iterable): The source of items.
+        workers (int, optional): The number of workers. Defaults to the CPU count.
+        executor (str | Executor, optional): "thread", "process" or an executor
+            instance, which is not shut down at the end. Defaults to "thread".
+        window (int, optional): The maximum number of chunks in flight. Defaults to
+            twice the number of workers.
+        chunksize (int, optional): The number of items sent to a worker at once,
+            which amortizes the pickling cost of process pools. Defaults to 1.
+        ordered (bool, optional): Yield the results in the order of the items. If
+            False, results are yielded as soon as they are ready. Defaults to True.
+        errors (str, optional): "raise" to stop at the first error, or "collect" to
+            skip the failed items and keep ``(item, exception)`` pairs in `errors`.
+            Defaults to "raise".
+
+    Usage:
+        works = Works().filter(from_index_date="2024-01-01")
+        results = ParallelMap(normalize, works, executor="process", errors="collect")
+        for result in results:
+            save(result)
+        print(results.errors)
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        func: Callable,
+        iterable: Iterable,
+        *,
+        workers: int | None = None,
+        executor: str | Executor = "thread",
+        window: int | None = None,
+        chunksize: int = 1,
+        ordered: bool = True,
+        errors: str = "raise",
+    ):
+        if errors not in ("raise", "collect"):
+            msg = f"Errors specified as {errors!s} but must be one of: raise, collect"
+            raise ValueError(msg)
+        if not isinstance(executor, Executor) and executor not in EXECUTORS:
+            msg = f"Executor specified as {executor!s} but must be one of: thread, process"
+            raise ValueError(msg)
+
+        self.func = func
+        self.iterable = iterable
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = executor
+        self.window = window or self.workers * 2
+        self.chunksize = chunksize
+        self.ordered = ordered
+        self.on_error = errors
+        self.errors = []
+
+    def _chunks(self) -> Iterator[list]:
+        iterator = iter(self.iterable)
+        while chunk := list(islice(iterator, self.chunksize)):
+            yield chunk
+
+    def _collect(self, future: Future, chunk: list) -> list:
+        results = []
+        for item, (ok, value) in zip(chunk, future.result(), strict=True):
+            if ok:
+                results.append(value)
+            elif self.on_error == "raise":
+                raise value
+            else:
+                self.errors.append((item, value))
+        return results
+
+    def __iter__(self):
+        owned = not isinstance(self.executor, Executor)
+        executor = EXECUTORS[self.executor](self.workers) if owned else self.executor
+        pending = deque() if self.ordered else {}
+        chunks = self._chunks()
+
+        def submit() -> bool:
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            future = _submit(executor, _run_chunk, self.func, chunk)
+            if self.ordered:
+                pending.append((future, chunk))
+            else:
+                pending[future] = chunk
+            return True
+
+        try:
+            while len(pending) < self.window and submit():
+                pass
+
+            while pending:
+                if self.ordered:
+                    future, chunk = pending.popleft()
+                    done = [(future, chunk)]
+                else:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    done = [(future, pending.pop(future)) for future in finished]
+
+                for future, chunk in done:
+                    submit()
+                    yield from self._collect(future, chunk)
+        finally:
+            futures = pending if not self.ordered else [future for future, _ in pending]
+            for future in futures:
+                future.cancel()
+            if owned:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+
+def parallel_map(func: Callable, iterable: Iterable, **kwargs) -> ParallelMap:
+    """
+    Shortcut to `ParallelMap`, see its documentation for the arguments.
+    """
+    return ParallelMap(func, iterable, **kwargs)
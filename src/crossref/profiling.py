@@ -0,0 +1,165 @@
+import threading
+from collections.abc import Iterable, Iterator
+from time import perf_counter
+from typing import Any
+
+from crossref.aggregate import Quantiles
+from crossref.restful import Endpoint, HTTPRequest
+
+# The phases of a harvest, in the order of a request:
+#
+# * connect: resolving the host name and opening new TCP connections.
+# * tls: the TLS handshake of the new connections.
+# * wait: from sending the request to the response headers, less the above.
+# * download: reading the response body.
+# * decode: parsing the JSON (not measured for the streamed responses, parsed while
+#   they are downloaded).
+# * throttle: sleeping to honor the rate limits.
+# * consumer: the time the consumer keeps each item, see `Profiler.iterate`.
+PHASES = ("connect", "tls", "wait", "download", "decode", "throttle", "consumer")
+
+
+class Profiler:
+    """
+    Break down the time of a harvest, or of single record calls, by phase.
+
+    The profiler listens to the events of an `HTTPRequest` (see
+    `HTTPRequest.add_listener`) while it runs, between `start` and `stop` or inside a
+    ``with`` block, and measures the consumer when the items go through `iterate`. It
+    keeps the total of each phase and its distribution (see `crossref.aggregate.Quantiles`),
+    so it can run along a harvest of any size. Every thread using the same
+    `HTTPRequest` is measured, so the phases may add up to more than the wall time.
+
+    Args:
+        target (Endpoint | HTTPRequest): The endpoint to profile, or its
+            `HTTPRequest`, which endpoints derived from each other share.
+
+    Attributes:
+        requests (int): The number of responses received.
+        errors (int): The number of requests failing without response.
+        statuses (dict[int, int]): The number of responses by status code.
+        size (int): The bytes received, streamed responses excepted.
+        wall (float): The seconds the profiler ran.
+
+    Usage:
+        works = Works().filter(from_index_date="2024-01-01")
+        with Profiler(works) as profiler:
+            for item in profiler.iterate(works):
+                save(item)
+        print(profiler.report())
+    """
+
+    def __init__(self, target: Endpoint | HTTPRequest):
+        self.http_request = target.http_request if isinstance(target, Endpoint) else target
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self.sketches = {phase: Quantiles(None) for phase in PHASES}
+        self.requests = 0
+        self.errors = 0
+        self.statuses = {}
+        self.size = 0
+        self.wall = 0.0
+        self._started = None
+        self._lock = threading.Lock()
+
+    def _add(self, phase: str, seconds: float):
+        self.totals[phase] += seconds
+        self.sketches[phase].add(seconds)
+
+    def __call__(self, event: str, data: dict):
+        with self._lock:
+            if event == "response":
+                self.requests += 1
+                self.statuses[data["status"]] = self.statuses.get(data["status"], 0) + 1
+                self.size += data["size"] or 0
+                self._add("connect", data["connect"])
+                self._add("tls", data["tls"])
+                self._add("wait", max(data["ttfb"] - data["connect"] - data["tls"], 0.0))
+                self._add("download", max(data["seconds"] - data["ttfb"], 0.0))
+            elif event == "error":
+                self.errors += 1
+            elif event in ("decode", "throttle"):
+                self._add(event, data["seconds"])
+
+    def start(self) -> "Profiler":
+        self.http_request.add_listener(self)
+        self._started = perf_counter()
+        return self
+
+    def stop(self):
+        self.http_request.remove_listener(self)
+        if self._started is not None:
+            self.wall += perf_counter() - self._started
+            self._started = None
+
+    def __enter__(self) -> "Profiler":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def iterate(self, iterable: Iterable) -> Iterator:
+        """
+        Yield the items of ``iterable``, measuring the time the consumer spends on each
+        of them (until it asks for the next one).
+        """
+        for item in iterable:
+            yielded = perf_counter()
+            yield item
+            elapsed = perf_counter() - yielded
+            with self._lock:
+                self._add("consumer", elapsed)
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Return the counters and, for each phase, its ``total``, ``share`` of the wall
+        time, ``count``, ``mean``, ``p50``, ``p95`` and ``max`` in seconds.
+        """
+        wall = self.wall + (perf_counter() - self._started if self._started else 0.0)
+        with self._lock:
+            phases = {}
+            for phase in PHASES:
+                sketch = self.sketches[phase]
+                total = self.totals[phase]
+                phases[phase] = {
+                    "total": total,
+                    "share": total / wall if wall else 0.0,
+                    "count": sketch.count,
+                    "mean": total / sketch.count if sketch.count else None,
+                    "p50": sketch.quantile(0.5),
+                    "p95": sketch.quantile(0.95),
+                    "max": sketch.max,
+                }
+            return {
+                "wall": wall,
+                "requests": self.requests,
+                "errors": self.errors,
+                "statuses": dict(self.statuses),
+                "size": self.size,
+                "phases": phases,
+            }
+
+    def report(self) -> str:
+        """
+        Return the `summary` as a table, e.g. to print it at the end of a run.
+        """
+        summary = self.summary()
+        lines = [
+            (
+                f"{summary['requests']} requests, {summary['errors']} errors,"
+                f" {summary['size'] / 1e6:.1f} MB in {summary['wall']:.2f} s"
+            ),
+            (
+                f"{'phase':<10}{'total s':>10}{'share':>8}{'count':>8}"
+                f"{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"
+            ),
+        ]
+
+        def milliseconds(value: float | None) -> str:
+            return f"{value * 1000:>10.1f}" if value is not None else f"{'-':>10}"
+
+        for phase, stats in summary["phases"].items():
+            lines.append(
+                f"{phase:<10}{stats['total']:>10.3f}{stats['share']:>8.1%}{stats['count']:>8}"
+                + "".join(milliseconds(stats[key]) for key in ("mean", "p50", "p95", "max"))
+            )
+        return "\n".join(lines)
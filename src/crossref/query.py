@@ -0,0 +1,352 @@
+import json
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+from urllib.parse import urlencode
+
+from crossref import validators
+from crossref.restful import (
+    Endpoint,
+    Funders,
+    Journals,
+    Members,
+    Prefixes,
+    Types,
+    UrlSyntaxError,
+    Works,
+    build_url_endpoint,
+)
+
+VALIDATION_CACHE_SIZE: int = 65536
+
+ENDPOINTS = {cls.ENDPOINT: cls for cls in (Works, Funders, Members, Types, Prefixes, Journals)}
+
+
+class QueryTemplate:
+    """
+    A query validated and normalized once, then bound to many values.
+
+    The static part of the query is taken from an endpoint built with the usual
+    chainable methods (`query`, `filter`, `select`, `sort`, `order`, `sample`). The
+    filters and field queries named as placeholders are left open and receive their
+    values on `bind`, which only validates the new values (memoizing the validator
+    results) and fills a precomputed parameter layout.
+
+    Usage:
+        template = QueryTemplate(
+            Works().filter(type="journal-article").select("DOI"),
+            filters=("member", "from_pub_date"),
+            queries=("bibliographic",),
+        )
+        params = template.bind(member=98, from_pub_date="2020", bibliographic="zika")
+        works = template.endpoint(member=98, from_pub_date="2020", bibliographic="zika")
+    """
+
+    def __init__(self, endpoint: Endpoint, filters=(), queries=()):
+        self.base = endpoint
+        self.request_url = str(endpoint.request_url)
+        static_params = endpoint._escaped_pagging()
+        self._static_filter = static_params.pop("filter", "")
+
+        self._filters = []
+        for name in filters:
+            decoded_fltr = name.replace("__", ".").replace("_", "-")
+            if decoded_fltr not in endpoint.FILTER_VALIDATOR:
+                msg = (
+                    f"Filter {decoded_fltr!s} specified but there is no such filter for"
+                    f" this route. Valid filters for this route"
+                    f" are: {', '.join(endpoint.FILTER_VALIDATOR.keys())}"
+                )
+                raise UrlSyntaxError(msg)
+            self._filters.append((name, decoded_fltr, endpoint.FILTER_VALIDATOR[decoded_fltr]))
+
+        fields_query = getattr(endpoint, "FIELDS_QUERY", ())
+        self._queries = []
+        for name in queries:
+            if name not in fields_query:
+                msg = (
+                    f"Field query {name!s} specified but there is no such field query for"
+                    f" this route. Valid field queries for this route are:"
+                    f" {', '.join(fields_query)}"
+                )
+                raise UrlSyntaxError(msg)
+            self._queries.append((name, "query.{}".format(name.replace("_", "-"))))
+
+        self.placeholders = frozenset(
+            [name for name, _, _ in self._filters] + [name for name, _ in self._queries]
+        )
+        if len(self.placeholders) != len(self._filters) + len(self._queries):
+            msg = "Placeholders must be unique across filters and field queries."
+            raise UrlSyntaxError(msg)
+
+        dynamic_keys = {key for _, key in self._queries}
+        if self._filters:
+            dynamic_keys.add("filter")
+        elif self._static_filter:
+            static_params["filter"] = self._static_filter
+
+        for key in dynamic_keys:
+            static_params.pop(key, None)
+
+        # (key, static value, is a placeholder) sorted by key, so bound parameters come
+        # out in the same canonical order as `Endpoint.url` without sorting each time.
+        self._layout = tuple(
+            (key, static_params.get(key), key in dynamic_keys)
+            for key in sorted(set(static_params) | dynamic_keys)
+        )
+
+        self._validate = lru_cache(maxsize=VALIDATION_CACHE_SIZE)(self._validate)
+
+    @staticmethod
+    def _validate(validator, value: str) -> bool:
+        return validator(value)
+
+    def bind(self, **values) -> tuple:
+        """
+        Bind values to the placeholders and return the request parameters.
+
+        Args:
+            **values: One value for each placeholder given when the template was built.
+
+        Returns:
+            tuple: ``(key, value)`` pairs sorted by key, ready to be sent as request
+                parameters.
+
+        Raises:
+            UrlSyntaxError: If a placeholder is missing, unknown or receives an invalid
+                value.
+        """
+        if values.keys() != self.placeholders:
+            missing = ", ".join(sorted(self.placeholders - values.keys()))
+            unknown = ", ".join(sorted(values.keys() - self.placeholders))
+            msg = f"Template values mismatch. Missing: ({missing}) Unknown: ({unknown})"
+            raise UrlSyntaxError(msg)
+
+        dynamic = {}
+
+        if self._filters:
+            parts = [self._static_filter] if self._static_filter else []
+            for name, decoded_fltr, validator in self._filters:
+                value = str(values[name])
+                if validator is not None:
+                    try:
+                        self._validate(validator, value)
+                    except ValueError as exc:
+                        raise UrlSyntaxError(str(exc)) from exc
+                parts.append(f"{decoded_fltr}:{value}")
+            dynamic["filter"] = ",".join(parts)
+
+        for name, key in self._queries:
+            dynamic[key] = values[name]
+
+        return tuple(
+            (key, dynamic[key] if placeholder else value)
+            for key, value, placeholder in self._layout
+        )
+
+    def cache_key(self, **values) -> str:
+        """
+        Return the canonical URL of the bound query, suitable as a cache key.
+
+        It is the same value `Endpoint.url` gives for the equivalent endpoint.
+        """
+        params = self.bind(**values)
+        return f"{self.request_url}?{urlencode(params)}" if params else self.request_url
+
+    def endpoint(self, **values) -> Endpoint:
+        """
+        Return an endpoint for the bound query, ready to be iterated or counted.
+        """
+        base = self.base
+        return base.__class__(
+            request_url=self.request_url,
+            request_params=dict(self.bind(**values)),
+            context=base.context,
+            etiquette=base.etiquette,
+            throttle=base.throttle,
+            crossref_plus_token=base.crossref_plus_token,
+            timeout=base.timeout,
+            verify=base.verify,
+            http_request=base.http_request,
+            **base._derived_settings(),
+        )
+
+
+def _paging(endpoint_class: type[Endpoint], params) -> str:
+    if any(key == "sample" for key, _ in params):
+        return "sample"
+    return "cursor" if endpoint_class.CURSOR_AS_ITER_METHOD else "offset"
+
+
+@dataclass(frozen=True, slots=True)
+class QuerySpec:
+    """
+    A compact description of a query that can be shipped to other processes or nodes.
+
+    Unlike endpoint objects, a spec carries no HTTP state: only the route, the
+    request parameters, the paging strategy and, optionally, the date bounds of a
+    shard. It pickles and converts to/from JSON, and `to_endpoint` turns it back
+    into a live endpoint on the receiving side, where credentials and HTTP settings
+    are given.
+
+    Attributes:
+        endpoint (str): The route name (``works``, ``journals``, ``members``, ...).
+        context (str): The parent route, e.g. ``members/98``, or an empty string.
+        params (tuple): ``(key, value)`` request parameters sorted by key.
+        paging (str): ``cursor``, ``offset`` or ``sample``. Derived from the endpoint.
+        shard (tuple | None): ``(field, from, until)`` date bounds, applied as the
+            ``from-{field}`` and ``until-{field}`` filters (both inclusive).
+        url (str | None): The request url, only when it differs from the default one.
+    """
+
+    endpoint: str
+    context: str = ""
+    params: tuple = ()
+    paging: str | None = None
+    shard: tuple | None = None
+    url: str | None = None
+
+    def __post_init__(self):
+        if self.endpoint not in ENDPOINTS:
+            msg = "Endpoint specified as {} but must be one of: {}".format(
+                self.endpoint, ", ".join(ENDPOINTS)
+            )
+            raise UrlSyntaxError(msg)
+
+        params = tuple(sorted((str(key), value) for key, value in self.params))
+        object.__setattr__(self, "params", params)
+
+        paging = _paging(ENDPOINTS[self.endpoint], params)
+        if self.paging is None:
+            object.__setattr__(self, "paging", paging)
+        elif self.paging != paging:
+            msg = f"Paging specified as {self.paging} but this query pages by {paging}"
+            raise UrlSyntaxError(msg)
+
+        if self.shard is not None:
+            field, since, until = self.shard
+            filter_validator = getattr(ENDPOINTS[self.endpoint], "FILTER_VALIDATOR", {})
+            for fltr, value in ((f"from-{field}", since), (f"until-{field}", until)):
+                if filter_validator.get(fltr) is not validators.is_date:
+                    msg = f"Shard field {field} has no {fltr} date filter for this route."
+                    raise UrlSyntaxError(msg)
+                try:
+                    validators.is_date(str(value))
+                except ValueError as exc:
+                    raise UrlSyntaxError(str(exc)) from exc
+            object.__setattr__(self, "shard", (field, str(since), str(until)))
+
+    @classmethod
+    def from_endpoint(cls, endpoint: Endpoint, shard: tuple | None = None) -> "QuerySpec":
+        """
+        Build the spec of an endpoint, e.g. ``Works().filter(...).select(...)``.
+        """
+        request_url = str(endpoint.request_url)
+        default_url = build_url_endpoint(endpoint.ENDPOINT, endpoint.context)
+        return cls(
+            endpoint=endpoint.ENDPOINT,
+            context=str(endpoint.context),
+            params=tuple(endpoint._escaped_pagging().items()),
+            shard=shard,
+            url=request_url if request_url != default_url else None,
+        )
+
+    @property
+    def request_params(self) -> dict:
+        """
+        The request parameters, including the shard filters.
+        """
+        request_params = dict(self.params)
+
+        if self.shard is not None:
+            field, since, until = self.shard
+            bounds = f"from-{field}:{since},until-{field}:{until}"
+            request_params["filter"] = (
+                f"{request_params['filter']},{bounds}" if "filter" in request_params else bounds
+            )
+
+        return request_params
+
+    def to_endpoint(self, **kwargs) -> Endpoint:
+        """
+        Return a live endpoint for this spec.
+
+        Args:
+            **kwargs: Endpoint settings that are not part of the spec, such as
+                `etiquette`, `crossref_plus_token`, `timeout` or `http_request`.
+        """
+        return ENDPOINTS[self.endpoint](
+            request_url=self.url or build_url_endpoint(self.endpoint, self.context),
+            request_params=self.request_params,
+            context=self.context,
+            **kwargs,
+        )
+
+    def iterate(self, **kwargs):
+        """
+        Return an iterator over the items of this spec. See `to_endpoint`.
+        """
+        return iter(self.to_endpoint(**kwargs))
+
+    def shard_by_date(self, field: str, since: date, until: date, days: int) -> list["QuerySpec"]:
+        """
+        Split this spec into consecutive, non-overlapping shards of ``days`` days.
+
+        Args:
+            field (str): The date filter suffix, e.g. ``pub-date`` or ``index-date``.
+            since (date): The first day of the first shard.
+            until (date): The last day of the last shard.
+            days (int): The number of days covered by each shard.
+        """
+        if days < 1:
+            msg = f"Integer specified as {days!s} but must be a positive integer."
+            raise UrlSyntaxError(msg)
+
+        shards = []
+        start = since
+        while start <= until:
+            end = min(start + timedelta(days=days - 1), until)
+            shards.append(self.with_shard((field, start.isoformat(), end.isoformat())))
+            start = end + timedelta(days=1)
+        return shards
+
+    def with_shard(self, shard: tuple | None) -> "QuerySpec":
+        """
+        Return a copy of this spec with other shard bounds.
+        """
+        return QuerySpec(
+            endpoint=self.endpoint,
+            context=self.context,
+            params=self.params,
+            shard=shard,
+            url=self.url,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "endpoint": self.endpoint,
+            "context": self.context,
+            "params": [list(pair) for pair in self.params],
+            "paging": self.paging,
+            "shard": list(self.shard) if self.shard is not None else None,
+            "url": self.url,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuerySpec":
+        shard = data.get("shard")
+        return cls(
+            endpoint=data["endpoint"],
+            context=data.get("context", ""),
+            params=tuple(tuple(pair) for pair in data.get("params", ())),
+            paging=data.get("paging"),
+            shard=tuple(shard) if shard is not None else None,
+            url=data.get("url"),
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, data: str | bytes) -> "QuerySpec":
+        return cls.from_dict(json.loads(data))
@@ -0,0 +1,385 @@
+import json
+import sys
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from crossref import jsonstream
+from crossref.restful import LIMIT, Endpoint
+
+_MISSING = object()
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _first(values: Any) -> Any:
+    """
+    Return the first element of the list fields holding a single value, such as
+    ``title`` and ``container-title``.
+    """
+    if isinstance(values, list):
+        return values[0] if values else None
+    return values
+
+
+def _date(value: dict | None) -> tuple | None:
+    """
+    Return the first ``date-parts`` of a Crossref date as a tuple, e.g. ``(2020, 5)``.
+    """
+    if not value:
+        return None
+    parts = (value.get("date-parts") or [[]])[0]
+    if not parts or parts[0] is None:
+        return None
+    return tuple(parts)
+
+
+class _Record(ABC):
+    __slots__ = ()
+
+    @abstractmethod
+    def to_dict(self) -> dict:
+        """
+        Return the record as the JSON object it was built from.
+        """
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for name in self.__slots__
+            if not name.startswith("_") and getattr(self, name) is not None
+        )
+        return f"{self.__class__.__name__}({fields})"
+
+    def _keep_extra(self, data: dict) -> "_Record":
+        """
+        Keep in ``extra`` the keys of ``data`` that the slots do not give back as they
+        were (e.g. ``authenticated-orcid``), so `to_dict` returns ``data``.
+        """
+        rebuilt = self.to_dict()
+        extra = {key: value for key, value in data.items() if rebuilt.get(key, _MISSING) != value}
+        self.extra = extra or None
+        return self
+
+
+class Author(_Record):
+    """
+    An author of a work. Affiliations are kept as a tuple of names, and the keys
+    without a slot in ``extra``.
+    """
+
+    __slots__ = ("affiliation", "extra", "family", "given", "name", "orcid", "sequence")
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        given: str | None = None,
+        family: str | None = None,
+        name: str | None = None,
+        orcid: str | None = None,
+        sequence: str | None = None,
+        affiliation: tuple | None = None,
+        extra: dict | None = None,
+    ):
+        self.given = given
+        self.family = family
+        self.name = name
+        self.orcid = orcid
+        self.sequence = _intern(sequence)
+        self.affiliation = affiliation
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Author":
+        affiliations = data.get("affiliation")
+        if affiliations is not None:
+            affiliations = tuple(
+                _intern(affiliation["name"])
+                for affiliation in affiliations
+                if "name" in affiliation
+            )
+        return cls(
+            given=data.get("given"),
+            family=data.get("family"),
+            name=data.get("name"),
+            orcid=data.get("ORCID"),
+            sequence=data.get("sequence"),
+            affiliation=affiliations,
+        )._keep_extra(data)
+
+    def to_dict(self) -> dict:
+        data = {
+            key: value
+            for key, value in (
+                ("given", self.given),
+                ("family", self.family),
+                ("name", self.name),
+                ("ORCID", self.orcid),
+                ("sequence", self.sequence),
+            )
+            if value is not None
+        }
+        if self.affiliation is not None:
+            data["affiliation"] = [{"name": name} for name in self.affiliation]
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+class Funder(_Record):
+    """
+    A funder of a work, with its award numbers, and the keys without a slot in
+    ``extra``.
+    """
+
+    __slots__ = ("award", "doi", "doi_asserted_by", "extra", "name")
+
+    def __init__(
+        self,
+        name: str | None = None,
+        doi: str | None = None,
+        doi_asserted_by: str | None = None,
+        award: tuple | None = None,
+        extra: dict | None = None,
+    ):
+        self.name = _intern(name)
+        self.doi = doi
+        self.doi_asserted_by = _intern(doi_asserted_by)
+        self.award = award
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Funder":
+        award = data.get("award")
+        return cls(
+            name=data.get("name"),
+            doi=data.get("DOI"),
+            doi_asserted_by=data.get("doi-asserted-by"),
+            award=None if award is None else tuple(award),
+        )._keep_extra(data)
+
+    def to_dict(self) -> dict:
+        data = {
+            key: value
+            for key, value in (
+                ("name", self.name),
+                ("DOI", self.doi),
+                ("doi-asserted-by", self.doi_asserted_by),
+            )
+            if value is not None
+        }
+        if self.award is not None:
+            data["award"] = list(self.award)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+class Reference(_Record):
+    """
+    An entry of the reference list of a work, with the keys without a slot (e.g.
+    ``issue``, ``ISSN`` or ``series-title``) in ``extra``.
+    """
+
+    __slots__ = (
+        "article_title",
+        "author",
+        "doi",
+        "doi_asserted_by",
+        "extra",
+        "first_page",
+        "journal_title",
+        "key",
+        "unstructured",
+        "volume",
+        "year",
+    )
+
+    KEYS = (
+        ("key", "key"),
+        ("doi", "DOI"),
+        ("doi_asserted_by", "doi-asserted-by"),
+        ("unstructured", "unstructured"),
+        ("article_title", "article-title"),
+        ("journal_title", "journal-title"),
+        ("author", "author"),
+        ("year", "year"),
+        ("volume", "volume"),
+        ("first_page", "first-page"),
+    )
+
+    def __init__(self, *, extra: dict | None = None, **fields):
+        for name, _ in self.KEYS:
+            setattr(self, name, fields.pop(name, None))
+        self.extra = extra
+        if fields:
+            msg = f"Unexpected reference fields: {', '.join(fields)}"
+            raise TypeError(msg)
+        self.doi_asserted_by = _intern(self.doi_asserted_by)
+        self.journal_title = _intern(self.journal_title)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Reference":
+        return cls(**{name: data[key] for name, key in cls.KEYS if key in data})._keep_extra(data)
+
+    def to_dict(self) -> dict:
+        data = {key: value for name, key in self.KEYS if (value := getattr(self, name)) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+
+class Work(_Record):
+    """
+    A compact, read-only work record built from the JSON of a Crossref work.
+
+    The commonly used fields are decoded once into slots, interning the strings that
+    repeat across records (``publisher``, ``container-title``, ``type``, ...). The
+    JSON itself is kept as bytes, which take a fraction of the memory of the decoded
+    dictionary: the rarely used fields (``reference``, ``abstract``, ``subject``)
+    are decoded from it on first access, any other field with `get`, and `to_dict`
+    returns the original record.
+
+    Args:
+        raw (bytes | memoryview): The JSON of the work, e.g. an item yielded by
+            `Endpoint.raw`. It is copied, so the response it comes from can be freed.
+
+    Usage:
+        work = Work.from_dict(Works().doi("10.1590/0102-311x00133115"))
+        work.publisher, work.issued, [author.family for author in work.author]
+    """
+
+    __slots__ = (
+        "_lazy",
+        "_raw",
+        "author",
+        "container_title",
+        "doi",
+        "funder",
+        "is_referenced_by_count",
+        "issued",
+        "member",
+        "publisher",
+        "references_count",
+        "title",
+        "type",
+    )
+
+    EAGER_FIELDS = (
+        "DOI",
+        "type",
+        "title",
+        "publisher",
+        "container-title",
+        "member",
+        "issued",
+        "is-referenced-by-count",
+        "references-count",
+        "author",
+        "funder",
+    )
+
+    def __init__(self, raw: bytes | memoryview):
+        self._raw = bytes(raw)
+        self._lazy = None
+
+        fields = jsonstream.raw_fields(self._raw, self.EAGER_FIELDS)
+        self.doi = fields.get("DOI")
+        self.type = _intern(fields.get("type"))
+        self.title = _first(fields.get("title"))
+        self.publisher = _intern(fields.get("publisher"))
+        self.container_title = _intern(_first(fields.get("container-title")))
+        self.member = _intern(fields.get("member"))
+        self.issued = _date(fields.get("issued"))
+        self.is_referenced_by_count = fields.get("is-referenced-by-count")
+        self.references_count = fields.get("references-count")
+        self.author = tuple(Author.from_dict(author) for author in fields.get("author", ()))
+        self.funder = tuple(Funder.from_dict(funder) for funder in fields.get("funder", ()))
+
+    @classmethod
+    def from_raw(cls, raw: bytes | memoryview) -> "Work":
+        return cls(raw)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Work":
+        return cls(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Decode a field of the original record, e.g. ``work.get("license")``.
+
+        The result is not cached, the field is decoded again on each call.
+        """
+        return jsonstream.raw_field(self._raw, key, default)
+
+    def _decode(self, key: str, convert) -> Any:
+        if self._lazy is None:
+            self._lazy = {}
+        value = self._lazy.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._lazy[key] = convert(self.get(key))
+        return value
+
+    @property
+    def reference(self) -> tuple[Reference, ...]:
+        return self._decode(
+            "reference", lambda value: tuple(Reference.from_dict(ref) for ref in value or ())
+        )
+
+    @property
+    def abstract(self) -> str | None:
+        return self._decode("abstract", lambda value: value)
+
+    @property
+    def subject(self) -> tuple[str, ...]:
+        return self._decode("subject", lambda value: tuple(_intern(s) for s in value or ()))
+
+    def to_dict(self) -> dict:
+        """
+        Decode and return the original record.
+        """
+        return json.loads(self._raw)
+
+    def to_json(self) -> bytes:
+        """
+        Return the JSON of the original record.
+        """
+        return self._raw
+
+    def __reduce__(self):
+        return self.__class__, (self._raw,)
+
+    def __repr__(self) -> str:
+        return f"Work(doi={self.doi!r}, type={self.type!r}, title={self.title!r})"
+
+
+def iter_works(endpoint: Endpoint, rows: int = LIMIT) -> Iterator[Work]:
+    """
+    Iterate through the results of a ``works`` endpoint as `Work` records.
+
+    The responses are split with `Endpoint.raw`, so the items are never decoded as
+    dictionaries.
+
+    Args:
+        endpoint (Endpoint): A ``works`` endpoint, e.g. ``Works().filter(...)``.
+        rows (int, optional): The number of items per page. Defaults to `LIMIT`.
+    """
+    for item in endpoint.raw(rows=rows):
+        yield Work(item)
+
+
+def to_works(items: Iterable[dict]) -> Iterator[Work]:
+    """
+    Convert already decoded items, e.g. from iterating an endpoint, to `Work` records.
+    """
+    for item in items:
+        yield Work.from_dict(item)
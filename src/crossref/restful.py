@@ -1,18 +1,34 @@
 import contextlib
+import threading
 import typing
 from collections.abc import Iterable
-from time import sleep
+from itertools import islice
+from time import monotonic, perf_counter, sleep
 from typing import Any
+from urllib.parse import urlencode, urlparse
 
-import requests
+import crossref
+from crossref import decoders, jsonstream, validators
+from crossref.transport import (
+    RETRY_BACKOFF,  # noqa: F401 - kept importable from here.
+    RETRY_STATUSES,  # noqa: F401 - kept importable from here.
+    RequestsTransport,
+    Transport,
+    connection_setup,
+)
 
-from crossref import VERSION, validators
+if typing.TYPE_CHECKING:
+    import requests
 
 LIMIT: int = 100
 MAX_OFFSET: int = 10000
 MAX_SAMPLE_SIZE: int = 100
+STREAM_CHUNK_SIZE: int = 64 * 1024
 FACETS_MAX_LIMIT: int = 1000
 NOT_FOUND_404: int = 404
+BAD_REQUEST_400: int = 400
+# The sub-resources following an identifier in the API routes, see `route`.
+SUBRESOURCES = frozenset(("works", "agency", "quality"))
 
 API = "api.crossref.org"
 
@@ -29,32 +45,275 @@ class UrlSyntaxError(CrossrefAPIError, ValueError):
     pass
 
 
+class _NullSpan:
+    """
+    The span given when `HTTPRequest.tracer` is not set, ignoring everything.
+    """
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def add_event(self, name: str, attributes: dict | None = None):
+        pass
+
+    def end(self):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
 class HTTPRequest:
-    def __init__(self, throttle: bool = True, verify: bool = True):
+    """
+    Perform the HTTP requests to the Crossref API honoring its rate limits.
+
+    A single instance may be shared by many threads, which is what happens when
+    one endpoint object is used from a worker pool:
+
+    * The rate limit state is replaced atomically, so readers always see a
+      consistent ``x-rate-limit-limit``/``x-rate-limit-interval`` pair.
+    * Throttling is computed per instance, not per thread. Each request reserves
+      the next free slot of the shared schedule under a lock, so concurrent
+      callers are spaced by ``throttling_time`` instead of all sleeping the same
+      amount at the same time.
+    * The requests are sent by a ``transport`` shared by the threads, by default a
+      `crossref.transport.RequestsTransport` giving each thread its own
+      ``requests.Session`` (sessions are not thread-safe), which ``close`` shuts
+      down at once. It is created by the first request, so importing the client
+      and building queries never imports ``requests``. Another
+      `crossref.transport.Transport` can use another HTTP library, e.g. the
+      standard library with `crossref.transport.HTTPClientTransport`, which starts
+      faster in short lived processes, or replay recorded responses (see
+      `crossref.transport.CassetteTransport`).
+
+    Endpoint objects derived from each other (``filter``, ``query``, ``works``,
+    etc.) share the same instance, so they also share the same schedule.
+
+    Responses are decoded with ``decoder``, the fastest JSON library installed by
+    default (see `crossref.decoders`). The items of streamed responses are decoded
+    with ``decoder`` when one is given, and by the incremental parser of
+    `crossref.jsonstream` otherwise, which is faster than finding their boundaries
+    to hand them to another decoder.
+
+    With ``retries``, the default transport retries the connection errors and the
+    `crossref.transport.RETRY_STATUSES` responses of the idempotent requests up to
+    that many times. By default nothing is retried. ``pool_maxsize`` and ``retries``
+    are ignored when a ``transport`` is given.
+
+    Listeners added with `add_listener` are called with ``(event, data)`` in the
+    thread making the request, for these events:
+
+    * ``"throttle"``: ``seconds`` slept to honor the rate limits.
+    * ``"response"``: ``method``, ``url``, ``status``, ``seconds`` (the whole
+      request), ``ttfb`` (until the response headers), ``size`` (the body size, None
+      for streamed responses), ``connect`` and ``tls`` (the time spent opening new
+      connections, if any, as measured by the transport), ``retries`` (the failed
+      attempts before this response) and ``headers``.
+    * ``"error"``: ``method``, ``url``, ``seconds`` and ``error``, the exception
+      raised by the transport.
+    * ``"decode"``: ``seconds`` and ``size`` of a decoded body.
+    * ``"cache"``: ``cache``, the name of a local cache answering for the API (e.g.
+      ``"mirror"``, see `crossref.mirror`), and ``hit``, whether it had the answer.
+
+    With a ``tracer``, the harvests, their pages, the requests, the local cache
+    lookups and the deposits are traced as spans (see `crossref.tracing` for
+    OpenTelemetry). A tracer has two methods: ``start_span(name, attributes)``,
+    returning a span child of the current one with ``set_attribute``, ``add_event``
+    and ``end`` methods, and ``use_span(span, end=True)``, a context manager making
+    the span current during its block, recording an exception escaping it and ending
+    the span unless ``end`` is False.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        throttle: bool = True,
+        verify: bool = True,
+        *,
+        pool_maxsize: int = 10,
+        decoder: str | decoders.Decoder | None = None,
+        listeners: Iterable[typing.Callable] = (),
+        retries: int = 0,
+        tracer: Any = None,
+        transport: Transport | None = None,
+    ):
         self.throttle = throttle
+        self.listeners = list(listeners)
+        self.retries = retries
+        self.tracer = tracer
         self.rate_limits = {"x-rate-limit-limit": 50, "x-rate-limit-interval": 1}
         self.verify = verify  # Disable SSL verification by default
+        self.pool_maxsize = pool_maxsize
+        self._transport = transport
+        self._default_transport = transport is None
+        # The default decoder is looked up by the first response; a decoder given by
+        # name is checked now.
+        self._decoder = None if decoder is None else decoders.get_decoder(decoder)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def __getstate__(self) -> dict:
+        # The lock, the throttle schedule and the default transport (with its
+        # connections) belong to this process; a copy starts new ones.
+        state = dict(self.__dict__)
+        del state["_lock"]
+        state["_next_slot"] = 0.0
+        if self._default_transport:
+            state["_transport"] = None
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
 
     def _update_rate_limits(self, headers):
+        rate_limits = self.rate_limits
+        limit_value = rate_limits["x-rate-limit-limit"]
+        interval_value = rate_limits["x-rate-limit-interval"]
+
         with contextlib.suppress(ValueError):
-            self.rate_limits["x-rate-limit-limit"] = int(headers.get("x-rate-limit-limit", 50))
+            limit_value = int(headers.get("x-rate-limit-limit", 50))
 
+        interval = headers.get("x-rate-limit-interval", "1s")
         with contextlib.suppress(ValueError):
-            interval_value = int(headers.get("x-rate-limit-interval", "1s")[:-1])
+            interval_value = int(interval[:-1])
 
-        interval_scope = headers.get("x-rate-limit-interval", "1s")[-1]
+            interval_scope = interval[-1]
 
-        if interval_scope == "m":
-            interval_value = interval_value * 60
+            if interval_scope == "m":
+                interval_value = interval_value * 60
 
-        if interval_scope == "h":
-            interval_value = interval_value * 60 * 60
+            if interval_scope == "h":
+                interval_value = interval_value * 60 * 60
 
-        self.rate_limits["x-rate-limit-interval"] = interval_value
+        # Swap the whole dict so concurrent readers never see a half-updated pair.
+        self.rate_limits = {
+            "x-rate-limit-limit": limit_value,
+            "x-rate-limit-interval": interval_value,
+        }
 
     @property
     def throttling_time(self):
-        return self.rate_limits["x-rate-limit-interval"] / self.rate_limits["x-rate-limit-limit"]
+        rate_limits = self.rate_limits
+        return rate_limits["x-rate-limit-interval"] / rate_limits["x-rate-limit-limit"]
+
+    def _reserve_slot(self) -> float:
+        """
+        Reserve the next request slot and return how long to wait for it.
+        """
+        with self._lock:
+            now = monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.throttling_time
+        return slot - now
+
+    @property
+    def transport(self) -> Transport:
+        """
+        The transport sending the requests, by default a `RequestsTransport` created on
+        first use.
+        """
+        if self._transport is None:
+            with self._lock:
+                if self._transport is None:
+                    self._transport = RequestsTransport(self.pool_maxsize, retries=self.retries)
+        return self._transport
+
+    @transport.setter
+    def transport(self, transport: Transport):
+        self._transport = transport
+        self._default_transport = False
+
+    @property
+    def session(self) -> "requests.Session":
+        """
+        The ``requests.Session`` owned by the calling thread, with the default
+        transport.
+        """
+        return self.transport.session
+
+    def close(self):
+        """
+        Close the transport, e.g. the sessions of every thread that used this instance.
+        """
+        if self._transport is not None:
+            self._transport.close()
+
+    def add_listener(self, listener: typing.Callable[[str, dict], None]):
+        """
+        Call ``listener(event, data)`` on the events of the requests, see above.
+        """
+        self.listeners = [*self.listeners, listener]
+
+    def remove_listener(self, listener: typing.Callable[[str, dict], None]):
+        self.listeners = [other for other in self.listeners if other is not listener]
+
+    def emit(self, event: str, **data):
+        """
+        Call the listeners, which see the list of the moment: adding or removing one
+        replaces the list so concurrent requests are not disturbed.
+        """
+        for listener in self.listeners:
+            listener(event, data)
+
+    def start_span(self, name: str, attributes: dict | None = None) -> Any:
+        """
+        Start a span with the tracer, child of the current span, without making it
+        current. It must be ended, e.g. by `use_span`.
+        """
+        if self.tracer is None:
+            return _NULL_SPAN
+        return self.tracer.start_span(name, attributes or {})
+
+    @contextlib.contextmanager
+    def use_span(self, span: Any, end: bool = True):
+        """
+        Make ``span`` current during the block, record an exception escaping it on
+        the span and end the span, unless ``end`` is False.
+        """
+        if span is _NULL_SPAN or self.tracer is None:
+            yield span
+            return
+        with self.tracer.use_span(span, end=end):
+            yield span
+
+    def span(self, name: str, attributes: dict | None = None):
+        """
+        Shortcut to start a span and use it, e.g.
+        ``with http_request.span("crossref.cache") as span: ...``.
+        """
+        return self.use_span(self.start_span(name, attributes))
+
+    @property
+    def decoder(self) -> decoders.Decoder:
+        """
+        The function decoding the JSON responses, see `decoders.get_decoder`.
+        """
+        # The default is looked up on use: the optional decoders are imported on first
+        # use, and `_decoder` only holds the one given.
+        return self._decoder or decoders.get_decoder()
+
+    @decoder.setter
+    def decoder(self, decoder: str | decoders.Decoder | None):
+        self._decoder = None if decoder is None else decoders.get_decoder(decoder)
+
+    @property
+    def item_decoder(self) -> decoders.Decoder | None:
+        """
+        The decoder given for the items of streamed responses, or None to let the
+        incremental parser of `crossref.jsonstream` decode them.
+        """
+        return self._decoder
+
+    def decode(self, result):
+        """
+        Decode the JSON body of a response.
+        """
+        if not self.listeners:
+            return self.decoder(result.content)
+        started = perf_counter()
+        decoded = self.decoder(result.content)
+        self.emit("decode", seconds=perf_counter() - started, size=len(result.content))
+        return decoded
 
     def do_http_request(  # noqa: PLR0913
         self,
@@ -65,15 +324,22 @@ class HTTPRequest:
         timeout: int = 100,
         only_headers: bool = False,
         custom_header=None,
+        stream: bool = False,
     ):
         if only_headers:
-            return requests.head(endpoint, timeout=2)
+            return self._send("head", endpoint, timeout=2, verify=self.verify)
 
-        action = requests.post if method == "post" else requests.get
+        if self.throttle:
+            delay = self._reserve_slot()
+            if delay > 0:
+                sleep(delay)
+                if self.listeners:
+                    self.emit("throttle", seconds=delay)
 
         headers = custom_header if custom_header else {"user-agent": str(Etiquette())}
         if method == "post":
-            result = action(
+            result = self._send(
+                method,
                 endpoint,
                 data=data,
                 files=files,
@@ -82,20 +348,108 @@ class HTTPRequest:
                 verify=self.verify,
             )
         else:
-            result = action(
+            result = self._send(
+                method,
                 endpoint,
                 params=data,
                 timeout=timeout,
                 headers=headers,
                 verify=self.verify,
+                stream=stream,
             )
 
         if self.throttle:
             self._update_rate_limits(result.headers)
-            sleep(self.throttling_time)
 
         return result
 
+    def _send(self, method: str, url: str, **kwargs):
+        """
+        Send a request with the transport, reporting it to the listeners and the tracer.
+        """
+        if not self.listeners and self.tracer is None:
+            return self.transport.request(method, url, **kwargs)
+
+        attributes = {
+            "http.request.method": method.upper(),
+            "url.full": url,
+            "crossref.route": route(url),
+        }
+        with self.span("crossref.request", attributes) as span:
+            connection_setup.connect = connection_setup.tls = 0.0
+            started = perf_counter()
+            try:
+                result = self.transport.request(method, url, **kwargs)
+            except Exception as exc:
+                seconds = perf_counter() - started
+                self.emit("error", method=method, url=url, seconds=seconds, error=exc)
+                raise
+            seconds = perf_counter() - started
+            size = None if kwargs.get("stream") else len(result.content)
+            retries = getattr(result.raw, "retries", None)
+            history = retries.history if retries else ()
+
+            span.set_attribute("http.response.status_code", result.status_code)
+            if size is not None:
+                span.set_attribute("http.response.body.size", size)
+            span.set_attribute("crossref.retries", len(history))
+            for attempt in history:
+                span.add_event(
+                    "retry",
+                    {
+                        "http.response.status_code": attempt.status or 0,
+                        "error": repr(attempt.error),
+                    },
+                )
+            self.emit(
+                "response",
+                method=method,
+                url=url,
+                status=result.status_code,
+                seconds=seconds,
+                ttfb=result.elapsed.total_seconds(),
+                size=size,
+                connect=connection_setup.connect,
+                tls=connection_setup.tls,
+                retries=len(history),
+                headers=result.headers,
+            )
+        return result
+
+
+def route(url: str) -> str:
+    """
+    Return the route of an API URL, its path with the identifiers replaced, to label
+    metrics and traces with a bounded number of values.
+
+    Usage:
+        >>> route("https://api.crossref.org/members/78/works?rows=20")
+        '/members/{id}/works'
+        >>> route("https://api.crossref.org/works/10.1590/0102-311x00133115/agency")
+        '/works/{id}/agency'
+    """
+    segments = [segment for segment in urlparse(url).path.split("/") if segment]
+    if len(segments) <= 1:
+        return "/" + "/".join(segments)
+    if segments[-1] in SUBRESOURCES:
+        return f"/{segments[0]}/{{id}}/{segments[-1]}"
+    return f"/{segments[0]}/{{id}}"
+
+
+def params_hash(params: dict) -> str:
+    """
+    Return a short hash identifying a query by its parameters, paging excepted, so
+    the pages of a harvest share it.
+    """
+    import hashlib  # noqa: PLC0415 - not needed by single lookups.
+
+    query = sorted(
+        (key, str(value))
+        for key, value in params.items()
+        if key not in ("cursor", "offset", "rows")
+    )
+    return hashlib.sha1(urlencode(query).encode(), usedforsecurity=False).hexdigest()[:16]
+
 
 def build_url_endpoint(endpoint: str, context: str | None = None) -> str:
     endpoint = "/".join([i for i in [context, endpoint] if i])
@@ -119,7 +473,7 @@ class Etiquette:
     def __str__(self):
         return (
             f"{self.application_name}/{self.application_version} ({self.application_url};"
-            f" mailto:{self.contact_email}) BasedOn: CrossrefAPI/{VERSION}"
+            f" mailto:{self.contact_email}) BasedOn: CrossrefAPI/{crossref.VERSION}"
         )
 
 
@@ -137,21 +491,37 @@ class Endpoint:
         crossref_plus_token=None,
         timeout=30,
         verify=True,
+        http_request=None,
     ):
-        self.throttle = throttle
-        self.verify = verify
-        self.http_request = HTTPRequest(throttle=throttle, verify=verify)
+        self.http_request = http_request or HTTPRequest(throttle=throttle, verify=verify)
+        self.throttle = self.http_request.throttle
+        self.verify = self.http_request.verify
         self.do_http_request = self.http_request.do_http_request
         self.etiquette = etiquette or Etiquette()
-        self.custom_header = {"user-agent": str(self.etiquette)}
         self.crossref_plus_token = crossref_plus_token
-        if crossref_plus_token:
-            self.custom_header["Crossref-Plus-API-Token"] = self.crossref_plus_token
         self.request_url = request_url or build_url_endpoint(self.ENDPOINT, context)
         self.request_params = request_params or {}
         self.context = context or ""
         self.timeout = timeout
 
+    def _derived_settings(self) -> dict:
+        """
+        The settings given to the endpoints derived from this one (with `filter`,
+        `query`, etc.) besides the request and HTTP ones, for subclasses keeping state.
+        """
+        return {}
+
+    @property
+    def custom_header(self) -> dict:
+        """
+        The headers sent with each request: the user agent built from the etiquette
+        and the Plus API token, if any.
+        """
+        custom_header = {"user-agent": str(self.etiquette)}
+        if self.crossref_plus_token:
+            custom_header["Crossref-Plus-API-Token"] = self.crossref_plus_token
+        return custom_header
+
     @property
     def _rate_limits(self):
         request_url = str(self.request_url)
@@ -199,7 +569,8 @@ class Endpoint:
             data=request_params,
             custom_header=self.custom_header,
             timeout=self.timeout,
-        ).json()
+        )
+        result = self.http_request.decode(result)
 
         return result["message-version"]
 
@@ -237,7 +608,8 @@ class Endpoint:
             data=request_params,
             custom_header=self.custom_header,
             timeout=self.timeout,
-        ).json()
+        )
+        result = self.http_request.decode(result)
 
         return int(result["message"]["total-results"])
 
@@ -257,9 +629,10 @@ class Endpoint:
         request_params = self._escaped_pagging()
 
         sorted_request_params = sorted([(k, v) for k, v in request_params.items()])
-        req = requests.Request("get", self.request_url, params=sorted_request_params).prepare()
+        if not sorted_request_params:
+            return self.request_url
 
-        return req.url
+        return f"{self.request_url}?{urlencode(sorted_request_params)}"
 
     def all(self, request_params: dict | None) -> Iterable[dict]:
         context = str(self.context)
@@ -278,86 +651,298 @@ class Endpoint:
                 crossref_plus_token=self.crossref_plus_token,
                 timeout=self.timeout,
                 verify=self.verify,
+                http_request=self.http_request,
+                **self._derived_settings(),
             ),
         )
 
-    def __iter__(self):  # noqa: C901, PLR0912 - To many branches is not a problem.
-        request_url = str(self.request_url)
+    def pages(  # noqa: C901, PLR0912 - To many branches is not a problem.
+        self,
+        rows: int = LIMIT,
+        cursor: str = "*",
+        offset: int = 0,
+        stream: bool = False,
+        raw: bool = False,
+    ) -> Iterable["Page"]:
+        """
+        Iterate through the results page by page.
 
-        if "sample" in self.request_params:
-            request_params = self._escaped_pagging()
-            result = self.do_http_request(
-                "get",
-                self.request_url,
-                data=request_params,
-                custom_header=self.custom_header,
-                timeout=self.timeout,
-            )
+        Each page keeps the items list decoded from the response (not copied) along
+        with the paging metadata, which is useful to process the results in batches
+        or to checkpoint a harvest. The **works** endpoints page with cursors, the
+        others with offsets, and sample queries return a single page.
 
-            if result.status_code == NOT_FOUND_404:
-                return
+        Args:
+            rows (int, optional): The number of items per page. Defaults to `LIMIT`.
+            cursor (str, optional): The cursor of the first page, to resume a cursor
+                harvest. Defaults to "*".
+            offset (int, optional): The offset of the first page, to resume an offset
+                harvest. Defaults to 0.
+            stream (bool, optional): Parse the responses while they are downloaded. The
+                items of each page are then an iterator yielding each item as soon as
+                it is complete, `fetch_time` is the time to the response headers and
+                `parse_time` the time to the first item. Defaults to False.
+            raw (bool, optional): Do not decode the items. They are then memoryview
+                slices of the response body holding the JSON of each item (see
+                `crossref.jsonstream.RawList`). Defaults to False.
 
-            result = result.json()
+        Returns:
+            Iterable[Page]: The pages of the results.
 
-            for item in result["message"]["items"]:
-                yield item
+        Raises:
+            MaxOffsetError: If the offset pagination exceeds `MAX_OFFSET`.
+            CrossrefAPIError: If the API answers a page with an error, e.g. an expired
+                cursor.
+            ValueError: If both `stream` and `raw` are requested.
+        """
+        if stream and raw:
+            msg = "The stream and raw modes can not be used together."
+            raise ValueError(msg)
 
-            return
+        request_url = str(self.request_url)
 
-        if self.CURSOR_AS_ITER_METHOD:
+        if "sample" in self.request_params:
+            request_params = self._escaped_pagging()
+        elif self.CURSOR_AS_ITER_METHOD:
+            request_params = dict(self.request_params)
+            request_params["cursor"] = cursor
+            request_params["rows"] = rows
+        else:
             request_params = dict(self.request_params)
-            request_params["cursor"] = "*"
-            request_params["rows"] = LIMIT
+            request_params["offset"] = offset
+            request_params["rows"] = rows
+
+        http_request = self.http_request
+        attributes = {
+            "crossref.route": route(request_url),
+            "crossref.params_hash": params_hash(request_params),
+            "crossref.rows": rows,
+        }
+        # The harvest span is current only while a page is fetched, not while the
+        # consumer holds the pages.
+        harvest = http_request.start_span("crossref.harvest", attributes)
+        depth = 0
+        try:
             while True:
-                result = self.do_http_request(
-                    "get",
-                    request_url,
-                    data=request_params,
-                    custom_header=self.custom_header,
-                    timeout=self.timeout,
-                )
-
-                if result.status_code == NOT_FOUND_404:
+                with (
+                    http_request.use_span(harvest, end=False),
+                    http_request.span(
+                        "crossref.page", {**attributes, "crossref.cursor_depth": depth}
+                    ) as span,
+                ):
+                    fetched = self._fetch_page(request_url, request_params, stream, raw)
+                    if fetched is not None and not stream:
+                        span.set_attribute("crossref.items", len(fetched[0].items))
+
+                if fetched is None:
+                    return
+                page, message = fetched
+                if not page.items:
                     return
 
-                result = result.json()
+                depth += 1
+                yield page
 
-                if len(result["message"]["items"]) == 0:
+                if "sample" in request_params:
                     return
 
-                for item in result["message"]["items"]:
-                    yield item
+                if stream:
+                    # Whatever the consumer left behind must be parsed to reach the keys
+                    # that may come after the items.
+                    for _ in page.items:
+                        pass
+                    page.next_cursor = message.get("next-cursor", page.next_cursor)
+                    page.total = message.get("total-results", page.total)
+
+                if self.CURSOR_AS_ITER_METHOD:
+                    request_params["cursor"] = page.next_cursor
+                else:
+                    request_params["offset"] += rows
+
+                    if request_params["offset"] >= MAX_OFFSET:
+                        msg = "Offset exceeded the max offset of %d"
+                        raise MaxOffsetError(msg, MAX_OFFSET)
+        finally:
+            harvest.set_attribute("crossref.pages", depth)
+            harvest.end()
+
+    def _fetch_page(
+        self, request_url: str, request_params: dict, stream: bool, raw: bool
+    ) -> tuple["Page", dict] | None:
+        """
+        Fetch and decode a page of `pages`, with its message, or None if not found.
+        """
+        started = perf_counter()
+        result = self.do_http_request(
+            "get",
+            request_url,
+            data=request_params,
+            custom_header=self.custom_header,
+            timeout=self.timeout,
+            stream=stream,
+        )
+        fetched = perf_counter()
 
-                request_params["cursor"] = result["message"]["next-cursor"]
-        else:
-            request_params = dict(self.request_params)
-            request_params["offset"] = 0
-            request_params["rows"] = LIMIT
-            while True:
-                result = self.do_http_request(
-                    "get",
-                    request_url,
-                    data=request_params,
-                    custom_header=self.custom_header,
-                    timeout=self.timeout,
+        if result.status_code == NOT_FOUND_404:
+            result.close()
+            return None
+        if result.status_code >= BAD_REQUEST_400:
+            body = result.text[:200]
+            result.close()
+            msg = f"The API answered {result.status_code} for {request_url}: {body}"
+            raise CrossrefAPIError(msg)
+
+        if stream:
+            items = _StreamedItems(result, self.http_request.item_decoder)
+            message = items.message
+        elif raw:
+            raw_list = jsonstream.RawList(result.content)
+            items = raw_list.items
+            message = raw_list.message
+            if self.http_request.listeners:
+                self.http_request.emit(
+                    "decode", seconds=perf_counter() - fetched, size=len(result.content)
                 )
+        else:
+            message = self.http_request.decode(result)["message"]
+            items = message["items"]
+
+        page = Page(
+            items=items,
+            cursor=request_params.get("cursor"),
+            offset=request_params.get("offset"),
+            next_cursor=message.get("next-cursor"),
+            total=message.get("total-results"),
+            fetch_time=fetched - started,
+            parse_time=perf_counter() - fetched,
+        )
+        return page, message
 
-                if result.status_code == NOT_FOUND_404:
-                    return
+    def stream(self, rows: int = LIMIT) -> Iterable[dict]:
+        """
+        Iterate through the results parsing each response while it is downloaded.
 
-                result = result.json()
+        Items are yielded as soon as they are complete instead of after the whole
+        page is decoded, which lowers the peak memory and the time to the first
+        item of large pages.
 
-                if len(result["message"]["items"]) == 0:
-                    return
+        Args:
+            rows (int, optional): The number of items per page. Defaults to `LIMIT`.
 
-                for item in result["message"]["items"]:
-                    yield item
+        Returns:
+            Iterable[dict]: The items of the results.
+        """
+        for page in self.pages(rows=rows, stream=True):
+            yield from page.items
 
-                request_params["offset"] += LIMIT
+    def raw(self, rows: int = LIMIT) -> Iterable[memoryview]:
+        """
+        Iterate through the results without decoding them.
 
-                if request_params["offset"] >= MAX_OFFSET:
-                    msg = "Offset exceeded the max offset of %d"
-                    raise MaxOffsetError(msg, MAX_OFFSET)
+        Each item is a memoryview slice of the response body holding the JSON of the
+        item, ready to be written as is. No Python object is built for the items;
+        single fields can still be decoded with `crossref.jsonstream.raw_field`.
+
+        Args:
+            rows (int, optional): The number of items per page. Defaults to `LIMIT`.
+
+        Returns:
+            Iterable[memoryview]: The JSON of each item.
+        """
+        for page in self.pages(rows=rows, raw=True):
+            yield from page.items
+
+    def __iter__(self):
+        for page in self.pages():
+            yield from page.items
+
+
+class Page:
+    """
+    A page of results yielded by `Endpoint.pages`.
+
+    Attributes:
+        items (list): The items of the page, as decoded from the response.
+        cursor (str | None): The cursor used to fetch the page, for cursor paging.
+        offset (int | None): The offset used to fetch the page, for offset paging.
+        next_cursor (str | None): The cursor of the next page, for cursor paging.
+        total (int | None): The total number of results of the query.
+        fetch_time (float): Seconds spent fetching the response.
+        parse_time (float): Seconds spent decoding the response.
+    """
+
+    __slots__ = (
+        "cursor",
+        "fetch_time",
+        "items",
+        "next_cursor",
+        "offset",
+        "parse_time",
+        "total",
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        items,
+        *,
+        cursor=None,
+        offset=None,
+        next_cursor=None,
+        total=None,
+        fetch_time=0.0,
+        parse_time=0.0,
+    ):
+        self.items = items
+        self.cursor = cursor
+        self.offset = offset
+        self.next_cursor = next_cursor
+        self.total = total
+        self.fetch_time = fetch_time
+        self.parse_time = parse_time
+
+    def __len__(self):
+        return len(self.items)
+
+    def __repr__(self):
+        position = f"cursor={self.cursor!r}" if self.cursor is not None else f"offset={self.offset}"
+        return f"<Page {position} items={len(self.items)} total={self.total}>"
+
+
+class _StreamedItems:
+    """
+    The items of a streamed page, parsed while the response downloads.
+
+    The response is parsed up to the first item on creation, so `message` holds the
+    keys that come before the items and the emptiness of the page is known. The items
+    are decoded with ``decoder``. The response is closed once the items are consumed.
+    """
+
+    def __init__(self, result, decoder: decoders.Decoder | None = None):
+        self.stream = jsonstream.ItemStream(result.iter_content(STREAM_CHUNK_SIZE), decoder)
+        self.message = self.stream.message
+        self._result = result
+        try:
+            self.stream.prepare()
+            self._head = list(islice(self.stream, 1))
+        except Exception:
+            result.close()
+            raise
+        if not self._head:
+            result.close()
+        self._iterator = self._items()
+
+    def _items(self):
+        try:
+            yield from self._head
+            yield from self.stream
+        finally:
+            self._result.close()
+
+    def __bool__(self):
+        return bool(self._head)
+
+    def __iter__(self):
+        return self._iterator
 
 
 class Works(Endpoint):
@@ -612,6 +1197,8 @@ class Works(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
+            **self._derived_settings(),
         )
 
     def select(self, *args):
@@ -674,6 +1261,8 @@ class Works(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
+            **self._derived_settings(),
         )
 
     def sort(self, sort: str = "score"):
@@ -710,6 +1299,8 @@ class Works(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
+            **self._derived_settings(),
         )
 
     def filter(self, **kwargs):
@@ -772,6 +1363,8 @@ class Works(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
+            **self._derived_settings(),
         )
 
     def facet(self, facet_name: str, facet_count: int = 100):
@@ -807,7 +1400,8 @@ class Works(Endpoint):
             data=request_params,
             custom_header=self.custom_header,
             timeout=self.timeout,
-        ).json()
+        )
+        result = self.http_request.decode(result)
 
         return result["message"]["facets"]
 
@@ -869,6 +1463,8 @@ class Works(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
+            **self._derived_settings(),
         )
 
     def sample(self, sample_size: int = 20):
@@ -924,6 +1520,8 @@ class Works(Endpoint):
             throttle=self.throttle,
             verify=self.verify,
             crossref_plus_token=self.crossref_plus_token,
+            http_request=self.http_request,
+            **self._derived_settings(),
         )
 
     def doi(self, doi: str, only_message: bool = True) -> Any | None:
@@ -961,7 +1559,7 @@ class Works(Endpoint):
 
         if result.status_code == NOT_FOUND_404:
             return None
-        result = result.json()
+        result = self.http_request.decode(result)
 
         return result["message"] if only_message is True else result
 
@@ -1004,7 +1602,7 @@ class Works(Endpoint):
         if result.status_code == NOT_FOUND_404:
             return None
 
-        result = result.json()
+        result = self.http_request.decode(result)
 
         return result["message"] if only_message is True else result
 
@@ -1076,6 +1674,8 @@ class Funders(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
+            **self._derived_settings(),
         )
 
     def filter(self, **kwargs):
@@ -1137,6 +1737,8 @@ class Funders(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
+            **self._derived_settings(),
         )
 
     def funder(self, funder_id: str | int, only_message: bool = True) -> Any | None:
@@ -1174,7 +1776,7 @@ class Funders(Endpoint):
         if result.status_code == NOT_FOUND_404:
             return None
 
-        result = result.json()
+        result = self.http_request.decode(result)
 
         return result["message"] if only_message is True else result
 
@@ -1231,6 +1833,7 @@ class Funders(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
         )
 
 
@@ -1276,6 +1879,8 @@ class Members(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
+            **self._derived_settings(),
         )
 
     def filter(self, **kwargs):
@@ -1328,6 +1933,8 @@ class Members(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
+            **self._derived_settings(),
         )
 
     def member(self, member_id: str | int, only_message: bool = True) -> Any | None:
@@ -1365,7 +1972,7 @@ class Members(Endpoint):
         if result.status_code == NOT_FOUND_404:
             return None
 
-        result = result.json()
+        result = self.http_request.decode(result)
 
         return result["message"] if only_message is True else result
 
@@ -1423,6 +2030,7 @@ class Members(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
         )
 
 
@@ -1466,7 +2074,7 @@ class Types(Endpoint):
         if result.status_code == NOT_FOUND_404:
             return None
 
-        result = result.json()
+        result = self.http_request.decode(result)
 
         return result["message"] if only_message is True else result
 
@@ -1492,7 +2100,7 @@ class Types(Endpoint):
         )
         if result.status_code == NOT_FOUND_404:
             return None
-        result = result.json()
+        result = self.http_request.decode(result)
         yield from result["message"]["items"]
         return None
 
@@ -1551,6 +2159,7 @@ class Types(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
         )
 
 
@@ -1594,7 +2203,7 @@ class Prefixes(Endpoint):
         if result.status_code == NOT_FOUND_404:
             return None
 
-        result = result.json()
+        result = self.http_request.decode(result)
 
         return result["message"] if only_message is True else result
 
@@ -1620,6 +2229,7 @@ class Prefixes(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
         )
 
 
@@ -1658,6 +2268,8 @@ class Journals(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
+            **self._derived_settings(),
         )
 
     def journal(self, issn: str, only_message: bool = True) -> Any | None:
@@ -1694,7 +2306,7 @@ class Journals(Endpoint):
         if result.status_code == NOT_FOUND_404:
             return None
 
-        result = result.json()
+        result = self.http_request.decode(result)
 
         return result["message"] if only_message is True else result
 
@@ -1752,6 +2364,7 @@ class Journals(Endpoint):
             crossref_plus_token=self.crossref_plus_token,
             timeout=self.timeout,
             verify=self.verify,
+            http_request=self.http_request,
         )
 
 
@@ -1765,7 +2378,8 @@ class Depositor:
         use_test_server=False,
         timeout=100,
     ):
-        self.do_http_request = HTTPRequest(throttle=False).do_http_request
+        self.http_request = HTTPRequest(throttle=False)
+        self.do_http_request = self.http_request.do_http_request
         self.etiquette = etiquette or Etiquette()
         self.custom_header = {"user-agent": str(self.etiquette)}
         self.prefix = prefix
@@ -1778,7 +2392,7 @@ class Depositor:
         subdomain = "test" if self.use_test_server else "doi"
         return f"https://{subdomain}.crossref.org/servlet/{verb}"
 
-    def register_doi(self, submission_id: str, request_xml: str) -> requests.Response:
+    def register_doi(self, submission_id: str, request_xml: str) -> "requests.Response":
         """
         Register a new DOI or update metadata for an existing DOI in Crossref.
 
@@ -1812,14 +2426,16 @@ class Depositor:
             "login_passwd": self.api_key,
         }
 
-        return self.do_http_request(
-            "post",
-            endpoint,
-            data=params,
-            files=files,
-            custom_header=self.custom_header,
-            timeout=self.timeout,
-        )
+        attributes = {"crossref.operation": "register_doi", "crossref.submission": submission_id}
+        with self.http_request.span("crossref.deposit", attributes):
+            return self.do_http_request(
+                "post",
+                endpoint,
+                data=params,
+                files=files,
+                custom_header=self.custom_header,
+                timeout=self.timeout,
+            )
 
     def request_doi_status_by_filename(self, file_name: str, data_type: str = "result"):
         """
@@ -1851,17 +2467,19 @@ class Depositor:
             "type": data_type,
         }
 
-        return self.do_http_request(
-            "get",
-            endpoint,
-            data=params,
-            custom_header=self.custom_header,
-            timeout=self.timeout,
-        )
+        attributes = {"crossref.operation": "submission_status", "crossref.submission": file_name}
+        with self.http_request.span("crossref.deposit", attributes):
+            return self.do_http_request(
+                "get",
+                endpoint,
+                data=params,
+                custom_header=self.custom_header,
+                timeout=self.timeout,
+            )
 
     def request_doi_status_by_batch_id(
         self, doi_batch_id: str, data_type: str = "result"
-    ) -> requests.Response:
+    ) -> "requests.Response":
         """
         Retrieve the status or contents of a DOI submission by batch ID.
 
@@ -1892,10 +2510,12 @@ class Depositor:
             "type": data_type,
         }
 
-        return self.do_http_request(
-            "get",
-            endpoint,
-            data=params,
-            custom_header=self.custom_header,
-            timeout=self.timeout,
-        )
+        attributes = {"crossref.operation": "batch_status", "crossref.submission": doi_batch_id}
+        with self.http_request.span("crossref.deposit", attributes):
+            return self.do_http_request(
+                "get",
+                endpoint,
+                data=params,
+                custom_header=self.custom_header,
+                timeout=self.timeout,
+            )
@@ -0,0 +1,203 @@
+import gzip
+import re
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+from crossref import decoders
+from crossref.jsonstream import RawList, raw_field
+from crossref.pipeline import ParallelMap
+
+# The public data files are gzipped JSON objects with an ``items`` array, about 5000
+# works each; JSON Lines files (one work per line) are read too.
+SUFFIXES = (".json.gz", ".jsonl.gz", ".json", ".jsonl")
+
+
+def _natural_key(path: Path) -> list:
+    """
+    Sort "2.json.gz" before "10.json.gz".
+    """
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", str(path))]
+
+
+def snapshot_files(path: str | Path) -> list[Path]:
+    """
+    Return the snapshot files found in a directory (recursively) in natural order, or
+    the file itself if ``path`` is a file.
+    """
+    path = Path(path)
+    if path.is_file():
+        return [path]
+    files = [file for file in path.rglob("*") if file.is_file() and file.name.endswith(SUFFIXES)]
+    return sorted(files, key=lambda file: _natural_key(file.relative_to(path)))
+
+
+def _is_lines(path: Path) -> bool:
+    return path.name.removesuffix(".gz").endswith(".jsonl")
+
+
+def _load(path: Path) -> bytes:
+    data = path.read_bytes()
+    # Decompressing in one call is much faster than reading a `gzip.GzipFile`.
+    return gzip.decompress(data) if path.name.endswith(".gz") else data
+
+
+def _line_spans(data: bytes) -> list[tuple[int, int]]:
+    spans = []
+    start = 0
+    size = len(data)
+    while start < size:
+        end = data.find(b"\n", start)
+        if end < 0:
+            end = size
+        if data[start:end].strip():
+            spans.append((start, end))
+        start = end + 1
+    return spans
+
+
+def _latest(indexed: Iterator[dict | None]) -> str | None:
+    return max(
+        (value["date-time"] for value in indexed if value and value.get("date-time")),
+        default=None,
+    )
+
+
+def _read(path: str, raw: bool, func: Callable | None) -> tuple:
+    """
+    Read a snapshot file in a worker.
+
+    Returns ``(items, None, indexed)``, or ``(data, spans, indexed)`` for raw reads,
+    where ``indexed`` is the latest ``indexed`` date of the file. This is a module
+    level function so it can be sent to process pools.
+    """
+    path = Path(path)
+    data = _load(path)
+
+    if raw:
+        spans = _line_spans(data) if _is_lines(path) else RawList(data).spans
+        view = memoryview(data)
+        # "indexed" is the first key of the Crossref works, so this is quick.
+        indexed = _latest(raw_field(view[start:end], "indexed") for start, end in spans)
+        return data, spans, indexed
+
+    decode = decoders.get_decoder()
+    if _is_lines(path):
+        items = [decode(data[start:end]) for start, end in _line_spans(data)]
+    else:
+        items = decode(data)["items"]
+    indexed = _latest(item.get("indexed") for item in items)
+    if func is not None:
+        items = [result for result in map(func, items) if result is not None]
+    return items, None, indexed
+
+
+def read_file(path: str | Path) -> list[dict]:
+    """
+    Return the works of a single snapshot file.
+    """
+    items, _, _ = _read(str(path), raw=False, func=None)
+    return items
+
+
+class Snapshot:
+    """
+    Read a Crossref public data file snapshot, one file per worker.
+
+    The snapshot is a directory of ``.json.gz`` files (or ``.jsonl.gz``, optionally
+    uncompressed) holding the works exactly as the API returns them, so iterating a
+    `Snapshot` yields the same dicts as iterating ``Works()`` and feeds the same
+    sinks (`crossref.mirror.Mirror.store`, `crossref.columnar.write_parquet`, ...).
+    Tar archives must be extracted first.
+
+    The files are decompressed and parsed on a process pool through
+    `crossref.pipeline.ParallelMap`, at most ``window`` files at a time, and yielded
+    in file order. Sending decoded works back to the main process costs about as much
+    as decoding them, so the parallel part is best used either with `raw`, which only
+    ships bytes, or with `map`, which runs a function on the works in the workers and
+    only ships its results.
+
+    Args:
+        path (str | Path): The snapshot directory, or a single file.
+        workers (int, optional): The number of workers. Defaults to the CPU count.
+        executor (str | Executor, optional): "process", "thread" or an executor
+            instance. Defaults to "process".
+        window (int, optional): The maximum number of files in flight, which bounds
+            the memory used. Defaults to the number of workers.
+        errors (str, optional): "raise" to stop at the first unreadable file, or
+            "collect" to skip them and keep ``(path, exception)`` pairs in `errors`.
+            Defaults to "raise".
+
+    Attributes:
+        files (list[Path]): The snapshot files, in the order they are read.
+        indexed (str | None): The latest ``indexed`` date-time of the files read so
+            far. Once the snapshot is consumed, an API harvest filtered with
+            ``from_index_date`` set to this date brings the copy up to date.
+
+    Usage:
+        snapshot = Snapshot("April 2025 Public Data File", workers=8)
+        mirror.store(snapshot.raw())
+        mirror.harvest(Works().filter(from_index_date=snapshot.indexed[:10]))
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        workers: int | None = None,
+        executor: str | Executor = "process",
+        window: int | None = None,
+        errors: str = "raise",
+    ):
+        self.path = Path(path)
+        self.files = snapshot_files(self.path)
+        if not self.files:
+            msg = f"No snapshot files ({', '.join(SUFFIXES)}) found in {path!s}"
+            raise FileNotFoundError(msg)
+
+        self.workers = workers
+        self.executor = executor
+        self.window = window
+        self.on_error = errors
+        self.indexed = None
+        self.errors = []
+
+    def _results(self, raw: bool = False, func: Callable | None = None) -> Iterator[tuple]:
+        results = ParallelMap(
+            partial(_read, raw=raw, func=func),
+            [str(file) for file in self.files],
+            workers=self.workers,
+            executor=self.executor,
+            window=self.window or self.workers,
+            errors=self.on_error,
+        )
+        self.errors = results.errors
+        for result in results:
+            indexed = result[-1]
+            if indexed is not None and (self.indexed is None or indexed > self.indexed):
+                self.indexed = indexed
+            yield result
+
+    def __iter__(self) -> Iterator[dict]:
+        for items, _, _ in self._results():
+            yield from items
+
+    def raw(self) -> Iterator[memoryview]:
+        """
+        Iterate through the works without decoding them, like `Endpoint.raw`.
+        """
+        for data, spans, _ in self._results(raw=True):
+            view = memoryview(data)
+            for start, end in spans:
+                yield view[start:end]
+
+    def map(self, func: Callable[[dict], Any]) -> Iterator:
+        """
+        Apply ``func`` to each work in the workers and yield its results, dropping the
+        None ones, so it can also filter. ``func`` must be picklable (a module level
+        function) for process pools.
+        """
+        for results, _, _ in self._results(func=func):
+            yield from results
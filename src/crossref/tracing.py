@@ -0,0 +1,84 @@
+from typing import Any
+
+from crossref import VERSION
+from crossref.restful import Depositor, Endpoint, HTTPRequest
+
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover - depends on the environment.
+    trace = None
+
+
+def _require_opentelemetry():
+    if trace is None:
+        msg = "Tracing requires OpenTelemetry: pip install crossrefapi[tracing]"
+        raise ImportError(msg)
+
+
+class Tracer:
+    """
+    Trace the client with OpenTelemetry, as the ``tracer`` of an `HTTPRequest`.
+
+    The spans are:
+
+    * ``crossref.harvest``: an iteration of an endpoint (`Endpoint.pages` and
+      everything built on it), with the ``crossref.route``, ``crossref.params_hash``
+      (identifying the query, see `crossref.restful.params_hash`), ``crossref.rows``
+      and, once over, ``crossref.pages`` attributes.
+    * ``crossref.page``: the fetch of a page of a harvest, with the same attributes,
+      ``crossref.cursor_depth`` (the number of pages before it) and
+      ``crossref.items``.
+    * ``crossref.request``: an HTTP request (client kind), with the usual
+      ``http.request.method``, ``url.full``, ``http.response.status_code`` and
+      ``http.response.body.size`` attributes, ``crossref.route``,
+      ``crossref.retries`` and a ``retry`` event for each retried attempt.
+    * ``crossref.cache``: a lookup of a local cache answering for the API, with
+      ``crossref.cache`` (e.g. ``"mirror"``) and ``crossref.cache_hit``.
+    * ``crossref.deposit``: a call of the `Depositor`, with ``crossref.operation``
+      and ``crossref.submission``.
+
+    The spans are children of the current span, so a harvest made inside a job span
+    is traced under it. The context is carried to the threads of
+    `crossref.pipeline.ParallelMap` and `crossref.buffering.Prefetcher`, and asyncio
+    tasks carry it by themselves.
+
+    Args:
+        tracer_provider (TracerProvider, optional): Defaults to the global provider.
+    """
+
+    def __init__(self, tracer_provider: Any = None):
+        _require_opentelemetry()
+        self.tracer = trace.get_tracer("crossref", VERSION, tracer_provider=tracer_provider)
+
+    def start_span(self, name: str, attributes: dict) -> Any:
+        kind = trace.SpanKind.CLIENT if name == "crossref.request" else trace.SpanKind.INTERNAL
+        return self.tracer.start_span(name, kind=kind, attributes=attributes)
+
+    def use_span(self, span: Any, end: bool = True):
+        return trace.use_span(
+            span, end_on_exit=end, record_exception=True, set_status_on_exception=True
+        )
+
+
+def instrument(target: Endpoint | HTTPRequest | Depositor, tracer_provider: Any = None) -> Tracer:
+    """
+    Trace the requests of ``target``, an endpoint (and the endpoints derived from
+    it, which share its `HTTPRequest`), an `HTTPRequest` or a `Depositor`.
+
+    Usage:
+        works = Works()
+        instrument(works)
+        with tracer.start_as_current_span("nightly-harvest"):
+            for item in works.filter(from_index_date="2024-01-01"):
+                save(item)
+    """
+    tracer = Tracer(tracer_provider)
+    getattr(target, "http_request", target).tracer = tracer
+    return tracer
+
+
+def uninstrument(target: Endpoint | HTTPRequest | Depositor):
+    """
+    Stop tracing the requests of ``target``.
+    """
+    getattr(target, "http_request", target).tracer = None
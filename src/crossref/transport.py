@@ -0,0 +1,563 @@
+import base64
+import gzip
+import json
+import os
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from functools import cache
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlencode, urlsplit
+
+if TYPE_CHECKING:
+    import requests
+
+# The responses retried by `RequestsTransport` when it has ``retries``, and the base of
+# the exponential backoff between the attempts (unless the API sends a Retry-After
+# header).
+RETRY_STATUSES: tuple = (429, 500, 502, 503, 504)
+RETRY_BACKOFF: float = 0.5
+
+# The parameters never written to cassettes, the credentials of the deposit API.
+SECRETS = frozenset(("login_id", "login_passwd", "usr", "pwd"))
+
+MODES = ("once", "record", "replay")
+
+# The time spent opening connections by the request running in each thread, in the
+# ``connect`` and ``tls`` attributes, for the transports that measure it. The caller
+# resets them before a request.
+connection_setup = threading.local()
+
+
+class _TimedConnectionMixin:
+    """
+    Record the time spent resolving and connecting (``_new_conn``) and the rest of
+    the connection setup, the TLS handshake for HTTPS, in `connection_setup`.
+    """
+
+    def _new_conn(self):
+        started = perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            connection_setup.connect = (
+                getattr(connection_setup, "connect", 0.0) + perf_counter() - started
+            )
+
+    def connect(self):
+        started = perf_counter()
+        connected = getattr(connection_setup, "connect", 0.0)
+        try:
+            super().connect()
+        finally:
+            elapsed = (
+                perf_counter() - started - (getattr(connection_setup, "connect", 0.0) - connected)
+            )
+            connection_setup.tls = getattr(connection_setup, "tls", 0.0) + elapsed
+
+
+@cache
+def _timed_adapter() -> type:
+    # ``requests`` and ``urllib3`` take longer to import than the rest of the client,
+    # so they are only imported by the first session.
+    import requests  # noqa: PLC0415
+    from urllib3.connection import HTTPConnection, HTTPSConnection  # noqa: PLC0415
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool  # noqa: PLC0415
+
+    class TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = type("TimedHTTPConnection", (_TimedConnectionMixin, HTTPConnection), {})
+
+    class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = type("TimedHTTPSConnection", (_TimedConnectionMixin, HTTPSConnection), {})
+
+    class TimedHTTPAdapter(requests.adapters.HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {
+                "http": TimedHTTPConnectionPool,
+                "https": TimedHTTPSConnectionPool,
+            }
+
+    return TimedHTTPAdapter
+
+
+class Transport(ABC):
+    """
+    Send the HTTP requests of an `crossref.restful.HTTPRequest`.
+
+    A transport only moves bytes: the throttling, the listeners and the tracing stay
+    in `HTTPRequest`, so another HTTP library can be used without changing the
+    endpoints. `request` returns a ``requests.Response``, or an object with the same
+    ``status_code``, ``headers`` (case insensitive), ``content``, ``elapsed``,
+    ``iter_content`` and ``close``. Transports are shared by the threads of their
+    `HTTPRequest`.
+    """
+
+    @abstractmethod
+    def request(  # noqa: PLR0913
+        self,
+        method: str,
+        url: str,
+        *,
+        params: dict | None = None,
+        data: dict | None = None,
+        files: dict | None = None,
+        headers: dict | None = None,
+        timeout: float | None = None,
+        stream: bool = False,
+        verify: bool = True,
+    ) -> "requests.Response":
+        """
+        Send a request, ``method`` being "get", "post" or "head". ``params`` go in the
+        query string and ``data`` and ``files`` in the body of a post. A streamed
+        response body is read with ``iter_content``.
+        """
+
+    def close(self):  # noqa: B027 - transports without resources keep this no-op.
+        """
+        Release the resources of the transport, e.g. its connections.
+        """
+
+
+class RequestsTransport(Transport):
+    """
+    The default transport, a ``requests.Session`` per thread (sessions are not
+    thread-safe) measuring the time spent opening connections (see
+    `connection_setup`).
+
+    Args:
+        pool_maxsize (int, optional): The number of connections kept by each session.
+            Defaults to 10.
+        retries (int, optional): The number of times the connection errors and the
+            `RETRY_STATUSES` responses of the idempotent requests are retried, waiting
+            as asked by the Retry-After header or with an exponential backoff of
+            `RETRY_BACKOFF`. Defaults to 0.
+    """
+
+    def __init__(self, pool_maxsize: int = 10, retries: int = 0):
+        self.pool_maxsize = pool_maxsize
+        self.retries = retries
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._sessions = {}
+
+    @property
+    def session(self) -> "requests.Session":
+        """
+        The ``requests.Session`` owned by the calling thread.
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests  # noqa: PLC0415
+            from urllib3.util.retry import Retry  # noqa: PLC0415
+
+            session = requests.Session()
+            retries = Retry(
+                total=self.retries,
+                status_forcelist=RETRY_STATUSES,
+                backoff_factor=RETRY_BACKOFF,
+                raise_on_status=False,
+            )
+            adapter = _timed_adapter()(
+                pool_maxsize=self.pool_maxsize, max_retries=retries if self.retries else 0
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._local.session = session
+            with self._lock:
+                for stale in _register(self._sessions, session):
+                    stale.close()
+        return session
+
+    def request(self, method: str, url: str, **kwargs) -> "requests.Response":
+        # Like ``Session.head``, head requests do not follow redirects.
+        kwargs.setdefault("allow_redirects", method != "head")
+        return self.session.request(method.upper(), url, **kwargs)
+
+    def close(self):
+        """
+        Close the sessions of every thread that used this transport.
+        """
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+        self._local = threading.local()
+
+
+def _register(resources: dict[threading.Thread, Any], resource: Any) -> list:
+    """
+    Register the resource of the calling thread in ``resources`` and remove the ones of
+    the threads that ended, which are returned to be closed. Call with the lock held.
+    """
+    stale = [thread for thread in resources if not thread.is_alive()]
+    resources[threading.current_thread()] = resource
+    return [resources.pop(thread) for thread in stale]
+
+
+def _timed(name: str, function):
+    # Add the time spent in ``function`` to an attribute of `connection_setup`.
+    def timed(*args, **kwargs):
+        started = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            setattr(
+                connection_setup,
+                name,
+                getattr(connection_setup, name, 0.0) + perf_counter() - started,
+            )
+
+    return timed
+
+
+@cache
+def _timed_connections() -> dict[str, type]:
+    import http.client  # noqa: PLC0415
+
+    class TimedHTTPConnection(_TimedConnectionMixin, http.client.HTTPConnection):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._create_connection = _timed("connect", self._create_connection)
+
+    class TimedHTTPSConnection(_TimedConnectionMixin, http.client.HTTPSConnection):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._create_connection = _timed("connect", self._create_connection)
+
+    return {"http": TimedHTTPConnection, "https": TimedHTTPSConnection}
+
+
+class HTTPClientResponse:
+    """
+    A response of `HTTPClientTransport`, with the attributes of ``requests.Response``
+    the client reads: ``status_code``, ``headers``, ``content``, ``text``,
+    ``elapsed``, ``url``, ``ok``, ``iter_content``, ``json`` and ``close``.
+    """
+
+    raw = None
+
+    def __init__(self, response, url: str, elapsed: float):
+        self.status_code = response.status
+        self.headers = response.headers
+        self.url = url
+        self.elapsed = timedelta(seconds=elapsed)
+        self._response = response
+        self._content = None
+        gzipped = (self.headers.get("content-encoding") or "").lower() == "gzip"
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400  # noqa: PLR2004
+
+    def iter_content(self, chunk_size: int = 1):
+        if self._content is not None:
+            for start in range(0, len(self._content), chunk_size):
+                yield self._content[start : start + chunk_size]
+            return
+        while chunk := self._response.read(chunk_size):
+            yield self._decompressor.decompress(chunk) if self._decompressor else chunk
+        if self._decompressor:
+            yield self._decompressor.flush()
+        self._response.close()
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            self._content = b"".join(self.iter_content(64 * 1024))
+        return self._content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self._response.headers.get_content_charset("utf-8"), "replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        self._response.close()
+
+
+class HTTPClientTransport(Transport):
+    """
+    A transport using only the standard library (``http.client``), for short lived
+    processes: it starts in a fraction of the time `RequestsTransport` takes to import
+    ``requests``. Each thread keeps a connection per host, reused while the responses
+    are read to the end. Redirects are not followed and nothing is retried, except a
+    request sent on a connection the server had closed.
+
+    Usage:
+        works = Works(http_request=HTTPRequest(transport=HTTPClientTransport()))
+        work = works.doi("10.1590/0102-311x00133115")
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = {}
+
+    def _thread_connections(self) -> dict:
+        # The connections of the calling thread by host, with their last response.
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+            with self._lock:
+                for stale in _register(self._connections, connections):
+                    for connection, _ in stale.values():
+                        connection.close()
+        return connections
+
+    def _connection(
+        self, connections: dict, scheme: str, netloc: str, timeout: float | None, verify: bool
+    ):
+        connection, response = connections.get((scheme, netloc), (None, None))
+        if connection is not None and response is not None and not response.isclosed():
+            # The last response was left unread, the connection can not be reused.
+            connection.close()
+            connection = None
+        if connection is None:
+            kwargs = {"timeout": timeout}
+            if scheme == "https" and not verify:
+                import ssl  # noqa: PLC0415
+
+                kwargs["context"] = ssl._create_unverified_context()  # noqa: S323
+            connection = _timed_connections()[scheme](netloc, **kwargs)
+        else:
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+        return connection
+
+    def request(  # noqa: PLR0913
+        self,
+        method: str,
+        url: str,
+        *,
+        params: dict | None = None,
+        data: dict | None = None,
+        files: dict | None = None,
+        headers: dict | None = None,
+        timeout: float | None = None,
+        stream: bool = False,
+        verify: bool = True,
+    ) -> HTTPClientResponse:
+        parts = urlsplit(url)
+        target = parts.path or "/"
+        query = "&".join(q for q in (parts.query, urlencode(params or {}, doseq=True)) if q)
+        if query:
+            target = f"{target}?{query}"
+        headers = {"accept": "*/*", "accept-encoding": "gzip", **(headers or {})}
+        body = None
+        if files:
+            body, headers["content-type"] = _multipart(data or {}, files)
+        elif data:
+            body = urlencode(data, doseq=True).encode()
+            headers["content-type"] = "application/x-www-form-urlencoded"
+
+        connections = self._thread_connections()
+        for attempt in range(2):
+            connection = self._connection(connections, parts.scheme, parts.netloc, timeout, verify)
+            reused = connection.sock is not None
+            started = perf_counter()
+            try:
+                connection.request(method.upper(), target, body=body, headers=headers)
+                response = connection.getresponse()
+            except (ConnectionError, OSError) as exc:
+                connection.close()
+                # Servers close idle connections: retry once with a new one.
+                if not reused or attempt or isinstance(exc, TimeoutError):
+                    raise
+                continue
+            break
+        connections[(parts.scheme, parts.netloc)] = (connection, response)
+        result = HTTPClientResponse(response, url, perf_counter() - started)
+        if not stream:
+            result.content  # noqa: B018 - reads the body, releasing the connection.
+        return result
+
+    def close(self):
+        """
+        Close the connections of every thread that used this transport.
+        """
+        with self._lock:
+            connections, self._connections = self._connections, {}
+        for thread_connections in connections.values():
+            for connection, _ in thread_connections.values():
+                connection.close()
+        self._local = threading.local()
+
+
+def _multipart(data: dict, files: dict) -> tuple[bytes, str]:
+    # Encode the form fields and the ``(filename, content)`` files as
+    # multipart/form-data, like ``requests``.
+    boundary = base64.urlsafe_b64encode(os.urandom(12)).decode()
+    parts = []
+    for name, value in data.items():
+        disposition = f'form-data; name="{name}"'
+        parts.append(
+            f"--{boundary}\r\nContent-Disposition: {disposition}\r\n\r\n{value}\r\n".encode()
+        )
+    for name, (filename, content, *content_type) in files.items():
+        disposition = f'form-data; name="{name}"; filename="{filename}"'
+        header = f"--{boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if content_type:
+            header += f"Content-Type: {content_type[0]}\r\n"
+        encoded = content.encode() if isinstance(content, str) else content
+        parts.append(header.encode() + b"\r\n" + encoded + b"\r\n")
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class CassetteError(LookupError):
+    pass
+
+
+def request_key(method: str, url: str, params: dict | None = None, data: dict | None = None) -> str:
+    """
+    Return the key of a request in a cassette: its method, URL and sorted parameters,
+    the `SECRETS` masked.
+    """
+    values = {**(params or {}), **(data if isinstance(data, dict) else {})}
+    query = sorted(
+        (name, "****" if name in SECRETS else str(value)) for name, value in values.items()
+    )
+    return f"{method.upper()} {url}?{urlencode(query)}" if query else f"{method.upper()} {url}"
+
+
+def _response(entry: dict, url: str) -> "requests.Response":
+    import requests  # noqa: PLC0415
+    from requests.structures import CaseInsensitiveDict  # noqa: PLC0415
+
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    if "body64" in entry:
+        response._content = base64.b64decode(entry["body64"])
+    else:
+        response._content = entry["body"].encode()
+    response._content_consumed = True
+    response.url = url
+    response.elapsed = timedelta(seconds=entry["elapsed"])
+    return response
+
+
+class CassetteTransport(Transport):
+    """
+    Record the responses of another transport in a cassette file, and serve them back
+    without network.
+
+    A cassette is a JSON lines file, gzipped if its name ends with ".gz", holding one
+    response per line with its status, headers (the rate limits included), body and
+    elapsed time, under the `request_key` of its request. Replaying serves the
+    responses of each key in the order they were recorded, the last one repeating,
+    so a recorded harvest replays the same pages, cursors and rate limits. The deposit
+    credentials are never written.
+
+    Args:
+        path (str | Path): The cassette file.
+        mode (str, optional): "record" to send the requests and write the responses,
+            replacing the cassette; "replay" to serve the recorded responses only,
+            raising `CassetteError` for the requests not recorded; "once" to replay
+            an existing cassette and record a new one. Defaults to "once".
+        transport (Transport, optional): The transport recorded. Defaults to a
+            `RequestsTransport`.
+        realtime (bool, optional): Wait for the recorded elapsed time of each
+            response when replaying, e.g. for load tests. Defaults to False.
+
+    Usage:
+        http_request = HTTPRequest(transport=CassetteTransport("harvest.jsonl.gz"))
+        works = Works(http_request=http_request).filter(from_index_date="2024-01-01")
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        mode: str = "once",
+        transport: Transport | None = None,
+        realtime: bool = False,
+    ):
+        if mode not in MODES:
+            msg = f"Mode specified as {mode!s} but must be one of: {', '.join(MODES)}"
+            raise ValueError(msg)
+        self.path = Path(path)
+        if mode == "once":
+            mode = "replay" if self.path.exists() else "record"
+        self.mode = mode
+        self.transport = transport or RequestsTransport()
+        self.realtime = realtime
+        self._responses = {}
+        self._played = {}
+        self._lock = threading.Lock()
+        self._writer = None
+        if mode == "replay":
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = self._open("wt")
+
+    def _open(self, mode: str):
+        if self.path.suffix == ".gz":
+            return gzip.open(self.path, mode, encoding="utf-8")
+        return self.path.open(mode, encoding="utf-8")
+
+    def _load(self):
+        with self._open("rt") as cassette:
+            for line in cassette:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._responses.setdefault(entry["key"], []).append(entry)
+
+    def request(self, method: str, url: str, **kwargs) -> "requests.Response":
+        key = request_key(method, url, kwargs.get("params"), kwargs.get("data"))
+        if self.mode == "replay":
+            return self._replay(key, url)
+
+        response = self.transport.request(method, url, **kwargs)
+        entry = {
+            "key": key,
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "elapsed": response.elapsed.total_seconds(),
+        }
+        try:
+            entry["body"] = response.content.decode()
+        except UnicodeDecodeError:
+            entry["body64"] = base64.b64encode(response.content).decode()
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._writer.write(line)
+            self._writer.flush()
+        return response
+
+    def _replay(self, key: str, url: str) -> "requests.Response":
+        with self._lock:
+            entries = self._responses.get(key)
+            if not entries:
+                msg = f"No response recorded for {key} in {self.path!s}."
+                raise CassetteError(msg)
+            played = self._played.get(key, 0)
+            self._played[key] = played + 1
+        entry = entries[min(played, len(entries) - 1)]
+        if self.realtime:
+            sleep(entry["elapsed"])
+        return _response(entry, url)
+
+    def close(self):
+        """
+        Finish writing the cassette and close the recorded transport.
+        """
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        self.transport.close()
+
+    def __enter__(self) -> "CassetteTransport":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
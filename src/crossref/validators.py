@@ -65,18 +65,16 @@ def is_bool(value: str) -> bool:
     raise ValueError(msg)
 
 
+DATE_FORMATS = ("%Y", "%Y-%m", "%Y-%m-%d")
+
+
 def is_date(value: str) -> bool:
+    # Each format has its own number of dashes, so at most one of them can match.
     try:
-        datetime.strptime(value, "%Y")  # noqa: DTZ007
-    except ValueError:
-        try:
-            datetime.strptime(value, "%Y-%m")  # noqa: DTZ007
-        except ValueError:
-            try:
-                datetime.strptime(value, "%Y-%m-%d")  # noqa: DTZ007
-            except ValueError as exc:
-                msg = f"Invalid date {value!s}."
-                raise ValueError(msg) from exc
+        datetime.strptime(value, DATE_FORMATS[value.count("-")])  # noqa: DTZ007
+    except (IndexError, ValueError) as exc:
+        msg = f"Invalid date {value!s}."
+        raise ValueError(msg) from exc
     return True
 
 
@@ -0,0 +1,25 @@
+import pytest
+
+from crossref.fakeserver import FakeCrossref, Faults
+from tests.helpers import TOTAL_ITEMS, record
+
+
+@pytest.fixture(scope="session")
+def server_url():
+    """
+    Serve ``TOTAL_ITEMS`` small records as works and as journals; anything else, e.g.
+    ``/missing``, answers 404.
+    """
+    records = [record(i) for i in range(TOTAL_ITEMS)]
+    resources = {"journals": {item["DOI"]: item for item in records}}
+    with FakeCrossref(records, resources=resources, rate_limit=1000) as api:
+        yield api.url
+
+
+@pytest.fixture(scope="session")
+def unavailable_url():
+    """
+    Answer every request with a 503 and a zero Retry-After.
+    """
+    with FakeCrossref(size=1, faults=Faults(error_rate=1.0, retry_after=0)) as api:
+        yield api.url
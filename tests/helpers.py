@@ -0,0 +1,17 @@
+"""
+Data shared by the fixtures of ``conftest.py`` and the tests using them.
+"""
+
+TOTAL_ITEMS = 250
+
+
+def record(index: int) -> dict:
+    record = {
+        "DOI": f"10.9999/{index}",
+        "member": "1",
+        "title": [f"Work {index}"],
+        "reference": [{"key": f"ref{index}"}],
+    }
+    if index % 2 == 0:
+        record["abstract"] = f"<jats:p>Abstract {index}</jats:p>"
+    return record
@@ -0,0 +1,163 @@
+import pickle
+import random
+
+import pytest
+
+from crossref.aggregate import (
+    Aggregator,
+    Count,
+    Distinct,
+    Field,
+    GroupBy,
+    Quantiles,
+    Sum,
+    TopK,
+    aggregate,
+    merge,
+)
+
+ITEMS = [
+    {
+        "member": str(i % 3),
+        "issued": {"date-parts": [[2000 + i % 2, 1]]},
+        "is-referenced-by-count": i,
+        "author": [{"family": f"F{j}"} for j in range(i % 4)],
+    }
+    for i in range(1000)
+]
+
+
+def test_field_paths():
+    item = {"issued": {"date-parts": [[2020, 5]]}, "author": [{"family": "A"}, {"given": "B"}]}
+
+    assert Field("issued.date-parts.0.0").values(item) == [2020]
+    assert Field("issued.date-parts.0.-1").values(item) == [5]
+    assert Field("author.*.family").values(item) == ["A"]
+    assert Field("author.#").values(item) == [2]
+    assert Field("missing.0").values(item) == []
+
+
+def test_count_and_sum():
+    results = aggregate(
+        ITEMS,
+        works=Count(),
+        authors=Count("author.*"),
+        citations=Sum("is-referenced-by-count"),
+    )
+
+    assert results == {"works": 1000, "authors": 1500, "citations": (499500, 1000)}
+
+
+def test_quantiles_accuracy():
+    values = [random.Random(1).lognormvariate(3, 2) for _ in range(20000)]  # noqa: S311
+    sketch = Quantiles("value", relative_accuracy=0.01, quantiles=(0.1, 0.5, 0.99))
+    sketch.update({"value": value} for value in values)
+
+    exact = sorted(values)
+    for q, estimate in sketch.result().items():
+        expected = exact[int(q * (len(exact) - 1))]
+        assert estimate == pytest.approx(expected, rel=0.02)
+    assert sketch.quantile(0) == exact[0]
+    assert sketch.quantile(1) == exact[-1]
+    assert len(sketch.positive) < 2000  # noqa: PLR2004
+
+
+def test_quantiles_with_zeros_and_negatives():
+    sketch = Quantiles("v").update({"v": v} for v in (-10, -1, 0, 0, 1, 10))
+
+    assert sketch.quantile(0.2) == pytest.approx(-1, rel=0.02)
+    assert sketch.quantile(0.5) == 0
+    assert sketch.quantile(0.8) == pytest.approx(1, rel=0.02)
+    assert sketch.quantile(1) == 10  # noqa: PLR2004
+    assert Quantiles("v").quantile(0.5) is None
+
+
+def test_quantiles_skip_non_finite_values():
+    sketch = Quantiles("v").update([{"v": 1}, {"v": float("inf")}, {"v": float("nan")}])
+    assert (sketch.count, sketch.non_finite) == (1, 2)
+    assert sketch.result() == {0.5: 1, 0.9: 1, 0.99: 1}
+    assert merge([sketch, sketch.empty().update([{"v": float("-inf")}])]).non_finite == 3  # noqa: PLR2004
+
+
+def test_top_k():
+    rng = random.Random(2)  # noqa: S311
+    values = [f"publisher-{min(int(rng.paretovariate(1)), 500)}" for _ in range(20000)]
+    top = TopK("publisher", k=3, capacity=50).update({"publisher": v} for v in values)
+
+    exact = sorted({v: values.count(v) for v in set(values)}.items(), key=lambda p: -p[1])
+    assert [value for value, _ in top.result()] == [value for value, _ in exact[:3]]
+    for value, count in top.result():
+        assert count - top.errors[value] <= dict(exact)[value] <= count
+    assert len(top.counts) <= 50  # noqa: PLR2004
+
+
+def test_distinct():
+    sketch = Distinct("doi").update({"doi": f"10.1000/{i % 50000}"} for i in range(100000))
+
+    assert sketch.result() == pytest.approx(50000, rel=0.03)
+    assert len(sketch.registers) == 2**14
+    assert Distinct("doi", precision=10).update([{"doi": "a"}] * 10).result() == 1
+
+
+def test_group_by():
+    groups = GroupBy(
+        ("member", "issued.date-parts.0.0"),
+        works=Count(),
+        authors=Sum("author.#"),
+    ).update(ITEMS)
+
+    result = groups.result()
+    assert len(result) == 6  # noqa: PLR2004
+    assert sum(group["works"] for group in result.values()) == len(ITEMS)
+    assert result[("0", 2000)]["works"] == 167  # noqa: PLR2004
+
+
+def test_group_by_list_keys():
+    items = [{"subject": ["A", "B"]}, {"subject": ["A", "B"]}, {"subject": [{"x": 1}]}]
+    assert GroupBy("subject.*", works=Count()).update(items).result() == {
+        "A": {"works": 2},
+        (("x", 1),): {"works": 1},
+    }
+    assert GroupBy("subject", works=Count()).update(items).result() == {
+        ("A", "B"): {"works": 2},
+        ((("x", 1),),): {"works": 1},
+    }
+    assert TopK("subject").update(items).result()[0] == (("A", "B"), 2)
+
+
+def test_merge_shards_in_other_processes():
+    template = GroupBy(
+        "member",
+        works=Count(),
+        citations=Quantiles("is-referenced-by-count"),
+        top=TopK("author.*.family", k=2),
+        distinct=Distinct("is-referenced-by-count"),
+    )
+    shards = [pickle.loads(pickle.dumps(template.empty().update(ITEMS[i::4]))) for i in range(4)]  # noqa: S301
+    whole = template.empty().update(ITEMS)
+
+    merged = merge(shards)
+
+    assert merged.result().keys() == whole.result().keys()
+    for key, group in merged.result().items():
+        assert group["works"] == whole.result()[key]["works"]
+        assert group["citations"] == whole.result()[key]["citations"]
+        assert group["top"] == whole.result()[key]["top"]
+        assert group["distinct"] == whole.result()[key]["distinct"]
+
+
+def test_merge_requires_the_same_settings():
+    with pytest.raises(ValueError, match="Can not merge"):
+        Quantiles("a").merge(Quantiles("a", relative_accuracy=0.05))
+    with pytest.raises(ValueError, match="Can not merge"):
+        Count().merge(Sum("a"))
+
+
+def test_merge_nothing():
+    with pytest.raises(ValueError, match="empty"):
+        merge([])
+
+
+def test_aggregator_is_abstract():
+    with pytest.raises(TypeError):
+        Aggregator()
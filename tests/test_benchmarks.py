@@ -0,0 +1,48 @@
+import json
+
+from benchmarks import suite
+
+
+def test_run_and_compare(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    assert (
+        suite.main(
+            [
+                "--scale",
+                "0.02",
+                "--only",
+                "harvest",
+                "lookup",
+                "memory",
+                "query",
+                "--output",
+                str(baseline),
+            ]
+        )
+        == 0
+    )
+    results = json.loads(baseline.read_text())
+    benchmarks = results["benchmarks"]
+    assert benchmarks["harvest.rows_100"]["items"] == 100  # noqa: PLR2004
+    assert benchmarks["harvest.rows_1000"]["items_per_second"] > 0
+    lookup = benchmarks["lookup.doi"]
+    assert 0 < lookup["p50_seconds"] <= lookup["p90_seconds"] <= lookup["p99_seconds"]
+    assert benchmarks["memory.records"]["peak_bytes_per_100k_items"] > 0
+    assert benchmarks["query.build"]["build_seconds"] > 0
+    assert "harvest.rows_100" in capsys.readouterr().out
+
+    comparison = suite.compare(results, results)
+    assert comparison
+    assert not any(entry["regressed"] for entry in comparison)
+
+
+def test_compare_flags_regressions():
+    baseline = {"benchmarks": {"a": {"items_per_second": 100.0, "p50_seconds": 1.0, "items": 5}}}
+    results = {"benchmarks": {"a": {"items_per_second": 85.0, "p50_seconds": 0.5, "items": 9}}}
+    comparison = {entry["metric"]: entry for entry in suite.compare(results, baseline)}
+    assert comparison.keys() == {"items_per_second", "p50_seconds"}
+    assert comparison["items_per_second"]["regressed"]
+    assert comparison["p50_seconds"]["change"] == 0.5  # noqa: PLR2004
+    assert not comparison["p50_seconds"]["regressed"]
+    assert not suite.compare(results, baseline, tolerance=0.2)[0]["regressed"]
+    assert suite.direction("peak_bytes_per_100k_items") == -1
@@ -0,0 +1,118 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from crossref import restful
+from crossref.buffering import Prefetcher, SpillQueue, prefetch
+from tests.helpers import TOTAL_ITEMS
+
+
+def test_spill_queue_keeps_the_order(tmp_path):
+    queue = SpillQueue(max_items=50, directory=tmp_path)
+    for index in range(100):
+        queue.put(list(range(index * 10, index * 10 + 10)), size=10)
+    queue.close()
+
+    assert queue.in_memory == 50  # noqa: PLR2004
+    assert queue.spilled == 950  # noqa: PLR2004
+    assert queue.spill_files > 1
+    assert len(queue) == 100  # noqa: PLR2004
+
+    items = []
+    while True:
+        try:
+            items.extend(queue.get())
+        except EOFError:
+            break
+    assert items == list(range(1000))
+
+    queue.cleanup()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_spill_queue_interleaved(tmp_path):
+    queue = SpillQueue(max_items=3, directory=tmp_path)
+    got = []
+    for index in range(200):
+        queue.put(index)
+        if index % 3 == 0:
+            got.append(queue.get())
+    queue.close()
+    while True:
+        try:
+            got.append(queue.get())
+        except EOFError:
+            break
+
+    assert got == list(range(200))
+    queue.cleanup()
+
+
+def test_spill_queue_get_waits(tmp_path):
+    queue = SpillQueue(directory=tmp_path)
+    with pytest.raises(TimeoutError):
+        queue.get(timeout=0.01)
+
+    threading.Timer(0.05, queue.put, args=("late",)).start()
+    assert queue.get(timeout=5) == "late"
+
+    queue.close()
+    with pytest.raises(ValueError, match="closed"):
+        queue.put("too late")
+    with pytest.raises(EOFError):
+        queue.get()
+
+
+def test_prefetcher_with_a_slow_consumer(server_url, tmp_path):
+    works = restful.Works(request_url=f"{server_url}/works")
+    prefetcher = prefetch(works, rows=10, max_items=20, directory=tmp_path)
+
+    dois = []
+    in_memory = []
+    for item in prefetcher:
+        if not dois:
+            # Let the fetching thread run ahead while the consumer stalls.
+            deadline = time.monotonic() + 5
+            while prefetcher.queue.spilled < TOTAL_ITEMS - 30 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        dois.append(item["DOI"])
+        in_memory.append(prefetcher.queue.in_memory)
+
+    assert dois == [f"10.9999/{index}" for index in range(TOTAL_ITEMS)]
+    assert prefetcher.queue.spilled > 0
+    assert max(in_memory) <= 40  # noqa: PLR2004
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_prefetcher_raw_and_resume(server_url):
+    works = restful.Works(request_url=f"{server_url}/works")
+    prefetcher = Prefetcher(works, rows=100, raw=True)
+
+    for index, item in enumerate(prefetcher):
+        assert isinstance(item, bytes)
+        if index == 150:  # noqa: PLR2004
+            break
+
+    # The page being consumed starts at 100.
+    assert prefetcher.cursor == "100"
+    resumed = next(iter(works.pages(rows=100, cursor=prefetcher.cursor)))
+    assert resumed.items[0]["DOI"] == "10.9999/100"
+
+
+def test_prefetcher_reraises_errors(server_url, tmp_path):
+    class FailingWorks(restful.Works):
+        def pages(self, *args, **kwargs):
+            pages = super().pages(*args, **kwargs)
+            yield next(pages)
+            msg = "cursor expired"
+            raise restful.CrossrefAPIError(msg)
+
+    works = FailingWorks(request_url=f"{server_url}/works")
+    items = []
+    with pytest.raises(restful.CrossrefAPIError, match="cursor expired"):
+        items.extend(Prefetcher(works, rows=10, directory=tmp_path))
+
+    assert len(items) == 10  # noqa: PLR2004
+    assert not any(Path(tmp_path).iterdir())
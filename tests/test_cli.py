@@ -0,0 +1,165 @@
+import io
+import json
+import time
+
+import pytest
+
+from crossref import cli
+from crossref.corpus import synthetic_work
+from crossref.fakeserver import FakeCrossref, Faults
+from crossref.mirror import Mirror
+from crossref.snapshot import Snapshot
+
+SIZE = 300
+DOIS = sorted(synthetic_work(i)["DOI"] for i in range(SIZE))
+
+
+@pytest.fixture(scope="module")
+def api():
+    with FakeCrossref(size=SIZE, rate_limit=1000) as api:
+        yield api
+
+
+def harvest(url: str, output, *args) -> int:
+    return cli.main(["works", "--url", f"{url}/works", "--output", str(output), "--quiet", *args])
+
+
+def checkpoint(output) -> dict:
+    return json.loads((output / cli.CHECKPOINT).read_text(encoding="utf-8"))
+
+
+def fail_after(monkeypatch, pages: int, exc: BaseException):
+    write = cli.LinesSink.write
+    calls = []
+
+    def failing(self, items):
+        calls.append(None)
+        if len(calls) > pages:
+            raise exc
+        return write(self, items)
+
+    monkeypatch.setattr(cli.LinesSink, "write", failing)
+
+
+def test_sharded_harvest(api, tmp_path):
+    args = ["--select", "DOI,issued", "--filter", "type=journal-article"]
+    args += ["--shard-by", "pub-date", "--since", "1950-01-01", "--until", "2025-12-31"]
+    assert harvest(api.url, tmp_path, *args, "--shard-days", "9000", "--concurrency", "2") == 0
+
+    expected = sorted(
+        synthetic_work(i)["DOI"]
+        for i in range(SIZE)
+        if synthetic_work(i)["type"] == "journal-article"
+    )
+    items = list(Snapshot(tmp_path))
+    assert sorted(item["DOI"] for item in items) == expected
+    assert all(item.keys() == {"DOI", "issued"} for item in items)
+
+    state = checkpoint(tmp_path)
+    assert state["query"]["shard"] == ["pub-date", "1950-01-01", "2025-12-31"]
+    assert [shard["file"] for shard in state["shards"]] == [f"0000{i}.jsonl.gz" for i in range(4)]
+    assert all(shard["done"] for shard in state["shards"])
+    assert sum(shard["items"] for shard in state["shards"]) == len(expected)
+
+
+def test_resume_after_failure(api, tmp_path, monkeypatch, capsys):
+    fail_after(monkeypatch, 2, OSError("disk full"))
+    assert harvest(api.url, tmp_path, "--rows", "50", "--format", "jsonl") == 1
+    assert "disk full" in capsys.readouterr().err
+    (shard,) = checkpoint(tmp_path)["shards"]
+    assert (shard["items"], shard["done"]) == (100, False)
+    assert shard["size"] == (tmp_path / "00000.jsonl").stat().st_size
+
+    monkeypatch.undo()
+    with (tmp_path / "00000.jsonl").open("ab") as file:
+        file.write(b'{"DOI": "partial page"')
+    args = ["--resume", "--output", str(tmp_path), "--rows", "50", "--quiet"]
+    assert cli.main(args) == 0
+    assert sorted(item["DOI"] for item in Snapshot(tmp_path)) == DOIS
+    assert cli.main(args) == 0
+
+
+def test_expired_cursor_restarts_the_shard(tmp_path, monkeypatch):
+    with FakeCrossref(size=100, faults=Faults(cursor_ttl=0.1)) as api:
+        fail_after(monkeypatch, 1, OSError("failed"))
+        assert harvest(api.url, tmp_path, "--rows", "30") == 1
+        assert checkpoint(tmp_path)["shards"][0]["cursor"] == "30"
+
+        monkeypatch.undo()
+        time.sleep(0.2)
+        assert cli.main(["--resume", "--output", str(tmp_path), "--rows", "30", "--quiet"]) == 0
+    dois = [item["DOI"] for item in Snapshot(tmp_path)]
+    assert sorted(dois) == sorted(synthetic_work(i)["DOI"] for i in range(100))
+
+
+def test_stop_and_resume(api, tmp_path, monkeypatch):
+    query, shards = cli.build_query(
+        cli.build_parser().parse_args(["works", "--url", f"{api.url}/works", "--output", "."])
+    )
+    state = cli.Checkpoint.create(
+        tmp_path / cli.CHECKPOINT, query, shards, str(tmp_path), "jsonl.gz"
+    )
+    harvester = cli.Harvester(state, rows=100)
+    write = cli.LinesSink.write
+
+    def stopping(self, items):
+        harvester.stop()
+        return write(self, items)
+
+    monkeypatch.setattr(cli.LinesSink, "write", stopping)
+    assert harvester.run() == 100  # noqa: PLR2004
+    assert harvester.stopped
+    assert state.pending == state.shards
+
+    monkeypatch.undo()
+    assert cli.main(["--resume", "--output", str(tmp_path), "--quiet"]) == 0
+    assert sorted(item["DOI"] for item in Snapshot(tmp_path)) == DOIS
+
+
+def test_mirror_format(api, tmp_path):
+    database = tmp_path / "crossref.db"
+    assert harvest(api.url, database, "--format", "mirror", "--concurrency", "3") == 0
+    assert Mirror(database).count() == SIZE
+    state = json.loads((tmp_path / "crossref.db.checkpoint").read_text(encoding="utf-8"))
+    assert state["shards"][0]["items"] == SIZE
+
+
+def test_invalid_arguments(api, tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        cli.main(["--resume", "--output", str(tmp_path)])
+    assert "No checkpoint found" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        harvest(api.url, tmp_path, "--filter", "no-such-filter=1")
+    assert "no such filter" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        harvest(api.url, tmp_path, "--filter", "type")
+    assert "NAME=VALUE" in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        cli.main(["members", "--format", "mirror", "--output", str(tmp_path / "db")])
+    assert "only stores works" in capsys.readouterr().err
+
+    assert harvest(api.url, tmp_path, "--select", "DOI") == 0
+    with pytest.raises(SystemExit):
+        harvest(api.url, tmp_path, "--select", "DOI")
+    assert "add --resume" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        harvest(api.url, tmp_path, "--select", "title", "--resume")
+    assert "query differs" in capsys.readouterr().err
+
+
+def test_progress():
+    stream = io.StringIO()
+    progress = cli.Progress(1000, 2, done=100, stream=stream, interval=0)
+    progress.update(300, 2_000_000)
+    progress.update(0, shard_done=True)
+    assert progress.line(now=progress.started + 2) == (
+        "400/1,000 items (40.0%)  150 items/s  1.0 MB/s  ETA 0:00:04  shards 1/2"
+    )
+    assert stream.getvalue().count("\n") == 2  # noqa: PLR2004
+
+    progress = cli.Progress(None, 1, stream=io.StringIO())
+    assert progress.line().startswith("0 items  0 items/s")
+    assert "ETA -:--:--" in progress.line()
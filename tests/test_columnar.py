@@ -0,0 +1,103 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from crossref.columnar import ColumnarBuilder, ColumnBuffer, write_parquet  # noqa: E402
+
+WORKS = [
+    {
+        "DOI": "10.1000/1",
+        "type": "journal-article",
+        "member": "98",
+        "container-title": ["Journal"],
+        "title": ["First"],
+        "issued": {"date-parts": [[2020, 5, 17]]},
+        "published": {"date-parts": [[2020]]},
+        "is-referenced-by-count": 12,
+        "references-count": 2,
+        "author": [
+            {"given": "Maria", "family": "Silva", "sequence": "first"},
+            {"name": "Consortium", "sequence": "additional"},
+        ],
+        "reference": [
+            {"key": "ref1", "DOI": "10.1000/9", "doi-asserted-by": "crossref", "year": "2001"},
+            {"key": "ref2", "unstructured": "Unknown", "year": "2002a"},
+        ],
+    },
+    {"DOI": "10.1000/2", "issued": {"date-parts": [[None]]}},
+]
+
+
+def test_build_columns():
+    (tables,) = ColumnarBuilder().build(WORKS)
+    works, authors, references = tables["works"], tables["authors"], tables["references"]
+
+    assert works["doi"].tolist() == ["10.1000/1", "10.1000/2"]
+    assert works["issued_year"].dtype == np.uint16
+    assert works["issued_year"].tolist() == [2020, 0]
+    assert works["issued_month"].tolist() == [5, 0]
+    assert works["published_month"].tolist() == [0, 0]
+    assert works["is_referenced_by_count"].tolist() == [12, -1]
+    assert works["author_count"].tolist() == [2, 0]
+    assert works["container_title"].tolist() == ["Journal", None]
+
+    assert authors["work"].tolist() == [0, 0]
+    assert authors["position"].tolist() == [0, 1]
+    assert authors["family"].tolist() == ["Silva", None]
+    assert authors["name"].tolist() == [None, "Consortium"]
+
+    assert references["doi"].tolist() == ["10.1000/9", None]
+    assert references["year"].tolist() == [2001, 2002]
+
+
+def test_out_of_range_values():
+    works = [
+        {"DOI": "10.1000/1", "issued": {"date-parts": [[99999, 13]]}},
+        {"DOI": "10.1000/2", "issued": {"date-parts": [[2020, -1, 300]]}, "references-count": -5},
+        {"DOI": "10.1000/3", "is-referenced-by-count": 2**64},
+    ]
+    (tables,) = ColumnarBuilder().build(works)
+    columns = tables["works"]
+
+    assert {len(column) for column in columns.values()} == {3}
+    assert columns["issued_year"].tolist() == [0, 2020, 0]
+    assert columns["issued_month"].tolist() == [13, 0, 0]
+    assert columns["issued_day"].tolist() == [0, 0, 0]
+    assert columns["references_count"].tolist() == [-1, -1, -1]
+    assert columns["is_referenced_by_count"].tolist() == [-1, -1, -1]
+
+
+def test_rejected_row_is_not_appended():
+    buffer = ColumnBuffer((("doi", "str"), ("year", "H"), ("month", "B")))
+    buffer.append("10.1000/1", 2020, 5)
+    with pytest.raises(OverflowError):
+        buffer.append("10.1000/2", 2021, 256)
+
+    assert len(buffer) == 1
+    assert [len(column) for column in buffer.buffers] == [1, 1, 1]
+    assert buffer.flush()["year"].tolist() == [2020]
+
+
+def test_row_groups():
+    builder = ColumnarBuilder(row_group_size=2)
+    groups = list(builder.build(WORKS * 3))
+
+    assert [len(group["works"]["work"]) for group in groups] == [2, 2, 2]
+    assert [group["works"]["work"].tolist() for group in groups] == [[0, 1], [2, 3], [4, 5]]
+    assert groups[1]["references"]["work"].tolist() == [2, 2]
+    assert list(ColumnarBuilder().build([])) == []
+
+
+def test_write_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    rows = write_parquet(WORKS * 3, tmp_path, row_group_size=4)
+
+    assert rows == {"works": 6, "authors": 6, "references": 6}
+    works = pq.ParquetFile(tmp_path / "works.parquet")
+    assert works.metadata.num_row_groups == 2  # noqa: PLR2004
+    table = works.read()
+    assert table.column("issued_year").to_pylist() == [2020, None] * 3
+    assert table.column("is_referenced_by_count").to_pylist() == [12, None] * 3
+    references = pq.read_table(tmp_path / "references.parquet")
+    assert references.column("work").to_pylist() == [0, 0, 2, 2, 4, 4]
@@ -0,0 +1,139 @@
+"""
+Stress tests hammering a single client from many threads against a local server.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from crossref import restful
+from crossref.fakeserver import FakeCrossref
+from crossref.transport import HTTPClientTransport, RequestsTransport
+from tests.helpers import TOTAL_ITEMS
+
+
+def test_shared_works_iterated_from_many_threads(server_url):
+    works = restful.Works(request_url=f"{server_url}/works")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: [i["DOI"] for i in works], range(16)))
+
+    expected = [f"10.9999/{i}" for i in range(TOTAL_ITEMS)]
+    assert all(result == expected for result in results)
+    assert works.http_request.rate_limits == {
+        "x-rate-limit-limit": 1000,
+        "x-rate-limit-interval": 1,
+    }
+
+
+class StartTimes(RequestsTransport):
+    """
+    Record when each request leaves the client.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.starts = []
+
+    def request(self, method: str, url: str, **kwargs):
+        self.starts.append(time.monotonic())
+        return super().request(method, url, **kwargs)
+
+
+def test_throttle_is_shared_between_threads():
+    transport = StartTimes()
+    http_request = restful.HTTPRequest(transport=transport)
+    rate_limit = 50
+    interval = 1 / rate_limit
+    requests_count = 20
+
+    with FakeCrossref(size=1, rate_limit=rate_limit, enforce_rate_limit=True) as api:
+
+        def fetch(_):
+            result = http_request.do_http_request("get", f"{api.url}/works", data={"rows": 1})
+            return result.status_code
+
+        begin = time.monotonic()
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            statuses = list(executor.map(fetch, range(requests_count)))
+
+    assert statuses == [200] * requests_count
+    # The n-th request to leave got at best the n-th slot, ``interval`` after the
+    # previous one, whatever the thread sending it.
+    starts = sorted(transport.starts)
+    assert len(starts) == requests_count
+    assert all(start >= begin + i * interval for i, start in enumerate(starts))
+
+
+def test_one_session_per_thread(server_url):
+    http_request = restful.HTTPRequest(throttle=False)
+    workers = 4
+    barrier = threading.Barrier(workers)
+
+    def fetch(_):
+        barrier.wait()
+        http_request.do_http_request("get", f"{server_url}/works", data={"rows": 1})
+        return id(http_request.session)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        sessions = set(executor.map(fetch, range(workers)))
+
+    assert len(sessions) == workers
+    assert len(http_request.transport._sessions) == workers
+    http_request.close()
+    assert http_request.transport._sessions == {}
+
+
+def test_sessions_of_ended_threads_are_closed(server_url):
+    for transport in (RequestsTransport(), HTTPClientTransport()):
+        registry = "_sessions" if isinstance(transport, RequestsTransport) else "_connections"
+
+        def fetch(transport=transport):
+            transport.request("get", f"{server_url}/works", params={"rows": 1})
+
+        for _ in range(5):
+            thread = threading.Thread(target=fetch)
+            thread.start()
+            thread.join()
+        # Each new thread closes the sessions of the threads that ended.
+        assert len(getattr(transport, registry)) == 1
+        fetch()
+        assert list(getattr(transport, registry)) == [threading.current_thread()]
+        transport.close()
+        fetch()
+        assert len(getattr(transport, registry)) == 1
+        transport.close()
+
+
+def test_rate_limits_are_updated_atomically():
+    http_request = restful.HTTPRequest()
+    headers = (
+        {"x-rate-limit-limit": "10", "x-rate-limit-interval": "1s"},
+        {"x-rate-limit-limit": "600", "x-rate-limit-interval": "1m"},
+    )
+    stop = threading.Event()
+
+    def writer(index):
+        while not stop.is_set():
+            http_request._update_rate_limits(headers[index % 2])
+
+    writers = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+    for thread in writers:
+        thread.start()
+    try:
+        seen = {http_request.throttling_time for _ in range(20000)}
+    finally:
+        stop.set()
+        for thread in writers:
+            thread.join()
+
+    assert seen <= {0.1, 1 / 50}
+
+
+def test_derived_endpoints_share_http_request():
+    works = restful.Works()
+    derived = works.filter(type="journal-article").query("zika").select("DOI")
+
+    assert derived.http_request is works.http_request
+    journals = restful.Journals()
+    assert journals.works("0102-311X").http_request is journals.http_request
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from crossref import decoders, restful
+from tests.helpers import TOTAL_ITEMS
+
+
+def test_default_decoder_is_the_fastest_installed():
+    installed = [name for name in decoders.PREFERENCE if name in decoders.DECODERS]
+
+    assert decoders.get_decoder() is decoders.DECODERS[installed[0]]
+
+
+def test_decoder_by_name():
+    assert decoders.get_decoder("json") is json.loads
+
+
+def test_custom_decoder():
+    def decoder(data):
+        return json.loads(data)
+
+    assert decoders.get_decoder(decoder) is decoder
+
+
+def test_unknown_decoder():
+    with pytest.raises(ValueError, match="must be one of"):
+        decoders.get_decoder("invalid")
+
+
+@pytest.mark.parametrize("name", sorted(decoders.DECODERS))
+def test_decoders_agree(name):
+    body = json.dumps({"message": {"title": ["Ação ☃"], "score": 1.5, "count": 10**12}}).encode()
+
+    assert decoders.get_decoder(name)(body) == json.loads(body)
+
+
+def test_endpoint_uses_the_http_request_decoder(server_url):
+    calls = []
+
+    def decoder(data):
+        calls.append(len(data))
+        return json.loads(data)
+
+    http_request = restful.HTTPRequest(decoder=decoder)
+    assert http_request.item_decoder is decoder
+    works = restful.Works(request_url=f"{server_url}/works", http_request=http_request)
+
+    assert len(list(works)) == TOTAL_ITEMS
+    assert len(calls) == 4  # noqa: PLR2004
+
+    # The streamed items are decoded one by one with it.
+    calls.clear()
+    assert len(list(works.stream())) == TOTAL_ITEMS
+    assert len(calls) == TOTAL_ITEMS
+
+    # Without a decoder, the incremental parser decodes them.
+    works = restful.Works(request_url=f"{server_url}/works")
+    assert next(iter(works))["DOI"] == "10.9999/0"
+    assert works.http_request.item_decoder is None
+    assert [item["DOI"] for item in works.stream()] == [item["DOI"] for item in works]
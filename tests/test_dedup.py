@@ -0,0 +1,83 @@
+import pytest
+
+from crossref import restful
+from crossref.dedup import BloomFilter, Deduplicator, DigestSet, dedup, digest, load
+from tests.helpers import TOTAL_ITEMS
+
+DOIS = [f"10.1000/journal.{i}" for i in range(5000)]
+
+
+def test_digest_is_case_insensitive():
+    assert digest("10.1590/ABC") == digest(" 10.1590/abc")
+    assert digest("10.1590/abc") != digest("10.1590/abd")
+
+
+def test_digest_set():
+    digests = DigestSet(capacity=10)
+
+    assert [digests.add(doi) for doi in DOIS] == [True] * len(DOIS)
+    assert [digests.add(doi.upper()) for doi in DOIS] == [False] * len(DOIS)
+    assert len(digests) == len(DOIS)
+    assert all(doi in digests for doi in DOIS)
+    assert "10.1000/other" not in digests
+    assert digests.nbytes <= 16 * len(DOIS)
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(capacity=len(DOIS), error_rate=0.01)
+
+    assert all(bloom.add(doi) for doi in DOIS[:100])
+    for doi in DOIS[100:]:
+        bloom.add(doi)
+    assert all(doi in bloom for doi in DOIS)
+    false_positives = sum(f"10.2000/{i}" in bloom for i in range(10000))
+    assert false_positives < 200  # noqa: PLR2004 - 1% expected
+    assert bloom.error_rate == pytest.approx(0.01, rel=0.2)
+    assert bloom.nbytes < 2 * len(DOIS)
+
+
+@pytest.mark.parametrize("seen", [DigestSet(), BloomFilter(capacity=10000)])
+def test_save_and_load(tmp_path, seen):
+    for doi in DOIS:
+        seen.add(doi)
+    path = tmp_path / "seen.bin"
+    seen.save(path)
+
+    loaded = load(path)
+
+    assert type(loaded) is type(seen)
+    assert len(loaded) == len(seen)
+    assert all(doi in loaded for doi in DOIS)
+    assert loaded.add("10.1000/new")
+    assert not loaded.add(DOIS[0])
+
+
+def test_load_invalid_file(tmp_path):
+    path = tmp_path / "seen.bin"
+    path.write_bytes(b"not a digest set")
+
+    with pytest.raises(ValueError, match="Not a DigestSet or BloomFilter file"):
+        load(path)
+
+
+def test_deduplicator_across_overlapping_harvests(server_url):
+    works = restful.Works(request_url=f"{server_url}/works")
+    deduplicator = Deduplicator()
+
+    first = list(deduplicator.filter(works))
+    second = list(deduplicator.filter(works))
+
+    assert len(first) == TOTAL_ITEMS
+    assert second == []
+    assert deduplicator.unique == TOTAL_ITEMS
+    assert deduplicator.duplicates == TOTAL_ITEMS
+
+
+def test_dedup_with_key_function():
+    items = [b"1", b"2", b"1", b"3", b"2"]
+
+    assert list(dedup(items, key=bytes.decode)) == [b"1", b"2", b"3"]
+    assert list(dedup([{"DOI": "a"}, {"title": "no doi"}, {"DOI": "A"}])) == [
+        {"DOI": "a"},
+        {"title": "no doi"},
+    ]
@@ -0,0 +1,144 @@
+import time
+
+import pytest
+import requests
+
+from crossref import restful
+from crossref.corpus import synthetic_work
+from crossref.fakeserver import FakeCrossref, Faults
+
+SIZE = 120
+
+
+@pytest.fixture(scope="module")
+def api():
+    with FakeCrossref(size=SIZE, rate_limit=1000) as api:
+        yield api
+
+
+def get(url: str, **params) -> requests.Response:
+    return requests.get(url, params=params, timeout=5)
+
+
+def test_harvest_synthetic_works(api):
+    works = restful.Works(request_url=f"{api.url}/works")
+    items = list(works)
+    assert [item["DOI"] for item in items] == [synthetic_work(i)["DOI"] for i in range(SIZE)]
+    assert works.count() == SIZE
+    assert works.http_request.rate_limits == {
+        "x-rate-limit-limit": 1000,
+        "x-rate-limit-interval": 1,
+    }
+
+    response = get(f"{api.url}/works", rows=10, offset=115)
+    message = response.json()["message"]
+    assert response.headers["x-concurrency-limit"] == "5"
+    assert message["total-results"] == SIZE
+    assert len(message["items"]) == 5  # noqa: PLR2004
+    assert "next-cursor" not in message
+    assert list(message) == ["facets", "total-results", "items", "items-per-page", "query"]
+
+
+def test_filters_select_query_and_sample(api):
+    kind = synthetic_work(0)["type"]
+    response = get(f"{api.url}/works", filter=f"type:{kind}", select="DOI,type", rows=1000)
+    message = response.json()["message"]
+    expected = [synthetic_work(i)["DOI"] for i in range(SIZE) if synthetic_work(i)["type"] == kind]
+    assert [item["DOI"] for item in message["items"]] == expected
+    assert message["total-results"] == len(expected)
+    assert all(item.keys() == {"DOI", "type"} for item in message["items"])
+
+    first, second = synthetic_work(0)["DOI"], synthetic_work(1)["DOI"]
+    response = get(f"{api.url}/works", filter=f"doi:{first.upper()},doi:{second}")
+    assert response.json()["message"]["total-results"] == 2  # noqa: PLR2004
+
+    title = synthetic_work(3)["title"][0]
+    response = get(f"{api.url}/works", **{"query.bibliographic": title})
+    assert synthetic_work(3)["DOI"] in [item["DOI"] for item in response.json()["message"]["items"]]
+
+    sample = get(f"{api.url}/works", sample=10).json()["message"]["items"]
+    assert len(sample) == 10  # noqa: PLR2004
+    assert len({item["DOI"] for item in sample}) == 10  # noqa: PLR2004
+
+
+def test_facets(api):
+    response = get(f"{api.url}/works", facet="type-name:*,publisher-name:2", rows=0)
+    facets = response.json()["message"]["facets"]
+    assert sum(facets["type-name"]["values"].values()) == SIZE
+    assert facets["publisher-name"]["value-count"] == 2  # noqa: PLR2004
+
+
+def test_single_resources(api):
+    work = synthetic_work(7)
+    works = restful.Works(request_url=f"{api.url}/works")
+    http_request = works.http_request
+    response = http_request.do_http_request("get", f"{api.url}/works/{work['DOI']}")
+    assert response.json()["message"] == work
+    response = http_request.do_http_request("get", f"{api.url}/works/{work['DOI']}/agency")
+    assert response.json()["message"]["agency"]["id"] == "crossref"
+    assert http_request.do_http_request("head", f"{api.url}/works/{work['DOI']}").ok
+
+    missing = http_request.do_http_request("get", f"{api.url}/works/10.1000/missing")
+    assert missing.status_code == 404  # noqa: PLR2004
+    assert missing.text == "Resource not found."
+    assert http_request.do_http_request("head", f"{api.url}/nothing").status_code == 404  # noqa: PLR2004
+
+    member = get(f"{api.url}/members/{work['member']}").json()["message"]
+    assert member["prefixes"] == [work["prefix"]]
+    journal = get(f"{api.url}/journals/{work['ISSN'][0]}/works").json()["message"]
+    assert work["DOI"] in [item["DOI"] for item in journal["items"]]
+    types = get(f"{api.url}/types", rows=100).json()["message"]
+    assert types["total-results"] == len({synthetic_work(i)["type"] for i in range(SIZE)})
+
+
+def test_invalid_paging(api):
+    response = get(f"{api.url}/works", rows=1001)
+    assert response.status_code == 400  # noqa: PLR2004
+    assert response.json()["message-type"] == "validation-failure"
+    assert get(f"{api.url}/works", offset=10001).status_code == 400  # noqa: PLR2004
+    for params in ({"sample": "abc"}, {"rows": "-1"}, {"offset": "x"}, {"facet": "type-name:y"}):
+        response = get(f"{api.url}/works", **params)
+        assert response.status_code == 400, params  # noqa: PLR2004
+        assert response.json()["message-type"] == "validation-failure"
+
+
+def test_injected_errors():
+    with FakeCrossref(size=10, faults=Faults(error_rate=1.0, error_status=502)) as api:
+        works = restful.Works(request_url=f"{api.url}/works")
+        with pytest.raises(restful.CrossrefAPIError, match="answered 502"):
+            list(works)
+        assert api.statuses == {502: 1}
+
+
+def test_injected_throttling_and_latency():
+    faults = Faults(latency=0.05, throttle_rate=0.5, retry_after=0)
+    with FakeCrossref(size=10, faults=faults, seed=1) as api:
+        http_request = restful.HTTPRequest(retries=10, throttle=False)
+        started = time.perf_counter()
+        for _ in range(4):
+            response = http_request.do_http_request("get", f"{api.url}/works")
+            assert response.status_code == 200  # noqa: PLR2004
+        assert time.perf_counter() - started >= 0.2  # noqa: PLR2004
+        assert api.statuses[200] == 4  # noqa: PLR2004
+        assert api.statuses[429] > 0
+        http_request.close()
+
+
+def test_enforced_rate_limit():
+    with FakeCrossref(
+        size=10, rate_limit=2, rate_limit_interval=60, enforce_rate_limit=True
+    ) as api:
+        statuses = [get(f"{api.url}/works").status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+
+
+def test_cursor_expiry():
+    with FakeCrossref(size=30, faults=Faults(cursor_ttl=0.1)) as api:
+        works = restful.Works(request_url=f"{api.url}/works")
+        pages = works.pages(rows=10)
+        assert len(next(pages).items) == 10  # noqa: PLR2004
+        time.sleep(0.2)
+        with pytest.raises(restful.CrossrefAPIError, match="expired"):
+            next(pages)
+        response = get(f"{api.url}/works", cursor="20")
+        assert response.status_code == 400  # noqa: PLR2004
@@ -0,0 +1,104 @@
+import pickle
+
+import pytest
+
+from crossref import restful
+from crossref.fakeserver import FakeCrossref
+from crossref.hydrate import Hydrator, LazyWork
+from tests.helpers import TOTAL_ITEMS
+
+
+@pytest.fixture
+def works(server_url):
+    return restful.Works(request_url=f"{server_url}/works")
+
+
+def test_heavy_fields_are_not_requested(works):
+    hydrator = Hydrator(works)
+    first = next(iter(hydrator))
+
+    assert set(first) == {"DOI", "member", "title"}
+    assert "reference" not in hydrator.endpoint.request_params["select"].split(",")
+    assert hydrator.lookups == 0
+
+
+def test_heavy_fields_are_fetched_by_page(works):
+    hydrator = Hydrator(works, rows=100)
+
+    abstracts = [work.get("abstract") for work in hydrator]
+
+    assert abstracts == [
+        f"<jats:p>Abstract {i}</jats:p>" if i % 2 == 0 else None for i in range(TOTAL_ITEMS)
+    ]
+    assert hydrator.lookups == 3  # noqa: PLR2004 - one per page
+
+
+def test_lookups_are_batched(works):
+    hydrator = Hydrator(works, batch_size=10, rows=40)
+
+    references = [work["reference"] for work in hydrator]
+
+    assert references == [[{"key": f"ref{i}"}] for i in range(TOTAL_ITEMS)]
+    assert hydrator.lookups == TOTAL_ITEMS // 10
+
+
+def test_missing_fields(works):
+    work = next(iter(Hydrator(works)))
+
+    with pytest.raises(KeyError):
+        work["not-a-field"]
+    assert work.hydrated is False
+    with pytest.raises(KeyError):
+        work["abstract" if "abstract" in work else "relation"]
+    assert work.hydrated is True
+    assert work.get("relation", "default") == "default"
+
+
+def test_select_is_honored(server_url):
+    works = restful.Works(
+        request_url=f"{server_url}/works", request_params={"select": "DOI,abstract"}
+    )
+    hydrator = Hydrator(works)
+    work = next(iter(hydrator))
+
+    assert hydrator.fields == {"abstract"}
+    assert set(work) == {"DOI"}
+    assert work.to_dict() == {"DOI": "10.9999/0", "abstract": "<jats:p>Abstract 0</jats:p>"}
+
+
+def test_lazy_work_pickles_as_a_dict(works):
+    work = next(iter(Hydrator(works)))
+    data = pickle.loads(pickle.dumps(work))  # noqa: S301
+
+    assert not isinstance(data, LazyWork)
+    assert data["reference"] == [{"key": "ref0"}]
+
+
+def test_batch_size_limit(works):
+    with pytest.raises(restful.UrlSyntaxError):
+        Hydrator(works, batch_size=101)
+
+
+def test_dois_with_commas_are_looked_up_alone():
+    records = [
+        {"DOI": "10.9999/a,b", "title": ["Comma"], "abstract": "<jats:p>Comma</jats:p>"},
+        {"DOI": "10.9999/c", "title": ["Plain"], "abstract": "<jats:p>Plain</jats:p>"},
+    ]
+    with FakeCrossref(records) as api:
+        hydrator = Hydrator(restful.Works(request_url=f"{api.url}/works"))
+        abstracts = [work["abstract"] for work in hydrator]
+
+        assert abstracts == ["<jats:p>Comma</jats:p>", "<jats:p>Plain</jats:p>"]
+        assert hydrator.lookups == 1
+        # Two pages, the last one empty, then one batch and one single lookup.
+        assert api.statuses == {200: 4}
+
+
+def test_lookup_errors_are_raised(works, unavailable_url):
+    hydrator = Hydrator(works)
+    work = next(iter(hydrator))
+    hydrator.endpoint = restful.Works(request_url=f"{unavailable_url}/works")
+
+    with pytest.raises(restful.CrossrefAPIError, match="answered 503"):
+        work.hydrate()
+    assert not work.hydrated
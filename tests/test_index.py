@@ -0,0 +1,135 @@
+import pytest
+
+from crossref import restful
+from crossref.index import ROWS, IndexedWorks, SearchIndex, words
+from crossref.mirror import Mirror
+
+WORKS = [
+    {
+        "DOI": "10.1590/0102-311X00133115",
+        "title": ["Dengue em São Paulo: análise espacial"],
+        "container-title": ["Cadernos de Saúde Pública"],
+        "author": [{"given": "Maria", "family": "Silva"}, {"given": "João", "family": "Souza"}],
+        "issued": {"date-parts": [[2016, 5]]},
+        "volume": "32",
+        "page": "e00133115",
+    },
+    {
+        "DOI": "10.1000/zika",
+        "title": ["Zika virus outbreak in Brazil"],
+        "container-title": ["The Lancet"],
+        "author": [{"given": "John", "family": "Smith", "affiliation": [{"name": "Fiocruz"}]}],
+        "issued": {"date-parts": [[2016]]},
+        "funder": [{"name": "Wellcome Trust"}],
+    },
+    {
+        "DOI": "10.1000/deep",
+        "title": ["Deep learning for protein structure"],
+        "container-title": ["Nature"],
+        "author": [{"given": "Ana", "family": "Costa"}],
+        "editor": [{"given": "Paul", "family": "Smith"}],
+        "issued": {"date-parts": [[2021, 3, 4]]},
+    },
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(tmp_path / "crossref.db")
+    index.add(WORKS, batch_size=2)
+    yield index
+    index.close()
+
+
+def test_words():
+    assert words("The Dengue em São-Paulo, J. (2016)") == ["dengue", "em", "sao", "paulo", "2016"]
+
+
+def test_bibliographic_match(index):
+    citation = "Silva M, Souza J. Dengue em Sao Paulo. Cad Saude Publica. 2016;32:e00133115."
+    match = index.match(bibliographic=citation)
+
+    assert match["DOI"] == WORKS[0]["DOI"]
+    assert match["title"] == WORKS[0]["title"]
+    assert match["coverage"] >= 0.8  # noqa: PLR2004
+    assert match["score"] > 0
+    assert len(index) == len(WORKS)
+
+
+@pytest.mark.parametrize(
+    ("args", "kwargs", "expected"),
+    [
+        ((), {"author": "smith"}, ["10.1000/zika"]),
+        ((), {"editor": "smith"}, ["10.1000/deep"]),
+        ((), {"contributor": "smith"}, ["10.1000/zika", "10.1000/deep"]),
+        ((), {"affiliation": "fiocruz"}, ["10.1000/zika"]),
+        ((), {"funder_name": "wellcome"}, ["10.1000/zika"]),
+        ((), {"container_title": "nature"}, ["10.1000/deep"]),
+        (("smith",), {}, ["10.1000/zika", "10.1000/deep"]),
+        (("zika brazil",), {"author": "smith"}, ["10.1000/zika"]),
+        ((), {"author": "nobody"}, []),
+        ((), {"author": "the of"}, []),
+    ],
+)
+def test_field_queries(index, args, kwargs, expected):
+    assert sorted(work["DOI"] for work in index.search(*args, **kwargs)) == sorted(expected)
+
+
+def test_coverage(index):
+    # Only "zika" is found, one word out of four.
+    assert index.search(bibliographic="zika mosquito control policy") == []
+    assert [work["DOI"] for work in index.search("zika mosquito", min_coverage=0)] == [
+        "10.1000/zika"
+    ]
+
+
+def test_unknown_field_query(index):
+    with pytest.raises(restful.UrlSyntaxError, match="no such field query"):
+        index.search(title="zika")
+
+
+def test_replace_work(index):
+    index.add([{**WORKS[1], "title": ["Chikungunya in Bahia"]}])
+
+    assert len(index) == len(WORKS)
+    assert index.search(bibliographic="zika virus outbreak") == []
+    assert index.match(bibliographic="chikungunya bahia")["DOI"] == "10.1000/zika"
+
+
+def test_shares_the_mirror_database(tmp_path):
+    mirror = Mirror(tmp_path / "crossref.db")
+    index = SearchIndex(tmp_path / "crossref.db")
+    mirror.store(WORKS)
+    index.add(WORKS)
+
+    assert mirror.count() == len(index) == len(WORKS)
+    mirror.close()
+    index.close()
+
+
+def test_indexed_works_fall_back_to_the_api(index, server_url):
+    works = index.works(request_url=f"{server_url}/works")
+    assert isinstance(works, IndexedWorks)
+
+    local = works.query(bibliographic="Zika virus outbreak in Brazil, Lancet 2016")
+    assert [work["DOI"] for work in local] == ["10.1000/zika"]
+
+    # Queries with no local match, and queries with filters, go to the API.
+    remote = index.works(
+        request_url=f"{server_url}/works", request_params={"query.bibliographic": "work"}
+    )
+    assert len(list(remote)) > 0
+    assert IndexedWorks._local_query(index.works(request_params={"filter": "type:book"})) is None
+
+
+def test_indexed_works_yield_every_local_match(index):
+    index.add(
+        [{"DOI": f"10.1000/{i}", "title": [f"Arbovirus surveillance {i}"]} for i in range(30)]
+    )
+    works = index.works().query("arbovirus surveillance")
+
+    assert type(works) is IndexedWorks
+    assert works.index is index
+    assert len(list(works)) == 30  # noqa: PLR2004
+    assert len(list(index.works(rows=5).query("arbovirus surveillance"))) == 5  # noqa: PLR2004
+    assert len(index.search("arbovirus surveillance")) == ROWS
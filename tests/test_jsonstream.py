@@ -0,0 +1,171 @@
+import json
+
+import pytest
+
+from crossref.jsonstream import ItemStream, RawList, raw_field, raw_fields
+
+RESPONSE = {
+    "status": "ok",
+    "message-type": "work-list",
+    "message": {
+        "facets": {},
+        "next-cursor": "DnF1ZXJ5VGhlbkZldGNo",
+        "total-results": 1234567,
+        "items": [
+            {"DOI": "10.1590/0102-311x00133115", "title": ["Ação à saúde ☃"], "page": 12},
+            {"DOI": "10.1000/2", "reference": [{"key": "ref1", "year": "2001"}] * 50},
+            {"DOI": "10.1000/3", "score": 1.5e10, "is-referenced-by-count": 123456789},
+        ],
+        "items-per-page": 3,
+        "query": {"start-index": 0, "search-terms": None},
+    },
+}
+
+
+def chunked(data: bytes, size: int):
+    return (data[i : i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64, 100000])
+def test_items_and_metadata(size):
+    body = json.dumps(RESPONSE, ensure_ascii=False, indent=1).encode()
+    stream = ItemStream(chunked(body, size))
+
+    assert list(stream) == RESPONSE["message"]["items"]
+    assert stream.count == len(RESPONSE["message"]["items"])
+    assert stream.metadata == {"status": "ok", "message-type": "work-list"}
+    assert stream.message["next-cursor"] == "DnF1ZXJ5VGhlbkZldGNo"
+    assert stream.message["total-results"] == 1234567  # noqa: PLR2004
+    assert stream.message["query"] == {"start-index": 0, "search-terms": None}
+
+
+def test_prepare_parses_up_to_the_first_item():
+    body = json.dumps(RESPONSE).encode()
+    chunks = chunked(body, 16)
+    stream = ItemStream(chunks)
+    stream.prepare()
+
+    assert stream.message == {
+        "facets": {},
+        "next-cursor": "DnF1ZXJ5VGhlbkZldGNo",
+        "total-results": 1234567,
+    }
+    assert stream.count == 0
+    # The body has not been consumed beyond the first item.
+    assert len(list(chunks)) > 0
+
+
+def test_items_are_yielded_before_the_end_of_the_body():
+    body = json.dumps(RESPONSE).encode()
+    read = []
+
+    def chunks():
+        for chunk in chunked(body, 32):
+            read.append(len(chunk))
+            yield chunk
+
+    first = next(iter(ItemStream(chunks())))
+
+    assert first["DOI"] == "10.1590/0102-311x00133115"
+    assert sum(read) < len(body)
+
+
+def test_response_without_items():
+    stream = ItemStream([b'{"status": "ok", "message": {"DOI": "10.1000/1"}}'])
+
+    assert list(stream) == []
+    assert stream.message == {"DOI": "10.1000/1"}
+
+
+def test_malformed_response():
+    stream = ItemStream(chunked(b'{"message": {"items": [{"DOI": "10.1000/1"} {"DOI"', 4))
+
+    with pytest.raises(json.JSONDecodeError):
+        list(stream)
+
+
+def test_truncated_response():
+    stream = ItemStream([b'{"message": {"items": [{"DOI": "10.1000/1"}, {"DO'])
+
+    with pytest.raises(json.JSONDecodeError):
+        list(stream)
+
+
+@pytest.mark.parametrize("size", [1, 7, 100000])
+def test_items_with_a_decoder(size):
+    items = [
+        *RESPONSE["message"]["items"],
+        {"DOI": "10.1000/4", "title": ['a "quoted" [title] {x}\\']},
+        {"DOI": "10.1000/5", "deep": json.loads("[" * 40 + "1" + "]" * 40)},
+        [1, {"a": "b"}],
+        "scalar",
+    ]
+    body = json.dumps({"message": {"items": items, "total-results": 5}}, indent=1).encode()
+    decoded = []
+
+    def decoder(data):
+        decoded.append(data)
+        return json.loads(data)
+
+    stream = ItemStream(chunked(body, size), decoder)
+
+    assert list(stream) == items
+    assert len(decoded) == len(items) - 1
+    assert stream.message == {"total-results": 5}
+
+
+def test_truncated_response_with_a_decoder():
+    body = b'{"message": {"items": [{"DOI": "10.1000/1"}, {"DOI": "1'
+    stream = ItemStream(chunked(body, 8), lambda data: json.loads(bytes(data)))
+
+    with pytest.raises(json.JSONDecodeError, match="Unterminated object"):
+        list(stream)
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_raw_list(indent):
+    body = json.dumps(RESPONSE, ensure_ascii=False, indent=indent).encode()
+    raw_list = RawList(body)
+
+    assert all(isinstance(item, memoryview) for item in raw_list.items)
+    assert [json.loads(bytes(item)) for item in raw_list.items] == RESPONSE["message"]["items"]
+    assert raw_list.metadata == {"status": "ok", "message-type": "work-list"}
+    assert raw_list.message == {
+        key: value for key, value in RESPONSE["message"].items() if key != "items"
+    }
+
+
+def test_raw_list_with_deep_nesting():
+    deep = {"DOI": "10.1000/deep", "nested": json.loads("[" * 40 + "1" + "]" * 40)}
+    body = json.dumps({"message": {"items": [deep, {"DOI": "10.1000/2"}]}}).encode()
+
+    assert [json.loads(bytes(item)) for item in RawList(body).items] == [deep, {"DOI": "10.1000/2"}]
+
+
+def test_raw_list_with_brackets_in_strings():
+    items = [{"title": ['A "{quoted}" [title] \\\\']}, {"title": ["}]"]}]
+    body = json.dumps({"message": {"items": items}}).encode()
+
+    assert [json.loads(bytes(item)) for item in RawList(body).items] == items
+
+
+def test_raw_field():
+    item = json.dumps(RESPONSE["message"]["items"][1]).encode()
+
+    assert raw_field(item, "DOI") == "10.1000/2"
+    assert raw_field(memoryview(item), "reference")[0] == {"key": "ref1", "year": "2001"}
+    assert raw_field(item, "missing", "default") == "default"
+
+
+def test_raw_fields():
+    item = json.dumps(RESPONSE["message"]["items"][0], ensure_ascii=False).encode()
+
+    assert raw_fields(item, ("page", "title", "missing")) == {
+        "title": ["Ação à saúde ☃"],
+        "page": 12,
+    }
+
+
+def test_raw_list_malformed():
+    with pytest.raises(json.JSONDecodeError):
+        RawList(b'{"message": {"items": [{"DOI": "1"} {"DOI": "2"}]}}')
@@ -0,0 +1,104 @@
+import urllib.request
+
+import pytest
+import requests
+
+from crossref import restful
+from crossref.metrics import Metrics, route, serve
+from crossref.mirror import Mirror
+from tests.helpers import TOTAL_ITEMS
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("https://api.crossref.org/works?rows=20", "/works"),
+        ("https://api.crossref.org/works/10.1590/0102-311X00133115", "/works/{id}"),
+        ("https://api.crossref.org/works/10.1590/0102-311X00133115/agency", "/works/{id}/agency"),
+        ("https://api.crossref.org/members/78/works", "/members/{id}/works"),
+        ("https://api.crossref.org/journals/0102-311X", "/journals/{id}"),
+        ("https://api.crossref.org/", "/"),
+    ],
+)
+def test_route(url, expected):
+    assert route(url) == expected
+
+
+def test_requests_and_exposition(server_url):
+    works = restful.Works(request_url=f"{server_url}/works")
+    with Metrics(works, buckets=(0.001, 1.0)) as metrics:
+        assert sum(1 for _ in works) == TOTAL_ITEMS
+        works.http_request.do_http_request("get", f"{server_url}/missing/10.1000/1")
+
+    assert metrics.requests == {("/works", "get", 200): 4, ("/missing/{id}", "get", 404): 1}
+    assert metrics.latency["/works"].count == 4  # noqa: PLR2004
+    assert metrics.size["/works"] > 0
+    assert metrics.retries == {}
+    assert metrics.headroom() == works.http_request.rate_limits["x-rate-limit-limit"] - 5
+    assert works.http_request.listeners == []
+
+    text = metrics.exposition()
+    assert '\ncrossref_requests_total{route="/works",method="get",status="200"} 4\n' in text
+    assert '\ncrossref_request_duration_seconds_bucket{route="/works",le="+Inf"} 4\n' in text
+    assert '\ncrossref_request_duration_seconds_count{route="/works"} 4\n' in text
+    assert "\n# TYPE crossref_request_duration_seconds histogram\n" in text
+    # The rate limits of the fake API apply to its 404 too.
+    assert "\ncrossref_rate_limit_requests 1000\n" in text
+    assert "\ncrossref_rate_limit_headroom 995\n" in text
+    assert "\n# TYPE crossref_throttle_sleeps_total counter\n" in text
+
+
+def test_retries(unavailable_url):
+    http_request = restful.HTTPRequest(retries=2)
+    with Metrics(http_request) as metrics:
+        result = http_request.do_http_request("get", f"{unavailable_url}/works")
+
+    assert result.status_code == 503  # noqa: PLR2004
+    assert metrics.requests == {("/works", "get", 503): 1}
+    assert metrics.retries == {"/works": 2}
+    assert '\ncrossref_retries_total{route="/works"} 2\n' in metrics.exposition()
+
+
+def test_errors_and_throttle():
+    http_request = restful.HTTPRequest()
+    http_request.rate_limits = {"x-rate-limit-limit": 4, "x-rate-limit-interval": 1}
+    with Metrics(http_request) as metrics:
+        for _ in range(2):
+            with pytest.raises(requests.ConnectionError):
+                http_request.do_http_request("get", "http://127.0.0.1:9/works", timeout=1)
+
+    assert metrics.errors == {("/works", "get", "ConnectionError"): 2}
+    assert metrics.requests == {}
+    assert metrics.throttle_sleeps == 1
+    assert metrics.throttle_seconds > 0
+
+
+def test_cache_hits(server_url, tmp_path):
+    mirror = Mirror(tmp_path / "crossref.db")
+    mirror.store([{"DOI": "10.1000/1", "title": ["Stored"]}])
+    works = mirror.works(request_url=f"{server_url}/works")
+
+    with Metrics(works) as metrics:
+        assert works.doi_exists("10.1000/1")
+        assert works.doi("10.1000/1")["title"] == ["Stored"]
+        assert sum(1 for _ in works) == TOTAL_ITEMS
+
+    assert metrics.cache == {("mirror", True): 2, ("mirror", False): 1}
+    assert metrics.hit_ratio("mirror") == pytest.approx(2 / 3)
+    assert metrics.hit_ratio("index") is None
+    assert 'crossref_cache_lookups_total{cache="mirror",result="hit"} 2' in metrics.exposition()
+    mirror.close()
+
+
+def test_serve():
+    metrics = Metrics(restful.HTTPRequest())
+    server = serve(metrics)
+    try:
+        assert server.server_address[0] == "127.0.0.1"
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+            assert b"# TYPE crossref_rate_limit_headroom gauge" in response.read()
+    finally:
+        server.shutdown()
+        server.server_close()
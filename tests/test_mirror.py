@@ -0,0 +1,180 @@
+import pickle
+import threading
+
+import pytest
+
+from crossref import restful
+from crossref.mirror import Mirror, MirroredWorks, normalize_issn
+from crossref.query import QueryTemplate
+from tests.helpers import TOTAL_ITEMS
+
+WORKS = [
+    {
+        "DOI": "10.1590/0102-311X00133115",
+        "member": "530",
+        "prefix": "10.1590",
+        "type": "journal-article",
+        "ISSN": ["0102-311X", "1678-4464"],
+        "issued": {"date-parts": [[2016, 5]]},
+        "indexed": {"date-time": "2024-03-01T10:20:30Z"},
+        "title": ["Saúde"],
+    },
+    {
+        "DOI": "10.1590/other",
+        "member": "530",
+        "prefix": "10.1590",
+        "type": "book-chapter",
+        "issued": {"date-parts": [[2021, 1, 2]]},
+    },
+    {"DOI": "10.1000/1", "member": "98", "type": "journal-article"},
+]
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    mirror = Mirror(tmp_path / "crossref.db")
+    yield mirror
+    mirror.close()
+
+
+def test_store_and_get(mirror):
+    assert mirror.store(WORKS, batch_size=2) == len(WORKS)
+
+    assert mirror.get("10.1590/0102-311x00133115") == WORKS[0]
+    assert "10.1590/OTHER" in mirror
+    assert mirror.get("10.1000/missing") is None
+    assert mirror.connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+
+
+def test_stale_works_are_ignored(tmp_path):
+    mirror = Mirror(tmp_path / "crossref.db", max_age=-1)
+    mirror.store(WORKS)
+
+    assert mirror.get(WORKS[0]["DOI"]) is None
+    assert WORKS[0]["DOI"] not in mirror
+
+
+@pytest.mark.parametrize(
+    ("filters", "expected"),
+    [
+        ("member:530", ["10.1590/0102-311X00133115", "10.1590/other"]),
+        ("issn:1678-4464", ["10.1590/0102-311X00133115"]),
+        ("issn:0102311x", ["10.1590/0102-311X00133115"]),
+        ("member:530,type:book-chapter", ["10.1590/other"]),
+        ("from-pub-date:2020", ["10.1590/other"]),
+        ("until-pub-date:2016", ["10.1590/0102-311X00133115"]),
+        ("until-pub-date:2016-04", []),
+        ("from-index-date:2024-01-01", ["10.1590/0102-311X00133115"]),
+        ("doi:10.1000/1", ["10.1000/1"]),
+    ],
+)
+def test_query(mirror, filters, expected):
+    mirror.store(WORKS)
+
+    assert sorted(work["DOI"] for work in mirror.query(filters)) == expected
+    assert mirror.count(filters) == len(expected)
+
+
+def test_issns_are_normalized(mirror):
+    mirror.store([{"DOI": "10.1000/issn", "ISSN": ["12345678", "8765-432x"]}])
+
+    assert [work["DOI"] for work in mirror.query("issn:1234-5678")] == ["10.1000/issn"]
+    assert mirror.count("issn:8765432X") == 1
+    assert normalize_issn(" 1234 567x") == "1234-567X"
+
+
+def test_query_with_unsupported_filter(mirror):
+    with pytest.raises(ValueError, match="must only use"):
+        list(mirror.query("has-abstract:true"))
+
+
+def test_harvest_and_read_through(mirror, server_url):
+    works = mirror.works(request_url=f"{server_url}/works", request_params={"filter": "member:1"})
+
+    assert mirror.harvest(works, rows=100) == TOTAL_ITEMS
+    assert mirror.covers({"filter": "member:1"})
+    assert not mirror.covers({"filter": "member:2"})
+    assert not mirror.covers({"filter": "member:1", "query": "zika"})
+
+    class FailingHTTPRequest(restful.HTTPRequest):
+        def do_http_request(self, *args, **kwargs):  # noqa: ARG002
+            raise AssertionError
+
+    offline = mirror.works(
+        request_url=f"{server_url}/works",
+        request_params={"filter": "member:1"},
+        http_request=FailingHTTPRequest(),
+    )
+    assert isinstance(offline, MirroredWorks)
+    assert len(list(offline)) == TOTAL_ITEMS
+    assert offline.count() == TOTAL_ITEMS
+    assert offline.doi("10.9999/7")["DOI"] == "10.9999/7"
+    assert offline.doi_exists("10.9999/7")
+
+
+def test_doi_falls_through_to_the_api(mirror, monkeypatch):
+    calls = []
+
+    def doi(self, doi, only_message=True):  # noqa: ARG001
+        calls.append(doi)
+        return dict(WORKS[2])
+
+    monkeypatch.setattr(restful.Works, "doi", doi)
+    works = mirror.works()
+
+    assert works.doi("10.1000/1") == WORKS[2]
+    assert works.doi("10.1000/1") == WORKS[2]
+    assert calls == ["10.1000/1"]
+    assert works.doi("10.1000/1", only_message=False) == {
+        "status": "ok",
+        "message-type": "work",
+        "message-version": "1.0.0",
+        "message": WORKS[2],
+    }
+    assert calls == ["10.1000/1"]
+
+    derived = works.filter(type="journal-article").query("zika")
+    assert type(derived) is MirroredWorks
+    assert derived.mirror is mirror
+
+
+def test_mirrored_works_pickle(mirror):
+    mirror.store(WORKS)
+    works = pickle.loads(pickle.dumps(mirror.works().filter(member=530)))  # noqa: S301
+
+    assert works.mirror.get("10.1000/1") == WORKS[2]
+    assert works.request_params == {"filter": "member:530"}
+    works.mirror.close()
+
+
+def test_query_template_keeps_the_mirror(mirror):
+    mirror.store(WORKS)
+    template = QueryTemplate(mirror.works().filter(type="journal-article"), filters=("member",))
+    works = template.endpoint(member=530)
+
+    assert isinstance(works, MirroredWorks)
+    assert works.mirror is mirror
+    assert works.request_params == {"filter": "type:journal-article,member:530"}
+    assert works.doi("10.1000/1") == WORKS[2]
+
+
+def test_harvest_rejects_select(mirror):
+    with pytest.raises(ValueError, match="select"):
+        mirror.harvest(restful.Works(request_params={"select": "DOI"}))
+
+
+def test_connection_per_thread(mirror):
+    mirror.store(WORKS)
+    connections = []
+
+    def read():
+        connections.append(mirror.connection)
+        assert mirror.get("10.1000/1") is not None
+
+    threads = [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(connection) for connection in connections}) == len(threads)
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from crossref import restful
+from crossref.pipeline import ParallelMap, parallel_map
+from tests.helpers import TOTAL_ITEMS
+
+
+def square(value):
+    return value * value
+
+
+def fail_on_three(value):
+    if value == 3:  # noqa: PLR2004
+        msg = "three"
+        raise ValueError(msg)
+    return value
+
+
+def test_ordered_results():
+    result = list(parallel_map(square, range(50), workers=4))
+
+    assert result == [i * i for i in range(50)]
+
+
+def test_unordered_results():
+    def slow_first(value):
+        if value == 0:
+            time.sleep(0.2)
+        return value
+
+    result = list(parallel_map(slow_first, range(10), workers=4, ordered=False))
+
+    assert sorted(result) == list(range(10))
+    assert result[-1] == 0
+
+
+def test_process_pool_with_chunks():
+    result = list(parallel_map(square, range(50), workers=2, executor="process", chunksize=8))
+
+    assert result == [i * i for i in range(50)]
+
+
+def test_collect_errors():
+    mapped = ParallelMap(fail_on_three, range(6), workers=2, errors="collect")
+
+    assert list(mapped) == [0, 1, 2, 4, 5]
+    assert [(item, str(exc)) for item, exc in mapped.errors] == [(3, "three")]
+
+
+def test_raise_errors():
+    with pytest.raises(ValueError, match="three"):
+        list(parallel_map(fail_on_three, range(6), workers=2))
+
+
+def test_window_bounds_items_in_flight():
+    consumed = []
+    release = threading.Event()
+
+    def source():
+        for i in range(100):
+            consumed.append(i)
+            yield i
+
+    def blocked(value):
+        release.wait()
+        return value
+
+    iterator = iter(parallel_map(blocked, source(), workers=2, window=3, chunksize=2))
+    first = threading.Timer(0.2, release.set)
+    first.start()
+    assert next(iterator) == 0
+    # Three chunks of two items were submitted before the first result was ready.
+    assert len(consumed) <= 3 * 2 + 2
+    assert list(iterator) == list(range(1, 100))
+
+
+def test_map_over_endpoint(server_url):
+    works = restful.Works(request_url=f"{server_url}/works")
+    result = list(parallel_map(lambda item: item["DOI"].upper(), works, workers=4))
+
+    assert result == [f"10.9999/{i}" for i in range(TOTAL_ITEMS)]
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+import requests
+
+from crossref import restful
+from crossref.profiling import PHASES, Profiler
+from tests.helpers import TOTAL_ITEMS
+
+
+def test_profile_a_harvest(server_url):
+    works = restful.Works(request_url=f"{server_url}/works")
+
+    with Profiler(works) as profiler:
+        count = 0
+        for _ in profiler.iterate(works.pages(rows=100)):
+            time.sleep(0.01)
+            count += 1
+
+    summary = profiler.summary()
+    # The last, empty page ends the harvest.
+    assert count == 3  # noqa: PLR2004
+    assert summary["requests"] == 4  # noqa: PLR2004
+    assert summary["statuses"] == {200: 4}
+    assert summary["size"] > 0
+    phases = summary["phases"]
+    assert phases["connect"]["count"] == phases["download"]["count"] == 4  # noqa: PLR2004
+    assert phases["connect"]["total"] > 0
+    assert phases["tls"]["total"] >= 0
+    assert phases["decode"]["count"] == 4  # noqa: PLR2004
+    assert phases["consumer"]["count"] == 3  # noqa: PLR2004
+    assert phases["consumer"]["total"] >= 0.03  # noqa: PLR2004
+    assert phases["consumer"]["p50"] >= 0.01  # noqa: PLR2004
+    assert 0 < phases["consumer"]["share"] < 1
+    assert summary["wall"] >= phases["consumer"]["total"]
+    assert profiler not in works.http_request.listeners
+
+    report = profiler.report()
+    assert report.startswith("4 requests, 0 errors")
+    assert all(f"\n{phase} " in report for phase in PHASES)
+
+
+def test_profile_raw_pages_and_single_calls(server_url):
+    works = restful.Works(request_url=f"{server_url}/works")
+    profiler = Profiler(works.http_request).start()
+    items = [item for page in works.pages(rows=TOTAL_ITEMS, raw=True) for item in page.items]
+    profiler.stop()
+    assert len(items) == TOTAL_ITEMS
+    assert profiler.summary()["phases"]["decode"]["count"] == 2  # noqa: PLR2004
+
+    with Profiler(works) as profiler:
+        assert works.count() == TOTAL_ITEMS
+    summary = profiler.summary()
+    assert summary["requests"] == 1
+    assert summary["phases"]["consumer"]["count"] == 0
+    assert summary["phases"]["consumer"]["mean"] is None
+
+
+def test_profile_errors_and_throttling():
+    http_request = restful.HTTPRequest()
+    http_request.rate_limits = {"x-rate-limit-limit": 1, "x-rate-limit-interval": 1}
+    events = []
+    http_request.add_listener(lambda event, _: events.append(event))
+
+    with Profiler(http_request) as profiler:
+        for _ in range(2):
+            with pytest.raises(requests.ConnectionError):
+                http_request.do_http_request("get", "http://127.0.0.1:9/works", timeout=1)
+
+    # The second request waits for its slot.
+    summary = profiler.summary()
+    assert summary["errors"] == 2  # noqa: PLR2004
+    assert summary["requests"] == 0
+    assert summary["phases"]["throttle"]["count"] == 1
+    assert events == ["error", "throttle", "error"]
@@ -0,0 +1,134 @@
+import pickle
+from datetime import date
+
+import pytest
+
+from crossref import restful
+from crossref.query import QuerySpec, QueryTemplate
+
+
+@pytest.fixture
+def template():
+    return QueryTemplate(
+        restful.Works().filter(type="journal-article").select("DOI", "title"),
+        filters=("member", "from_pub_date"),
+        queries=("bibliographic",),
+    )
+
+
+def test_bind_returns_sorted_params(template):
+    result = template.bind(member=98, from_pub_date="2020-01", bibliographic="zika")
+
+    assert result == (
+        ("filter", "type:journal-article,member:98,from-pub-date:2020-01"),
+        ("query.bibliographic", "zika"),
+        ("select", "DOI,title"),
+    )
+
+
+def test_cache_key_matches_endpoint_url(template):
+    values = {"member": 98, "from_pub_date": "2020", "bibliographic": "zika virus"}
+    expected = (
+        restful.Works()
+        .filter(type="journal-article")
+        .select("DOI", "title")
+        .filter(member=98, from_pub_date="2020")
+        .query(bibliographic="zika virus")
+        .url
+    )
+
+    assert template.cache_key(**values) == expected
+    assert template.endpoint(**values).url == expected
+
+
+def test_endpoint_shares_http_request(template):
+    result = template.endpoint(member=1, from_pub_date="2020", bibliographic="x")
+
+    assert isinstance(result, restful.Works)
+    assert result.http_request is template.base.http_request
+
+
+def test_bind_validates_values(template):
+    with pytest.raises(restful.UrlSyntaxError, match="Invalid date"):
+        template.bind(member=98, from_pub_date="2020-13", bibliographic="zika")
+
+
+def test_bind_requires_every_placeholder(template):
+    with pytest.raises(restful.UrlSyntaxError, match=r"Missing: \(bibliographic\)"):
+        template.bind(member=98, from_pub_date="2020")
+
+
+def test_template_without_placeholders():
+    template = QueryTemplate(restful.Works())
+
+    assert template.bind() == ()
+    assert template.cache_key() == restful.Works().url
+
+
+def test_unknown_placeholder():
+    with pytest.raises(restful.UrlSyntaxError, match="no such filter"):
+        QueryTemplate(restful.Works(), filters=("invalid_filter",))
+
+    with pytest.raises(restful.UrlSyntaxError, match="no such field query"):
+        QueryTemplate(restful.Works(), queries=("invalid_field",))
+
+
+@pytest.fixture
+def spec():
+    works = restful.Members().works(98).filter(type="journal-article").select("DOI")
+    return QuerySpec.from_endpoint(works)
+
+
+def test_spec_from_endpoint(spec):
+    assert spec == QuerySpec(
+        endpoint="works",
+        context="members/98",
+        params=(("filter", "type:journal-article"), ("select", "DOI")),
+        paging="cursor",
+    )
+
+
+def test_spec_round_trips(spec):
+    sharded = spec.with_shard(("pub-date", "2020-01-01", "2020-01-31"))
+
+    assert QuerySpec.from_json(sharded.to_json()) == sharded
+    assert pickle.loads(pickle.dumps(sharded)) == sharded  # noqa: S301
+
+
+def test_spec_to_endpoint(spec):
+    etiquette = restful.Etiquette(application_name="Spec")
+    sharded = spec.with_shard(("pub-date", "2020-01-01", "2020-01-31"))
+    result = sharded.to_endpoint(etiquette=etiquette)
+
+    assert isinstance(result, restful.Works)
+    assert result.etiquette is etiquette
+    assert result.url == (
+        "https://api.crossref.org/members/98/works?filter=type%3Ajournal-article"
+        "%2Cfrom-pub-date%3A2020-01-01%2Cuntil-pub-date%3A2020-01-31&select=DOI"
+    )
+
+
+def test_spec_shard_by_date(spec):
+    result = spec.shard_by_date("index-date", date(2020, 1, 1), date(2020, 1, 25), 10)
+
+    assert [shard.shard for shard in result] == [
+        ("index-date", "2020-01-01", "2020-01-10"),
+        ("index-date", "2020-01-11", "2020-01-20"),
+        ("index-date", "2020-01-21", "2020-01-25"),
+    ]
+
+
+def test_spec_paging():
+    assert QuerySpec.from_endpoint(restful.Works().sample(5)).paging == "sample"
+    assert QuerySpec.from_endpoint(restful.Journals()).paging == "offset"
+
+    with pytest.raises(restful.UrlSyntaxError, match="pages by offset"):
+        QuerySpec(endpoint="journals", paging="cursor")
+
+
+def test_spec_invalid_shard(spec):
+    with pytest.raises(restful.UrlSyntaxError, match="no from-title date filter"):
+        spec.with_shard(("title", "2020", "2021"))
+
+    with pytest.raises(restful.UrlSyntaxError, match="Invalid date"):
+        spec.with_shard(("pub-date", "2020", "2020-13"))
@@ -0,0 +1,164 @@
+import json
+import pickle
+import sys
+
+import pytest
+
+from crossref import restful
+from crossref.records import Author, Funder, Reference, Work, iter_works, to_works
+from tests.helpers import TOTAL_ITEMS
+
+WORK = {
+    "DOI": "10.1590/0102-311x00133115",
+    "type": "journal-article",
+    "title": ["Ação à saúde"],
+    "publisher": "FapUNIFESP (SciELO)",
+    "container-title": ["Cadernos de Saúde Pública"],
+    "member": "530",
+    "issued": {"date-parts": [[2016, 5]]},
+    "is-referenced-by-count": 3,
+    "references-count": 2,
+    "author": [
+        {
+            "given": "Maria",
+            "family": "Silva",
+            "ORCID": "https://orcid.org/0000-0001-2345-6789",
+            "sequence": "first",
+            "affiliation": [{"name": "Universidade de São Paulo"}],
+        },
+        {"name": "Grupo de Estudos", "sequence": "additional", "affiliation": []},
+    ],
+    "funder": [{"name": "CNPq", "DOI": "10.13039/501100003593", "award": ["123"]}],
+    "reference": [
+        {"key": "ref1", "DOI": "10.1000/1", "doi-asserted-by": "crossref"},
+        {"key": "ref2", "unstructured": "Silva M. Saúde. 2001.", "year": "2001"},
+    ],
+    "abstract": "<jats:p>Resumo</jats:p>",
+    "license": [{"URL": "https://creativecommons.org/licenses/by/4.0/"}],
+}
+
+
+def test_work_fields():
+    work = Work.from_dict(WORK)
+
+    assert work.doi == "10.1590/0102-311x00133115"
+    assert work.type == "journal-article"
+    assert work.title == "Ação à saúde"
+    assert work.container_title == "Cadernos de Saúde Pública"
+    assert work.issued == (2016, 5)
+    assert work.references_count == 2  # noqa: PLR2004
+    assert work.author == (
+        Author(
+            given="Maria",
+            family="Silva",
+            orcid="https://orcid.org/0000-0001-2345-6789",
+            sequence="first",
+            affiliation=("Universidade de São Paulo",),
+        ),
+        Author(name="Grupo de Estudos", sequence="additional", affiliation=()),
+    )
+    assert work.funder == (Funder(name="CNPq", doi="10.13039/501100003593", award=("123",)),)
+
+
+def test_work_lazy_fields():
+    work = Work.from_dict(WORK)
+
+    assert work._lazy is None
+    assert work.reference == (
+        Reference(key="ref1", doi="10.1000/1", doi_asserted_by="crossref"),
+        Reference(key="ref2", unstructured="Silva M. Saúde. 2001.", year="2001"),
+    )
+    assert work.reference is work.reference
+    assert work.abstract == "<jats:p>Resumo</jats:p>"
+    assert work.subject == ()
+    assert work.get("license") == WORK["license"]
+    assert work.get("missing", "default") == "default"
+
+
+def test_work_round_trip():
+    work = Work.from_dict(WORK)
+
+    assert work.to_dict() == WORK
+    assert json.loads(work.to_json()) == WORK
+    assert pickle.loads(pickle.dumps(work)) == work  # noqa: S301
+    for record in work.author + work.funder + work.reference:
+        assert record.__class__.from_dict(record.to_dict()) == record
+
+
+def test_author_and_funder_round_trip():
+    author = {
+        "given": "Maria",
+        "ORCID": "https://orcid.org/0000-0001-2345-6789",
+        "authenticated-orcid": True,
+        "affiliation": [{"name": "USP", "id": [{"id": "https://ror.org/036rp1748"}]}],
+    }
+    funder = {"name": "CNPq", "DOI": "10.13039/501100003593", "doi-asserted-by": "crossref"}
+
+    assert Author.from_dict(author).to_dict() == author
+    assert Author.from_dict(author).extra == {
+        "authenticated-orcid": True,
+        "affiliation": author["affiliation"],
+    }
+    assert Author.from_dict({"name": "Grupo"}).to_dict() == {"name": "Grupo"}
+    assert Funder.from_dict(funder).to_dict() == funder
+    assert Funder.from_dict(funder).extra is None
+
+
+def test_reference_round_trip():
+    reference = {
+        "key": "10.1590/0102-311x00133115-B1",
+        "DOI": "10.1007/978-3-642-00000-0",
+        "doi-asserted-by": "publisher",
+        "issue": "3",
+        "ISSN": "http://id.crossref.org/issn/0102-311X",
+        "series-title": "Lecture Notes in Computer Science",
+        "edition": "2",
+        "volume-title": "Saúde",
+    }
+
+    assert Reference.from_dict(reference).to_dict() == reference
+    assert Reference.from_dict(reference).extra == {
+        "issue": "3",
+        "ISSN": "http://id.crossref.org/issn/0102-311X",
+        "series-title": "Lecture Notes in Computer Science",
+        "edition": "2",
+        "volume-title": "Saúde",
+    }
+    assert Reference.from_dict({"key": "ref1"}).extra is None
+
+
+def test_repeated_strings_are_interned():
+    first, second = to_works([WORK, dict(WORK)])
+
+    assert first.publisher is second.publisher
+    assert first.container_title is second.container_title
+    assert first.publisher is sys.intern("FapUNIFESP (SciELO)")
+
+
+def test_records_use_slots():
+    work = Work.from_dict(WORK)
+
+    with pytest.raises(AttributeError):
+        work.extra = 1
+    with pytest.raises(TypeError):
+        Reference(unknown="value")
+
+
+def test_work_without_optional_fields():
+    work = Work(b'{"DOI": "10.1000/1", "issued": {"date-parts": [[null]]}}')
+
+    assert work.doi == "10.1000/1"
+    assert work.issued is None
+    assert work.title is None
+    assert work.author == ()
+    assert work.reference == ()
+
+
+def test_iter_works(server_url):
+    works = restful.Works(request_url=f"{server_url}/works")
+
+    records = list(iter_works(works, rows=40))
+
+    assert len(records) == TOTAL_ITEMS
+    assert [record.doi for record in records] == [item["DOI"] for item in works]
+    assert records[0].to_dict() == next(iter(works))
@@ -1,6 +1,11 @@
+import json
+
 import pytest
+import requests
 
 from crossref import VERSION, restful
+from crossref.transport import Transport
+from tests.helpers import TOTAL_ITEMS
 
 
 @pytest.fixture(autouse=True)
@@ -125,3 +130,109 @@ def test_update_rate_limits_hours(httprequest):
     httprequest._update_rate_limits(headers)
     expected = {"x-rate-limit-interval": 7200, "x-rate-limit-limit": 50}
     assert httprequest.rate_limits == expected
+
+
+def test_pages_with_cursor(server_url):
+    works = restful.Works(request_url=f"{server_url}/works")
+    pages = list(works.pages(rows=100))
+
+    assert [len(page) for page in pages] == [100, 100, 50]
+    assert [page.cursor for page in pages] == ["*", "100", "200"]
+    assert [page.next_cursor for page in pages] == ["100", "200", "250"]
+    assert {page.total for page in pages} == {250}
+    assert pages[0].items[0]["DOI"] == "10.9999/0"
+
+
+def test_pages_resume_from_cursor(server_url):
+    works = restful.Works(request_url=f"{server_url}/works")
+    pages = list(works.pages(rows=100, cursor="200"))
+
+    assert [page.cursor for page in pages] == ["200"]
+
+
+def test_pages_with_offset(server_url):
+    journals = restful.Journals(request_url=f"{server_url}/journals")
+    pages = list(journals.pages(rows=100))
+
+    assert [page.offset for page in pages] == [0, 100, 200]
+    assert [page.next_cursor for page in pages] == [None, None, None]
+    assert len(list(journals)) == TOTAL_ITEMS
+
+
+def test_pages_not_found(server_url):
+    works = restful.Works(request_url=f"{server_url}/missing")
+
+    assert list(works.pages()) == []
+
+
+def test_pages_error_status(server_url, unavailable_url):
+    with pytest.raises(restful.CrossrefAPIError, match="answered 400"):
+        next(restful.Works(request_url=f"{server_url}/works").pages(rows=5000))
+    for stream in (False, True):
+        works = restful.Works(request_url=f"{unavailable_url}/works")
+        with pytest.raises(restful.CrossrefAPIError, match="answered 503"):
+            next(works.pages(stream=stream))
+
+
+def test_stream(server_url):
+    works = restful.Works(request_url=f"{server_url}/works")
+
+    assert list(works.stream(rows=100)) == list(works)
+
+
+def test_pages_stream_partially_consumed(server_url):
+    works = restful.Works(request_url=f"{server_url}/works")
+    firsts = [next(iter(page.items))["DOI"] for page in works.pages(rows=100, stream=True)]
+
+    assert firsts == ["10.9999/0", "10.9999/100", "10.9999/200"]
+
+
+def test_pages_stream_with_offset(server_url):
+    journals = restful.Journals(request_url=f"{server_url}/journals")
+    pages = list(journals.pages(rows=100, stream=True))
+
+    assert [page.total for page in pages] == [TOTAL_ITEMS] * 3
+    assert [page.offset for page in pages] == [0, 100, 200]
+
+
+class TotalAfterItems(Transport):
+    """
+    Answer a page with ``total-results`` after the items, then an empty page.
+    """
+
+    def __init__(self):
+        self.items = [{"DOI": "10.1000/1"}, {"DOI": "10.1000/2"}]
+
+    def request(self, *_args, **_kwargs) -> requests.Response:
+        message = {"items": self.items, "next-cursor": "2", "total-results": 2}
+        self.items = []
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps({"status": "ok", "message": message}).encode()
+        response._content_consumed = True
+        return response
+
+
+def test_pages_stream_total_after_items():
+    http_request = restful.HTTPRequest(transport=TotalAfterItems(), throttle=False)
+    pages = restful.Works(http_request=http_request).pages(stream=True)
+    page = next(pages)
+
+    assert (page.next_cursor, page.total) == (None, None)
+    assert [item["DOI"] for item in page.items] == ["10.1000/1", "10.1000/2"]
+    assert list(pages) == []
+    # Both are refreshed once the items are consumed.
+    assert (page.next_cursor, page.total) == ("2", 2)
+
+
+def test_raw(server_url):
+    works = restful.Works(request_url=f"{server_url}/works")
+    items = list(works.raw(rows=100))
+
+    assert all(isinstance(item, memoryview) for item in items)
+    assert [json.loads(bytes(item)) for item in items] == list(works)
+
+
+def test_raw_and_stream_are_exclusive():
+    with pytest.raises(ValueError, match="can not be used together"):
+        next(restful.Works().pages(stream=True, raw=True))
@@ -0,0 +1,83 @@
+import gzip
+import json
+
+import pytest
+
+from crossref.mirror import Mirror
+from crossref.snapshot import Snapshot, read_file, snapshot_files
+
+
+def work(index):
+    return {
+        "indexed": {"date-time": f"2024-01-{index % 28 + 1:02d}T00:00:00Z"},
+        "DOI": f"10.1000/{index}",
+        "member": "98",
+        "title": [f"Work {index}"],
+    }
+
+
+def doi(item):
+    return item["DOI"] if int(item["DOI"].rsplit("/", 1)[1]) % 2 else None
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    # Two JSON files with 25 works each, out of lexical order, and a JSON Lines file.
+    (tmp_path / "2.json.gz").write_bytes(
+        gzip.compress(json.dumps({"items": [work(i) for i in range(25)]}).encode())
+    )
+    (tmp_path / "10.json").write_text(json.dumps({"items": [work(i) for i in range(25, 50)]}))
+    lines = "\n".join(json.dumps(work(i)) for i in range(50, 60)) + "\n\n"
+    (tmp_path / "more").mkdir()
+    (tmp_path / "more" / "0.jsonl.gz").write_bytes(gzip.compress(lines.encode()))
+    (tmp_path / "README.md").write_text("Not a snapshot file")
+    return tmp_path
+
+
+def test_snapshot_files_are_sorted_naturally(snapshot_dir):
+    assert [file.name for file in snapshot_files(snapshot_dir)] == [
+        "2.json.gz",
+        "10.json",
+        "0.jsonl.gz",
+    ]
+    assert snapshot_files(snapshot_dir / "10.json") == [snapshot_dir / "10.json"]
+
+
+def test_iteration_yields_the_works_in_order(snapshot_dir):
+    snapshot = Snapshot(snapshot_dir, workers=2, executor="thread")
+
+    assert list(snapshot) == [work(i) for i in range(60)]
+    assert snapshot.indexed == "2024-01-28T00:00:00Z"
+    assert read_file(snapshot_dir / "10.json") == [work(i) for i in range(25, 50)]
+
+
+def test_raw_and_map_on_processes(snapshot_dir):
+    snapshot = Snapshot(snapshot_dir, workers=2)
+
+    assert [json.loads(bytes(item)) for item in snapshot.raw()] == [work(i) for i in range(60)]
+    assert snapshot.indexed == "2024-01-28T00:00:00Z"
+    assert list(snapshot.map(doi)) == [f"10.1000/{i}" for i in range(1, 60, 2)]
+
+
+def test_unreadable_files(snapshot_dir):
+    (snapshot_dir / "3.json.gz").write_bytes(b"not gzip")
+
+    with pytest.raises(gzip.BadGzipFile):
+        list(Snapshot(snapshot_dir, executor="thread"))
+
+    snapshot = Snapshot(snapshot_dir, executor="thread", errors="collect")
+    assert len(list(snapshot)) == 60  # noqa: PLR2004
+    assert [path for path, _ in snapshot.errors] == [str(snapshot_dir / "3.json.gz")]
+
+    with pytest.raises(FileNotFoundError):
+        Snapshot(snapshot_dir / "more" / "missing")
+
+
+def test_bootstrap_a_mirror(snapshot_dir, tmp_path):
+    mirror = Mirror(tmp_path / "crossref.db")
+    snapshot = Snapshot(snapshot_dir, executor="thread")
+
+    assert mirror.store(snapshot.raw()) == 60  # noqa: PLR2004
+    assert mirror.get("10.1000/59") == work(59)
+    assert mirror.count("member:98") == 60  # noqa: PLR2004
+    mirror.close()
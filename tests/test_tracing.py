@@ -0,0 +1,127 @@
+import pytest
+import requests
+
+from crossref import restful
+from crossref.mirror import Mirror
+from crossref.pipeline import ParallelMap
+from crossref.tracing import instrument, uninstrument
+from tests.helpers import TOTAL_ITEMS
+
+trace = pytest.importorskip("opentelemetry.trace")
+sdk_trace = pytest.importorskip("opentelemetry.sdk.trace")
+export = pytest.importorskip("opentelemetry.sdk.trace.export")
+in_memory = pytest.importorskip("opentelemetry.sdk.trace.export.in_memory_span_exporter")
+
+
+@pytest.fixture
+def provider():
+    exporter = in_memory.InMemorySpanExporter()
+    provider = sdk_trace.TracerProvider()
+    provider.add_span_processor(export.SimpleSpanProcessor(exporter))
+    provider.exporter = exporter
+    return provider
+
+
+def spans(provider, name: str) -> list:
+    return [span for span in provider.exporter.get_finished_spans() if span.name == name]
+
+
+def test_harvest_spans(server_url, provider):
+    works = restful.Works(request_url=f"{server_url}/works")
+    instrument(works, tracer_provider=provider)
+    tracer = provider.get_tracer("tests")
+
+    with tracer.start_as_current_span("job") as job:
+        for page in works.pages(rows=100):
+            # The consumer does not run under the harvest.
+            with tracer.start_as_current_span("consumer") as consumer:
+                assert consumer.parent.span_id == job.get_span_context().span_id
+            assert len(page.items) > 0
+
+    (harvest,) = spans(provider, "crossref.harvest")
+    pages = spans(provider, "crossref.page")
+    requests_ = spans(provider, "crossref.request")
+    assert harvest.parent.span_id == job.get_span_context().span_id
+    assert harvest.attributes["crossref.route"] == "/works"
+    assert harvest.attributes["crossref.rows"] == 100  # noqa: PLR2004
+    assert harvest.attributes["crossref.pages"] == 3  # noqa: PLR2004
+
+    # The last, empty page ends the harvest.
+    assert [page.attributes["crossref.cursor_depth"] for page in pages] == [0, 1, 2, 3]
+    assert [page.attributes["crossref.items"] for page in pages] == [100, 100, 50, 0]
+    assert {page.attributes["crossref.params_hash"] for page in pages} == {
+        harvest.attributes["crossref.params_hash"]
+    }
+    assert all(page.parent.span_id == harvest.context.span_id for page in pages)
+
+    assert len(requests_) == len(pages)
+    for request, page in zip(requests_, pages, strict=True):
+        assert request.parent.span_id == page.context.span_id
+        assert request.kind == trace.SpanKind.CLIENT
+        assert request.attributes["http.request.method"] == "GET"
+        assert request.attributes["http.response.status_code"] == 200  # noqa: PLR2004
+        assert request.attributes["http.response.body.size"] > 0
+        assert request.attributes["crossref.retries"] == 0
+
+    uninstrument(works)
+    provider.exporter.clear()
+    assert sum(1 for _ in works) == TOTAL_ITEMS
+    assert provider.exporter.get_finished_spans() == ()
+
+
+def test_thread_pool_propagation(server_url, provider):
+    works = restful.Works(request_url=f"{server_url}/works")
+    instrument(works, tracer_provider=provider)
+
+    with provider.get_tracer("tests").start_as_current_span("job") as job:
+        counts = list(ParallelMap(lambda _: works.count(), range(4), workers=2))
+
+    assert counts == [TOTAL_ITEMS] * 4
+    requests_ = spans(provider, "crossref.request")
+    assert len(requests_) == 4  # noqa: PLR2004
+    assert {span.parent.span_id for span in requests_} == {job.get_span_context().span_id}
+
+
+def test_retries_and_errors(unavailable_url, provider):
+    http_request = restful.HTTPRequest(retries=2)
+    instrument(http_request, tracer_provider=provider)
+    http_request.do_http_request("get", f"{unavailable_url}/works")
+
+    (request,) = spans(provider, "crossref.request")
+    assert request.attributes["http.response.status_code"] == 503  # noqa: PLR2004
+    assert request.attributes["crossref.retries"] == 2  # noqa: PLR2004
+    assert [event.name for event in request.events] == ["retry", "retry"]
+
+    provider.exporter.clear()
+    http_request = restful.HTTPRequest(throttle=False)
+    instrument(http_request, tracer_provider=provider)
+    with pytest.raises(requests.ConnectionError):
+        http_request.do_http_request("get", "http://127.0.0.1:9/works", timeout=1)
+
+    (request,) = spans(provider, "crossref.request")
+    assert request.status.status_code == trace.StatusCode.ERROR
+    assert [event.name for event in request.events] == ["exception"]
+
+
+def test_cache_and_deposit_spans(server_url, provider, tmp_path):
+    mirror = Mirror(tmp_path / "crossref.db")
+    mirror.store([{"DOI": "10.1000/1", "title": ["Stored"]}])
+    works = mirror.works(request_url=f"{server_url}/works")
+    instrument(works, tracer_provider=provider)
+
+    assert works.doi("10.1000/1")["title"] == ["Stored"]
+    assert works.doi_exists("10.1000/1")
+    lookups = spans(provider, "crossref.cache")
+    assert [span.attributes["crossref.cache_hit"] for span in lookups] == [True, True]
+    assert lookups[0].attributes["crossref.cache"] == "mirror"
+    mirror.close()
+
+    depositor = restful.Depositor("10.1000", "user", "secret")
+    depositor.get_endpoint = lambda verb: f"{server_url}/missing/{verb}"
+    instrument(depositor, tracer_provider=provider)
+    assert depositor.request_doi_status_by_batch_id("batch-1").status_code == 404  # noqa: PLR2004
+
+    (deposit,) = spans(provider, "crossref.deposit")
+    assert deposit.attributes["crossref.operation"] == "batch_status"
+    assert deposit.attributes["crossref.submission"] == "batch-1"
+    assert spans(provider, "crossref.request")[-1].parent.span_id == deposit.context.span_id
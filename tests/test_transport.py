@@ -0,0 +1,184 @@
+import gzip
+import http.client
+import io
+import subprocess
+import sys
+
+import pytest
+
+import crossref
+from crossref import restful
+from crossref.transport import (
+    CassetteError,
+    CassetteTransport,
+    HTTPClientResponse,
+    HTTPClientTransport,
+    RequestsTransport,
+    Transport,
+    _multipart,
+    request_key,
+)
+from tests.helpers import TOTAL_ITEMS
+
+
+class OfflineTransport(Transport):
+    def request(self, method, url, **kwargs):
+        msg = f"The network must not be used: {method} {url} {kwargs}"
+        raise AssertionError(msg)
+
+
+def harvest(server_url: str, transport: Transport) -> list[str]:
+    http_request = restful.HTTPRequest(transport=transport)
+    works = restful.Works(request_url=f"{server_url}/works", http_request=http_request)
+    dois = [item["DOI"] for page in works.pages(rows=100) for item in page.items]
+    assert http_request.rate_limits["x-rate-limit-limit"] == 1000  # noqa: PLR2004
+    return dois
+
+
+def test_transport_must_implement_request():
+    class Incomplete(Transport):
+        pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        Incomplete()
+
+
+def test_request_key():
+    assert (
+        request_key("get", "https://api.crossref.org/works") == "GET https://api.crossref.org/works"
+    )
+    assert request_key("get", "http://x/works", {"rows": 20, "cursor": "*"}) == (
+        "GET http://x/works?cursor=%2A&rows=20"
+    )
+    assert "secret" not in request_key("post", "http://x", data={"login_passwd": "secret"})
+
+
+def test_record_and_replay(server_url, tmp_path):
+    path = tmp_path / "harvest.jsonl.gz"
+    with CassetteTransport(path, mode="record") as cassette:
+        recorded = harvest(server_url, cassette)
+    assert recorded == [f"10.9999/{index}" for index in range(TOTAL_ITEMS)]
+    with gzip.open(path, "rt") as lines:
+        assert sum(1 for _ in lines) == 4  # noqa: PLR2004
+
+    with CassetteTransport(path, mode="replay", transport=OfflineTransport()) as cassette:
+        assert harvest(server_url, cassette) == recorded
+
+        # Streaming works on the replayed responses too.
+        http_request = restful.HTTPRequest(transport=cassette)
+        works = restful.Works(request_url=f"{server_url}/works", http_request=http_request)
+        assert [item["DOI"] for item in works.pages(rows=100, stream=True).__next__().items] == (
+            recorded[:100]
+        )
+
+        with pytest.raises(CassetteError, match="No response recorded"):
+            harvest(server_url.replace("127.0.0.1", "localhost"), cassette)
+
+
+def test_once_mode_and_repeats(server_url, tmp_path):
+    path = tmp_path / "count.jsonl"
+    with CassetteTransport(path) as cassette:
+        assert cassette.mode == "record"
+        http_request = restful.HTTPRequest(transport=cassette)
+        works = restful.Works(request_url=f"{server_url}/works", http_request=http_request)
+        assert works.count() == TOTAL_ITEMS
+
+    with CassetteTransport(path, transport=OfflineTransport()) as cassette:
+        assert cassette.mode == "replay"
+        http_request = restful.HTTPRequest(transport=cassette)
+        works = restful.Works(request_url=f"{server_url}/works", http_request=http_request)
+        # The last response recorded for a request repeats.
+        assert works.count() == works.count() == TOTAL_ITEMS
+
+
+def test_deposit_credentials_are_not_recorded(server_url, tmp_path):
+    path = tmp_path / "deposit.jsonl"
+    depositor = restful.Depositor("10.1000", "user", "secret")
+    depositor.get_endpoint = lambda verb: f"{server_url}/missing/{verb}"
+    with CassetteTransport(path, mode="record") as cassette:
+        depositor.http_request.transport = cassette
+        assert depositor.request_doi_status_by_filename("file.xml").status_code == 404  # noqa: PLR2004
+
+    assert "secret" not in path.read_text()
+
+
+def test_invalid_mode(tmp_path):
+    with pytest.raises(ValueError, match="must be one of: once, record, replay"):
+        CassetteTransport(tmp_path / "cassette.jsonl", mode="rewind")
+
+
+def test_requests_transport_retries(unavailable_url):
+    transport = RequestsTransport(retries=1)
+    response = transport.request("get", f"{unavailable_url}/works")
+    assert response.status_code == 503  # noqa: PLR2004
+    assert len(response.raw.retries.history) == 1
+    transport.close()
+
+
+def test_http_client_transport(server_url):
+    transport = HTTPClientTransport()
+    assert harvest(server_url, transport) == [f"10.9999/{i}" for i in range(TOTAL_ITEMS)]
+    # The connection is kept between the requests.
+    (connections,) = transport._connections.values()
+    assert len(connections) == 1
+
+    http_request = restful.HTTPRequest(transport=transport)
+    works = restful.Works(request_url=f"{server_url}/works", http_request=http_request)
+    assert sum(1 for _ in works.stream(rows=100)) == TOTAL_ITEMS
+    assert http_request.do_http_request("head", f"{server_url}/works/10.9999/1").ok
+    missing = http_request.do_http_request("get", f"{server_url}/missing")
+    assert missing.status_code == 404  # noqa: PLR2004
+    assert missing.text == "Resource not found."
+
+    # A response left unread closes its connection, which is replaced.
+    transport.request("get", f"{server_url}/works", params={"rows": 100}, stream=True)
+    ((unread, _),) = connections.values()
+    response = transport.request("get", f"{server_url}/works", params={"rows": 1})
+    assert response.json()["message"]["items"][0]["DOI"] == "10.9999/0"
+    ((connection, _),) = connections.values()
+    assert connection is not unread
+    assert unread.sock is None
+    transport.close()
+    assert connection.sock is None
+
+
+def test_http_client_response_decompresses():
+    body = gzip.compress(b'{"status": "ok"}')
+    raw = io.BytesIO(body)
+    raw.status = 200
+    raw.headers = http.client.HTTPMessage()
+    raw.headers["content-encoding"] = "gzip"
+    raw.headers["content-type"] = "application/json"
+    response = HTTPClientResponse(raw, "http://x/works", 0.1)
+    assert response.json() == {"status": "ok"}
+    assert response.ok
+    assert response.elapsed.total_seconds() == 0.1  # noqa: PLR2004
+
+
+def test_multipart():
+    body, content_type = _multipart({"operation": "doMDUpload"}, {"mdFile": ("a.xml", "<x/>")})
+    boundary = content_type.split("boundary=")[1]
+    assert body.startswith(f"--{boundary}\r\n".encode())
+    assert b'name="operation"\r\n\r\ndoMDUpload\r\n' in body
+    assert b'name="mdFile"; filename="a.xml"\r\n\r\n<x/>\r\n' in body
+    assert body.endswith(f"--{boundary}--\r\n".encode())
+
+
+def test_http_backend_is_imported_lazily():
+    code = (
+        "import sys\n"
+        "from crossref import jsonstream\n"
+        "from crossref.restful import Works\n"
+        "assert Works().query('zika').filter(from_pub_date='2016').url\n"
+        "lazy = {'requests', 'urllib3', 'http.client', 'importlib.metadata', 'orjson', 'ujson'}\n"
+        "loaded = lazy & set(sys.modules)\n"
+        "assert not loaded, loaded\n"
+        "assert not jsonstream._compound_pattern.cache_info().currsize\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603
+
+
+def test_version():
+    from importlib import metadata  # noqa: PLC0415
+
+    assert metadata.version("crossrefapi") == crossref.VERSION
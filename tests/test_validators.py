@@ -92,6 +92,11 @@ def test_is_date_6():
         validators.is_date("2017-12-00")
 
 
+def test_is_date_7():
+    with pytest.raises(ValueError, match="Invalid date"):
+        validators.is_date("2017-12-31-01")
+
+
 def test_is_integer_1():
     result = validators.is_integer("10")
 